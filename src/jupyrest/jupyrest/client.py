@@ -1,11 +1,12 @@
 import aiohttp
 import asyncio
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from jupyrest.http.models import (
     NotebookExecutionResponse,
     NotebookExecutionStatus,
     NotebookExecutionAsyncResponse,
+    ExecutionSchedulerResponse,
 )
 
 
@@ -17,13 +18,17 @@ class JupyrestClient:
         return aiohttp.ClientSession(base_url=self.endpoint, raise_for_status=True)
 
     async def execute_notebook(
-        self, notebook_id, parameters
+        self,
+        notebook_id,
+        parameters,
+        priority: Optional[str] = None,
+        artifacts: Optional[List[str]] = None,
     ) -> NotebookExecutionAsyncResponse:
         async with self.session() as session:
             execute_url = f"/api/notebooks/{notebook_id}/execute"
             async with session.post(
                 execute_url,
-                json=dict(parameters=parameters),
+                json=dict(parameters=parameters, priority=priority, artifacts=artifacts),
             ) as response:
                 response_json = await response.json()
                 return NotebookExecutionAsyncResponse.parse_obj(response_json)
@@ -97,6 +102,12 @@ class JupyrestClient:
             async with session.get(f"/api/notebooks/{notebook_id}") as response:
                 return await response.json()
 
+    async def get_scheduler(self) -> ExecutionSchedulerResponse:
+        async with self.session() as session:
+            async with session.get("/api/scheduler") as response:
+                response_json = await response.json()
+                return ExecutionSchedulerResponse.parse_obj(response_json)
+
     async def get_notebooks(self):
         async with self.session() as session:
             async with session.get(f"/api/notebooks") as response:
@@ -1,11 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Protocol, Dict, Any, AsyncIterable, Optional
+from typing import Protocol, Dict, Any, AsyncIterator, Optional, AsyncContextManager
 from dataclasses import dataclass
 from .nbschema import SchemaValidationResponse, OutputResult
 from .notebook_config import NotebookConfig
 from nbformat.notebooknode import NotebookNode
-from .notebook_execution.entity import NotebookExecution
-from .file_object import FileObjectClient
+from .notebook_execution.entity import NotebookExecution, NotebookExecutionCompletionDetails
+from .file_object import FileObjectClient, FileObject
 
 class NotebookInputOutputValidator(ABC):
     @abstractmethod
@@ -26,6 +26,14 @@ class NotebookOutputReader(ABC):
     def get_output(self, notebook: NotebookNode) -> OutputResult:
         pass
 
+    def prepare_notebook(self, notebook: NotebookNode) -> None:
+        """Called with the parameterized notebook before it is executed."""
+        pass
+
+    def release_notebook(self, notebook: NotebookNode) -> None:
+        """Called once the output of a prepared notebook is no longer needed."""
+        pass
+
 class NotebookConverter(ABC):
 
     @abstractmethod
@@ -38,6 +46,39 @@ class NotebookConverter(ABC):
     def convert_notebook_to_str(self, notebook: NotebookNode) -> str:
         pass
 
+    async def convert_notebook_to_html_async(
+        self, notebook: NotebookNode, report_mode: bool
+    ) -> str:
+        return self.convert_notebook_to_html(notebook=notebook, report_mode=report_mode)
+
+    async def convert_notebook_to_str_async(self, notebook: NotebookNode) -> str:
+        return self.convert_notebook_to_str(notebook=notebook)
+
+class NotebookArtifactRenderer(ABC):
+
+    @abstractmethod
+    async def write_artifacts(
+        self,
+        notebook: NotebookNode,
+        ipynb: Optional[FileObject],
+        html: Optional[FileObject],
+        html_report: Optional[FileObject],
+    ) -> None:
+        """Persist the rendered artifacts of an executed notebook.
+        Artifacts that are None are not written."""
+        pass
+
+    @abstractmethod
+    async def read_html(
+        self, ipynb: Optional[FileObject], html: FileObject, report_mode: bool
+    ) -> str:
+        """Read an HTML artifact written by `write_artifacts`."""
+        pass
+
+    def renders_html_on_read(self) -> bool:
+        """Whether `read_html` renders a missing HTML artifact from the ipynb."""
+        return False
+
 class NotebookExecutionRepository(ABC):
 
     @abstractmethod
@@ -67,7 +108,7 @@ class NotebookRepository(ABC):
         pass
 
     @abstractmethod
-    async def iter_notebook_ids(self) -> AsyncIterable[str]:
+    def iter_notebook_ids(self) -> AsyncIterator[str]:
         pass
 
 
@@ -109,6 +150,16 @@ class NotebookExeuctor(ABC):
     def get_kernelspec_language(self) -> str:
         pass
 
+    async def start(self) -> None:
+        """Called once when the application starts, e.g. to warm up kernels."""
+        pass
+
+    async def shutdown(self) -> None:
+        """Called once when the application stops. Releases kernels
+        and processes the executor keeps between executions.
+        """
+        pass
+
     @abstractmethod
     async def execute_notebook_async(self, notebook: NotebookNode) -> Optional[str]:
         """Executes a notebook in place. Returns an exception string if any.
@@ -121,6 +172,89 @@ class NotebookExeuctor(ABC):
         """
         pass
 
+@dataclass
+class ExecutionSchedulerStats:
+    running: int
+    queued: int
+    max_concurrency: Optional[int]
+    max_queue_size: Optional[int]
+    average_wait_seconds: float
+    average_run_seconds: float
+    queued_by_priority: Dict[str, int]
+
+
+class NotebookExecutionScheduler(ABC):
+
+    @abstractmethod
+    def admit(self, execution: NotebookExecution) -> None:
+        """Reserve a place for a newly accepted execution.
+
+        Raises:
+            ExecutionQueueFull: when the execution cannot be queued
+            InvalidPriorityClass: when the execution's priority is unknown
+        """
+        pass
+
+    @abstractmethod
+    def withdraw(self, execution_id: str) -> None:
+        """Give up the place reserved by `admit` for an execution that
+        will not run. Does nothing once the execution got its slot."""
+        pass
+
+    @abstractmethod
+    def slot(
+        self, execution: NotebookExecution, notebook_config: NotebookConfig
+    ) -> AsyncContextManager[None]:
+        """Wait for an execution slot and hold it while the context is active."""
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> ExecutionSchedulerStats:
+        pass
+
+class NotebookExecutionCoalescer(ABC):
+
+    @abstractmethod
+    def lead_or_follow(self, key: str, execution_id: str) -> Optional[str]:
+        """Return the id of the in-flight execution registered for `key`,
+        or register `execution_id` for `key` and return None."""
+        pass
+
+    @abstractmethod
+    def release(self, key: str, execution_id: str) -> None:
+        """Unregister `execution_id` if it is registered for `key`."""
+        pass
+
+    @abstractmethod
+    def mark_saved(self, key: str, execution_id: str) -> None:
+        """Called once the execution registered for `key` is saved."""
+        pass
+
+    @abstractmethod
+    async def wait_saved(self, key: str, execution_id: str) -> bool:
+        """Wait until the execution registered for `key` is saved. Return
+        False if it was released instead, e.g. because its save failed."""
+        pass
+
+class NotebookResultCache(ABC):
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[NotebookExecutionCompletionDetails]:
+        pass
+
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        completion_details: NotebookExecutionCompletionDetails,
+        ttl_seconds: Optional[int],
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
 @dataclass
 class DependencyBag:
     notebook_execution_repository: NotebookExecutionRepository
@@ -133,6 +267,10 @@ class DependencyBag:
     notebook_input_output_validator: NotebookInputOutputValidator
     notebook_execution_task_handler: NotebookExecutionTaskHandler
     notebook_execution_file_namer: NotebookExecutionFileNamer
+    notebook_execution_scheduler: NotebookExecutionScheduler
+    notebook_artifact_renderer: NotebookArtifactRenderer
+    notebook_execution_coalescer: NotebookExecutionCoalescer
+    notebook_result_cache: NotebookResultCache
 
 class ApplicationBuilder(ABC):
 
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Dict, Optional
+
+import nbformat
+from nbformat.notebooknode import NotebookNode
+
+from ..contracts import NotebookArtifactRenderer, NotebookConverter
+from ..error import FileObjectNotFound
+from ..file_object import FileObject, FileObjectClient
+
+
+class DefaultNotebookArtifactRenderer(NotebookArtifactRenderer):
+    """
+    Renders the ipynb, html and html_report artifacts of an execution.
+
+    With `lazy` only the ipynb is written when the execution completes.
+    HTML artifacts of executions that do not store the ipynb are still
+    rendered eagerly. An HTML artifact is rendered from the stored ipynb the first time it
+    is read and then stored, so later reads only fetch it. Concurrent
+    reads of an artifact that is not rendered yet share one render.
+    """
+
+    def __init__(
+        self,
+        notebook_converter: NotebookConverter,
+        file_obj_client: FileObjectClient,
+        lazy: bool = False,
+    ) -> None:
+        self.notebook_converter = notebook_converter
+        self.file_obj_client = file_obj_client
+        self.lazy = lazy
+        # in-flight lazy renders by html path
+        self._renders: Dict[str, asyncio.Task] = {}
+
+    async def _write_html(
+        self, notebook: NotebookNode, html: FileObject, report_mode: bool
+    ) -> str:
+        content = await self.notebook_converter.convert_notebook_to_html_async(
+            notebook=notebook, report_mode=report_mode
+        )
+        await self.file_obj_client.set_content(html, content)
+        return content
+
+    async def _write_ipynb(self, notebook: NotebookNode, ipynb: FileObject):
+        content = await self.notebook_converter.convert_notebook_to_str_async(
+            notebook=notebook
+        )
+        await self.file_obj_client.set_content(ipynb, content)
+
+    async def write_artifacts(
+        self,
+        notebook: NotebookNode,
+        ipynb: Optional[FileObject],
+        html: Optional[FileObject],
+        html_report: Optional[FileObject],
+    ) -> None:
+        # each artifact is rendered off the event loop and uploaded
+        # as soon as it is ready, all of them in parallel
+        writes = []
+        if ipynb is not None:
+            writes.append(self._write_ipynb(notebook=notebook, ipynb=ipynb))
+        if not (self.lazy and ipynb is not None):
+            if html_report is not None:
+                writes.append(
+                    self._write_html(notebook=notebook, html=html_report, report_mode=True)
+                )
+            if html is not None:
+                writes.append(
+                    self._write_html(notebook=notebook, html=html, report_mode=False)
+                )
+        await asyncio.gather(*writes)
+
+    async def _render_from_ipynb(
+        self, ipynb: FileObject, html: FileObject, report_mode: bool
+    ) -> str:
+        ipynb_content = await self.file_obj_client.get_content(file_object=ipynb)
+        notebook = nbformat.reads(ipynb_content, as_version=nbformat.NO_CONVERT)
+        return await self._write_html(
+            notebook=notebook, html=html, report_mode=report_mode
+        )
+
+    def renders_html_on_read(self) -> bool:
+        return self.lazy
+
+    async def read_html(
+        self, ipynb: Optional[FileObject], html: FileObject, report_mode: bool
+    ) -> str:
+        try:
+            return await self.file_obj_client.get_content(file_object=html)
+        except FileObjectNotFound:
+            if not self.lazy or ipynb is None:
+                raise
+        render = self._renders.get(html.path, None)
+        if render is None:
+            render = asyncio.ensure_future(
+                self._render_from_ipynb(ipynb=ipynb, html=html, report_mode=report_mode)
+            )
+            self._renders[html.path] = render
+            render.add_done_callback(lambda _: self._renders.pop(html.path, None))
+        # a reader that goes away does not cancel the render for the others
+        return await asyncio.shield(render)
@@ -10,20 +10,32 @@ from ..contracts import (
     NotebookOutputReader,
     NotebookInputOutputValidator,
     NotebookExecutionTaskHandler,
-    NotebookExecutionFileNamer
+    NotebookExecutionFileNamer,
+    NotebookExecutionScheduler,
+    NotebookArtifactRenderer,
+    NotebookExecutionCoalescer,
+    NotebookResultCache,
 )
 
 from .execution_task_handler import DefaultNotebookExecutionTaskHandler
 from .executor import IPythonNotebookExecutor
+from .execution_scheduler import DefaultNotebookExecutionScheduler
+from .zygote_executor import ZygoteNotebookExecutor
+from .sticky_executor import StickyKernelNotebookExecutor
 from .file_namer import DefaultNotebookExecutionFileNamer
-from .output_reader import DefaultNotebookOutputReader
+from .scrap_output_reader import ScrapNotebookOutputReader
+from .spool_output_reader import SpoolNotebookOutputReader
 from .parameterizer import DefaultNotebookParameterizier
 from .notebook_converter import DefaultNotebookConverter
+from .artifact_renderer import DefaultNotebookArtifactRenderer
+from .execution_coalescer import DefaultNotebookExecutionCoalescer
+from .result_cache import LRUNotebookResultCache
 from .notebook_repository import DefaultNotebookRepository
 from .input_output_validator import DefaultNotebookInputOutputValidator
 
 from pathlib import Path
-from typing import Dict, Type, Optional
+from concurrent.futures import Executor
+from typing import Dict, Type, Optional, List
 
 ModelSet = Dict[str, Type[NbSchemaBase]]
 
@@ -33,22 +45,63 @@ class DefaultApplicationBuilder(ApplicationBuilder):
                 notebooks_dir: Path,
                 notebook_execution_repository: NotebookExecutionRepository,
                 file_object_client: FileObjectClient,
-                models: Optional[ModelSet] = None) -> None:
+                models: Optional[ModelSet] = None,
+                notebook_executor: Optional[NotebookExeuctor] = None,
+                preload_modules: Optional[List[str]] = None,
+                sticky_prelude_kernels: bool = False,
+                max_concurrent_executions: Optional[int] = None,
+                max_queued_executions: Optional[int] = None,
+                execution_priority_weights: Optional[Dict[str, int]] = None,
+                max_concurrent_executions_per_notebook: Optional[int] = None,
+                artifact_render_pool: Optional[Executor] = None,
+                lazy_html_rendering: bool = False,
+                result_cache: Optional[NotebookResultCache] = None,
+                schema_validation_backend: str = "jsonschema",
+                output_spool_dir: Optional[Path] = None) -> None:
         self.notebooks_dir = notebooks_dir
         self.models = models or {}
-        self.nbschema = NotebookSchemaProcessor(models=self.models)
+        # "fastjsonschema" validates with generated code, see NotebookSchemaProcessor
+        self.nbschema = NotebookSchemaProcessor(models=self.models, validation_backend=schema_validation_backend)
 
         self.notebook_execution_repository = notebook_execution_repository
         self.file_obj_client = file_object_client
 
-        self.notebook_converter: NotebookConverter = DefaultNotebookConverter()
-        self.notebook_executor: NotebookExeuctor = IPythonNotebookExecutor()
+        self.notebook_repository: NotebookRepository = DefaultNotebookRepository(notebooks_dir=self.notebooks_dir, nbschema=self.nbschema)
+        # html/ipynb rendering runs on artifact_render_pool (a thread or process pool),
+        # or the event loop's default thread pool
+        self.notebook_converter: NotebookConverter = DefaultNotebookConverter(executor=artifact_render_pool)
+        # with lazy_html_rendering only the ipynb is stored when an execution
+        # completes, html artifacts are rendered and stored on first read
+        self.notebook_artifact_renderer: NotebookArtifactRenderer = DefaultNotebookArtifactRenderer(
+            notebook_converter=self.notebook_converter, file_obj_client=self.file_obj_client, lazy=lazy_html_rendering)
+        # e.g. PooledIPythonNotebookExecutor to run notebooks on pre-started kernels
+        self.notebook_executor: NotebookExeuctor = notebook_executor or IPythonNotebookExecutor()
+        if notebook_executor is None and preload_modules is not None:
+            # fork kernels from a process that has imported preload_modules
+            # and the preload_modules of every notebook config
+            self.notebook_executor = ZygoteNotebookExecutor(preload_modules=preload_modules, notebook_repository=self.notebook_repository)
+        elif notebook_executor is None and sticky_prelude_kernels:
+            # keep a kernel per notebook with its jupyrest-prelude cells executed
+            self.notebook_executor = StickyKernelNotebookExecutor()
         self.notebook_parameterizier: NotebookParameterizier = DefaultNotebookParameterizier(nbschema=self.nbschema, kernelspec_language=self.notebook_executor.get_kernelspec_language())
-        self.notebook_output_reader: NotebookOutputReader = DefaultNotebookOutputReader(nbschema=self.nbschema)
+        self.notebook_output_reader: NotebookOutputReader = ScrapNotebookOutputReader(nbschema=self.nbschema)
+        if output_spool_dir is not None:
+            # save_output writes to a file in output_spool_dir instead of the notebook
+            self.notebook_output_reader = SpoolNotebookOutputReader(spool_dir=output_spool_dir, notebook_output_reader=self.notebook_output_reader)
         self.notebook_input_output_validator: NotebookInputOutputValidator = DefaultNotebookInputOutputValidator(nbschema=self.nbschema)
         self.notebook_execution_task_handler: NotebookExecutionTaskHandler = DefaultNotebookExecutionTaskHandler()
         self.notebook_execution_file_namer: NotebookExecutionFileNamer = DefaultNotebookExecutionFileNamer()
-        self.notebook_repository: NotebookRepository = DefaultNotebookRepository(notebooks_dir=self.notebooks_dir, nbschema=self.nbschema)
+        self.notebook_execution_scheduler: NotebookExecutionScheduler = DefaultNotebookExecutionScheduler(
+            max_concurrency=max_concurrent_executions,
+            max_queue_size=max_queued_executions,
+            priority_weights=execution_priority_weights,
+            max_concurrency_per_notebook=max_concurrent_executions_per_notebook,
+        )
+
+        self.notebook_execution_coalescer: NotebookExecutionCoalescer = DefaultNotebookExecutionCoalescer()
+        # results of notebooks with cache.enabled in their config, e.g.
+        # FileObjectNotebookResultCache to share them between processes
+        self.notebook_result_cache: NotebookResultCache = result_cache or LRUNotebookResultCache()
 
     def build(self) -> DependencyBag:
         return DependencyBag(
@@ -62,4 +115,8 @@ class DefaultApplicationBuilder(ApplicationBuilder):
             notebook_input_output_validator=self.notebook_input_output_validator,
             notebook_execution_task_handler=self.notebook_execution_task_handler,
             notebook_execution_file_namer=self.notebook_execution_file_namer,
+            notebook_execution_scheduler=self.notebook_execution_scheduler,
+            notebook_artifact_renderer=self.notebook_artifact_renderer,
+            notebook_execution_coalescer=self.notebook_execution_coalescer,
+            notebook_result_cache=self.notebook_result_cache,
         )
\ No newline at end of file
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+from ..contracts import NotebookExecutionCoalescer
+
+
+class DefaultNotebookExecutionCoalescer(NotebookExecutionCoalescer):
+    """
+    Tracks in-flight executions in process memory. Executions accepted
+    by other processes are not coalesced with each other.
+    """
+
+    def __init__(self) -> None:
+        self._leaders: Dict[str, str] = {}
+        # leaders that are registered but not saved yet
+        self._unsaved: Set[str] = set()
+        # resolved when an unsaved leader is saved (True) or released (False)
+        self._saved_futures: Dict[str, "asyncio.Future[bool]"] = {}
+
+    def lead_or_follow(self, key: str, execution_id: str) -> Optional[str]:
+        leader_id = self._leaders.setdefault(key, execution_id)
+        if leader_id == execution_id:
+            self._unsaved.add(execution_id)
+            return None
+        return leader_id
+
+    def _resolve(self, execution_id: str, saved: bool):
+        self._unsaved.discard(execution_id)
+        future = self._saved_futures.pop(execution_id, None)
+        if future is not None and not future.done():
+            future.set_result(saved)
+
+    def release(self, key: str, execution_id: str) -> None:
+        if self._leaders.get(key, None) == execution_id:
+            del self._leaders[key]
+            self._resolve(execution_id, saved=False)
+
+    def mark_saved(self, key: str, execution_id: str) -> None:
+        if self._leaders.get(key, None) == execution_id:
+            self._resolve(execution_id, saved=True)
+
+    async def wait_saved(self, key: str, execution_id: str) -> bool:
+        if execution_id not in self._unsaved:
+            return self._leaders.get(key, None) == execution_id
+        future = self._saved_futures.get(execution_id, None)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._saved_futures[execution_id] = future
+        # a cancelled follower does not cancel the other followers' wait
+        return await asyncio.shield(future)
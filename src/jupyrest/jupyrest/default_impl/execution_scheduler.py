@@ -0,0 +1,235 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, Optional
+
+from ..contracts import NotebookExecutionScheduler, ExecutionSchedulerStats
+from ..error import ExecutionQueueFull, InvalidPriorityClass
+from ..notebook_config import NotebookConfig
+from ..notebook_execution.entity import NotebookExecution
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    notebook_id: str
+    max_concurrency: Optional[int]
+
+
+@dataclass
+class _Lane:
+    weight: int
+    # stride scheduling: the lane with the smallest pass goes next and
+    # each dispatch advances its pass by 1 / weight
+    pass_value: float = 0.0
+    waiters: Deque[_Waiter] = field(default_factory=deque)
+
+
+class DefaultNotebookExecutionScheduler(NotebookExecutionScheduler):
+    """
+    In-process scheduler that runs at most `max_concurrency` executions
+    at once and admits at most `max_queue_size` executions beyond the
+    free slots. Without `max_concurrency`, `max_queue_size` bounds the
+    executions that are admitted but not started. `None` means unbounded.
+
+    Waiting executions are grouped in priority lanes. Free slots are
+    shared between lanes in proportion to their weights, so a burst in
+    a low priority lane slows but does not starve a higher one. An
+    execution's lane comes from the request, then the notebook config,
+    then `default_priority`.
+
+    No notebook runs more than its config's `max_concurrency` (or
+    `max_concurrency_per_notebook`) executions at once.
+
+    Only executions completed in this process release their reservation,
+    so bounds should not be set when executions run elsewhere (e.g. an
+    Azure queue worker).
+    """
+
+    DEFAULT_PRIORITY_WEIGHTS = {"interactive": 4, "normal": 2, "batch": 1}
+    DEFAULT_PRIORITY = "normal"
+    # weight of the latest sample in the moving averages
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        priority_weights: Optional[Dict[str, int]] = None,
+        default_priority: Optional[str] = None,
+        max_concurrency_per_notebook: Optional[int] = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.max_concurrency_per_notebook = max_concurrency_per_notebook
+        weights = priority_weights or self.DEFAULT_PRIORITY_WEIGHTS
+        for name, weight in weights.items():
+            if weight <= 0:
+                raise ValueError(f"Weight of priority {name} must be positive, got {weight}")
+        self.default_priority = default_priority or (
+            self.DEFAULT_PRIORITY
+            if self.DEFAULT_PRIORITY in weights
+            else next(iter(weights))
+        )
+        if self.default_priority not in weights:
+            raise ValueError(f"Unknown default priority {self.default_priority}")
+        self._lanes: Dict[str, _Lane] = {
+            name: _Lane(weight=weight) for name, weight in weights.items()
+        }
+        self._virtual_time = 0.0
+        self._running = 0
+        self._running_by_notebook: Dict[str, int] = {}
+        # admitted executions that have not started yet, by execution id
+        self._admitted: Dict[str, str] = {}
+        self._average_wait_seconds = 0.0
+        self._average_run_seconds = 0.0
+
+    def _smooth(self, average: float, sample: float) -> float:
+        if average == 0.0:
+            return sample
+        return (1 - self.SMOOTHING) * average + self.SMOOTHING * sample
+
+    def _has_free_slot(self) -> bool:
+        return self.max_concurrency is None or self._running < self.max_concurrency
+
+    def get_priority(self, execution: NotebookExecution) -> str:
+        priority = execution.priority or self.default_priority
+        if priority not in self._lanes:
+            raise InvalidPriorityClass(
+                priority=priority, priority_classes=list(self._lanes.keys())
+            )
+        return priority
+
+    def _get_notebook_quota(self, notebook_config: NotebookConfig) -> Optional[int]:
+        quotas = [
+            quota
+            for quota in (notebook_config.max_concurrency, self.max_concurrency_per_notebook)
+            if quota is not None
+        ]
+        return min(quotas) if quotas else None
+
+    def get_retry_after_seconds(self) -> int:
+        slots = self.max_concurrency or 1
+        batches = (len(self._admitted) + 1) / slots
+        return max(1, math.ceil(self._average_run_seconds * batches))
+
+    def admit(self, execution: NotebookExecution) -> None:
+        priority = self.get_priority(execution)
+        if self.max_queue_size is not None:
+            free_slots = (
+                max(0, self.max_concurrency - self._running)
+                if self.max_concurrency is not None
+                else 0
+            )
+            if len(self._admitted) >= free_slots + self.max_queue_size:
+                raise ExecutionQueueFull(
+                    queue_depth=len(self._admitted),
+                    retry_after_seconds=self.get_retry_after_seconds(),
+                )
+        self._admitted[execution.execution_id] = priority
+
+    def withdraw(self, execution_id: str) -> None:
+        self._admitted.pop(execution_id, None)
+
+    def _is_eligible(self, waiter: _Waiter) -> bool:
+        return (
+            waiter.max_concurrency is None
+            or self._running_by_notebook.get(waiter.notebook_id, 0)
+            < waiter.max_concurrency
+        )
+
+    def _start(self, notebook_id: str):
+        self._running += 1
+        self._running_by_notebook[notebook_id] = (
+            self._running_by_notebook.get(notebook_id, 0) + 1
+        )
+
+    def _dispatch(self):
+        while self._has_free_slot():
+            candidate = None
+            for lane in self._lanes.values():
+                if candidate is not None and candidate[0].pass_value <= lane.pass_value:
+                    continue
+                waiter = next((w for w in lane.waiters if self._is_eligible(w)), None)
+                if waiter is not None:
+                    candidate = (lane, waiter)
+            if candidate is None:
+                return
+            lane, waiter = candidate
+            lane.waiters.remove(waiter)
+            self._virtual_time = lane.pass_value
+            lane.pass_value += 1 / lane.weight
+            self._start(waiter.notebook_id)
+            waiter.future.set_result(None)
+
+    async def _acquire(self, priority: str, notebook_id: str, max_concurrency: Optional[int]):
+        lane = self._lanes[priority]
+        if not lane.waiters:
+            # an idle lane does not bank credit while it has nothing to run
+            lane.pass_value = max(lane.pass_value, self._virtual_time)
+        waiter = _Waiter(
+            future=asyncio.get_running_loop().create_future(),
+            notebook_id=notebook_id,
+            max_concurrency=max_concurrency,
+        )
+        lane.waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # the slot was granted right before the cancellation
+                self._release(notebook_id)
+            else:
+                lane.waiters.remove(waiter)
+            raise
+
+    def _release(self, notebook_id: str):
+        self._running -= 1
+        self._running_by_notebook[notebook_id] -= 1
+        if self._running_by_notebook[notebook_id] == 0:
+            del self._running_by_notebook[notebook_id]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, execution: NotebookExecution, notebook_config: NotebookConfig):
+        notebook_id = execution.notebook_id
+        try:
+            await self._acquire(
+                priority=self._admitted.get(execution.execution_id, None)
+                or self.get_priority(execution),
+                notebook_id=notebook_id,
+                max_concurrency=self._get_notebook_quota(notebook_config),
+            )
+        finally:
+            self._admitted.pop(execution.execution_id, None)
+        wait_seconds = (datetime.utcnow() - execution.accepted_time).total_seconds()
+        self._average_wait_seconds = self._smooth(
+            self._average_wait_seconds, max(0.0, wait_seconds)
+        )
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._average_run_seconds = self._smooth(
+                self._average_run_seconds, time.monotonic() - start
+            )
+            self._release(notebook_id)
+
+    def get_stats(self) -> ExecutionSchedulerStats:
+        queued_by_priority = {name: 0 for name in self._lanes}
+        for priority in self._admitted.values():
+            queued_by_priority[priority] += 1
+        return ExecutionSchedulerStats(
+            running=self._running,
+            queued=len(self._admitted),
+            max_concurrency=self.max_concurrency,
+            max_queue_size=self.max_queue_size,
+            average_wait_seconds=self._average_wait_seconds,
+            average_run_seconds=self._average_run_seconds,
+            queued_by_priority=queued_by_priority,
+        )
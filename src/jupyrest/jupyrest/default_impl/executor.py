@@ -7,6 +7,8 @@ from nbclient.client import NotebookClient
 from nbclient.exceptions import CellExecutionError, CellTimeoutError
 import logging
 from ..contracts import NotebookExeuctor
+from ..nbschema import NotebookSchemaProcessor
+from ..notebook_config import JUPYREST_METADATA_KEY
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,11 @@ logger = logging.getLogger(__name__)
 
 
 class IPythonNotebookExecutor(NotebookExeuctor):
+    # run by executors that reuse kernels, before the kernel runs another notebook
+    UNSET_OUTPUT_PATH_CODE = (
+        f"__import__('os').environ.pop({NotebookSchemaProcessor.OUTPUT_PATH_ENV_VAR!r}, None)"
+    )
+
     def __init__(
         self, kernel_name="python3", timeout_seconds=600, language="python"
     ) -> None:
@@ -25,23 +32,46 @@ class IPythonNotebookExecutor(NotebookExeuctor):
     def get_kernelspec_language(self) -> str:
         return self._language
 
-    async def execute_notebook_async(self, notebook: NotebookNode) -> Optional[str]:
-        exception: Optional[str] = None
-        try:
-            await NotebookClient(
-                nb=notebook,
-                timeout=self._timeout_seconds,
-                kernel_name=self._kernel_name,
-                log=logger,
-            ).async_execute()
-        except CellExecutionError as cee:
+    def _new_notebook_client(self, notebook: NotebookNode, **kwargs) -> NotebookClient:
+        client = NotebookClient(
+            nb=notebook,
+            timeout=self._timeout_seconds,
+            kernel_name=self._kernel_name,
+            log=logger,
+            **kwargs,
+        )
+        metadata = notebook.metadata.get(JUPYREST_METADATA_KEY, {})
+        if metadata.get("output_path", None) is not None:
+            # kernels may be reused, so the variable is set in the
+            # running kernel rather than at startup
+            env_var = NotebookSchemaProcessor.OUTPUT_PATH_ENV_VAR
+            code = f"__import__('os').environ[{env_var!r}] = {metadata['output_path']!r}"
+
+            async def set_output_path(**kwargs):
+                reply = await client.kc.execute_interactive(
+                    code, silent=True, store_history=False, timeout=self._timeout_seconds
+                )
+                if reply["content"]["status"] != "ok":
+                    raise RuntimeError(f"Failed to set the output path: {reply['content']}")
+
+            client.on_notebook_start = set_output_path
+        return client
+
+    def _get_exception_message(self, error: Exception) -> Optional[str]:
+        if isinstance(error, CellExecutionError):
             # handle cases where the notebook calls sys.exit(0),
             # which is considered successful.
-            is_sys_exit_0 = cee.ename == "SystemExit" and (
-                cee.evalue == "" or cee.evalue == "0"
+            is_sys_exit_0 = error.ename == "SystemExit" and (
+                error.evalue == "" or error.evalue == "0"
             )
-            if not is_sys_exit_0:
-                exception = str(cee)
-        except CellTimeoutError as cte:
-            exception = str(cte)
+            if is_sys_exit_0:
+                return None
+        return str(error)
+
+    async def execute_notebook_async(self, notebook: NotebookNode) -> Optional[str]:
+        exception: Optional[str] = None
+        try:
+            await self._new_notebook_client(notebook).async_execute()
+        except (CellExecutionError, CellTimeoutError) as e:
+            exception = self._get_exception_message(e)
         return exception
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from ..contracts import NotebookResultCache
+from ..error import FileObjectNotFound
+from ..file_object import FileObjectClient
+from ..notebook_execution.entity import NotebookExecutionCompletionDetails
+
+
+class FileObjectNotebookResultCache(NotebookResultCache):
+    """
+    Stores results as file objects under `prefix`, so they are shared by
+    every process using the same storage (e.g. an Azure blob container).
+    Expired entries are ignored and overwritten; there is no size bound.
+    """
+
+    def __init__(self, file_obj_client: FileObjectClient, prefix: str = "result_cache") -> None:
+        self.file_obj_client = file_obj_client
+        self.prefix = prefix
+
+    def _get_file_object(self, key: str):
+        return self.file_obj_client.new_file_object(path=f"{self.prefix}/{key}.json")
+
+    async def get(self, key: str) -> Optional[NotebookExecutionCompletionDetails]:
+        try:
+            content = await self.file_obj_client.get_content(
+                file_object=self._get_file_object(key)
+            )
+        except FileObjectNotFound:
+            return None
+        entry = json.loads(content)
+        expires_at = entry["expires_at"]
+        if expires_at is not None and datetime.fromisoformat(expires_at) <= datetime.utcnow():
+            return None
+        return NotebookExecutionCompletionDetails.parse_raw(entry["completion_details"])
+
+    async def set(
+        self,
+        key: str,
+        completion_details: NotebookExecutionCompletionDetails,
+        ttl_seconds: Optional[int],
+    ) -> None:
+        expires_at = (
+            (datetime.utcnow() + timedelta(seconds=ttl_seconds)).isoformat()
+            if ttl_seconds is not None
+            else None
+        )
+        content = json.dumps(
+            dict(expires_at=expires_at, completion_details=completion_details.json())
+        )
+        await self.file_obj_client.set_content(self._get_file_object(key), content)
+
+    async def delete(self, key: str) -> None:
+        # file object clients cannot delete, an entry that expired
+        # right away is ignored by get
+        content = json.dumps(dict(expires_at=datetime.min.isoformat(), completion_details=None))
+        await self.file_obj_client.set_content(self._get_file_object(key), content)
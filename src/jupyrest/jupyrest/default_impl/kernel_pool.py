@@ -0,0 +1,209 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+from jupyter_client.manager import AsyncKernelManager
+
+logger = logging.getLogger(__name__)
+
+
+class KernelPool:
+    """
+    Keeps a set of pre-started kernels so executions do not pay for
+    kernel process startup.
+
+    `min_size` kernels are kept idle and ready. The pool never has
+    more than `max_size` kernels alive at once (idle + in use +
+    starting); `acquire` waits when that limit is reached.
+    Dead kernels are dropped on acquire, on release and by a periodic
+    health check, and replaced in the background. Kernels that have
+    been acquired `max_uses` times are replaced instead of reused.
+    """
+
+    # nbclient starts kernels with an in-memory history database,
+    # do the same so pooled kernels behave like cold ones.
+    KERNEL_EXTRA_ARGUMENTS = ["--HistoryManager.hist_file=:memory:"]
+
+    def __init__(
+        self,
+        kernel_name: str = "python3",
+        min_size: int = 1,
+        max_size: int = 4,
+        health_check_interval_seconds: Optional[float] = 30,
+        max_uses: Optional[int] = None,
+    ) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, max_size={max_size}"
+            )
+        self.kernel_name = kernel_name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.max_uses = max_uses
+        # number of times each kernel was acquired, by kernel id
+        self._uses: Dict[str, int] = {}
+        self._idle: List[AsyncKernelManager] = []
+        # kernels that are alive or starting, whether idle or in use
+        self._size = 0
+        self._starting = 0
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._health_check_task: Optional[asyncio.Task] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._closed = False
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _get_condition(self) -> asyncio.Condition:
+        # created lazily so the pool can be constructed outside of an event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _start_kernel(self) -> AsyncKernelManager:
+        km = AsyncKernelManager(kernel_name=self.kernel_name)
+        await km.start_kernel(extra_arguments=list(self.KERNEL_EXTRA_ARGUMENTS))
+        return km
+
+    async def _is_healthy(self, km: AsyncKernelManager) -> bool:
+        try:
+            return await km.is_alive()
+        except Exception:
+            logger.exception("Kernel health check failed")
+            return False
+
+    async def _shutdown_kernel(self, km: AsyncKernelManager) -> None:
+        try:
+            await km.shutdown_kernel(now=True)
+        except Exception:
+            logger.exception("Failed to shut down pooled kernel")
+
+    async def _discard(self, km: AsyncKernelManager) -> None:
+        self._size -= 1
+        self._uses.pop(km.kernel_id, None)
+        await self._shutdown_kernel(km)
+        condition = self._get_condition()
+        async with condition:
+            condition.notify()
+        self._replenish()
+
+    async def _add_warm_kernel(self) -> None:
+        km: Optional[AsyncKernelManager] = None
+        try:
+            km = await self._start_kernel()
+        except Exception:
+            logger.exception("Failed to start pooled kernel")
+        if km is not None and self._closed:
+            await self._shutdown_kernel(km)
+            km = None
+        condition = self._get_condition()
+        async with condition:
+            self._starting -= 1
+            if km is None:
+                self._size -= 1
+            else:
+                self._idle.append(km)
+            condition.notify()
+
+    def _replenish(self) -> None:
+        if self._closed:
+            return
+        while (
+            len(self._idle) + self._starting < self.min_size
+            and self._size < self.max_size
+        ):
+            self._size += 1
+            self._starting += 1
+            self._spawn(self._add_warm_kernel())
+        if (
+            self.health_check_interval_seconds is not None
+            and self._health_check_task is None
+        ):
+            self._health_check_task = asyncio.ensure_future(self._health_check_loop())
+
+    async def _health_check_loop(self) -> None:
+        assert self.health_check_interval_seconds is not None
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval_seconds)
+            for km in list(self._idle):
+                if not await self._is_healthy(km) and km in self._idle:
+                    logger.warning("Replacing dead pooled kernel %s", km.kernel_id)
+                    self._idle.remove(km)
+                    await self._discard(km)
+
+    async def start(self) -> None:
+        """Start `min_size` kernels and wait for them to be ready."""
+        self._replenish()
+        await asyncio.gather(*self._background_tasks)
+
+    async def acquire(self) -> AsyncKernelManager:
+        """Take a healthy kernel out of the pool, starting one if needed."""
+        if self._closed:
+            raise RuntimeError("Kernel pool is closed")
+        condition = self._get_condition()
+        self._replenish()
+        while True:
+            start_new = False
+            async with condition:
+                # prefer waiting on a kernel that is already warming up
+                # over starting another one
+                while not self._idle and (
+                    self._size >= self.max_size or self._starting > 0
+                ):
+                    await condition.wait()
+                if self._idle:
+                    km = self._idle.pop()
+                else:
+                    self._size += 1
+                    start_new = True
+            if start_new:
+                try:
+                    km = await self._start_kernel()
+                except Exception:
+                    self._size -= 1
+                    raise
+            if await self._is_healthy(km):
+                self._uses[km.kernel_id] = self._uses.get(km.kernel_id, 0) + 1
+                self._replenish()
+                return km
+            logger.warning("Replacing dead pooled kernel %s", km.kernel_id)
+            await self._discard(km)
+
+    async def release(self, km: AsyncKernelManager, reuse: bool) -> None:
+        """Give a kernel back to the pool. Kernels that are not
+        reusable (or are dead) are shut down and replaced.
+        """
+        if self.max_uses is not None and self._uses.get(km.kernel_id, 0) >= self.max_uses:
+            reuse = False
+        if reuse and not self._closed and await self._is_healthy(km):
+            condition = self._get_condition()
+            async with condition:
+                self._idle.append(km)
+                condition.notify()
+        else:
+            self._spawn(self._discard(km))
+
+    async def shutdown(self) -> None:
+        """Shut down every idle kernel. Kernels that are in use
+        are shut down when they are released.
+        """
+        self._closed = True
+        if self._health_check_task is not None:
+            self._health_check_task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        self._size -= len(idle)
+        for km in idle:
+            self._uses.pop(km.kernel_id, None)
+        await asyncio.gather(*(self._shutdown_kernel(km) for km in idle))
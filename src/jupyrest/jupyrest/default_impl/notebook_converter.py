@@ -1,3 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Tuple
+
 from nbformat import NO_CONVERT, writes
 from nbformat.notebooknode import NotebookNode
 from nbconvert import HTMLExporter
@@ -6,19 +11,93 @@ from nbconvert import HTMLExporter
 from ..contracts import NotebookConverter
 from ..nbschema import NbSchemaEncoder
 
+
+ExporterKey = Tuple[bool, Optional[str]]
+
+
+class _ExporterPool:
+    """
+    Keeps initialized HTMLExporters (templates, resources and
+    preprocessors already loaded) for reuse. An exporter is only ever
+    used by one render at a time; concurrent renders with the same
+    configuration get separate instances.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._idle: Dict[ExporterKey, List[HTMLExporter]] = {}
+
+    def _new_exporter(self, key: ExporterKey) -> HTMLExporter:
+        report_mode, template_name = key
+        kwargs = {}
+        if template_name is not None:
+            kwargs["template_name"] = template_name
+        if report_mode:
+            kwargs.update(exclude_output_prompt=True, exclude_input=True)
+        return HTMLExporter(**kwargs)
+
+    def render(self, notebook: NotebookNode, key: ExporterKey) -> str:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            exporter = idle.pop() if idle else None
+        if exporter is None:
+            exporter = self._new_exporter(key)
+        (body, _) = exporter.from_notebook_node(notebook)
+        # only exporters that rendered successfully are reused
+        with self._lock:
+            self._idle[key].append(exporter)
+        return body
+
+
+# one pool per process
+_exporter_pool = _ExporterPool()
+
+
+# Rendering is done by module level functions so that it can run
+# in a ProcessPoolExecutor as well as a ThreadPoolExecutor.
+
+def _render_html(
+    notebook: NotebookNode, report_mode: bool, template_name: Optional[str] = None
+) -> str:
+    return _exporter_pool.render(notebook=notebook, key=(report_mode, template_name))
+
+
+def _render_str(notebook: NotebookNode) -> str:
+    return writes(
+        notebook, version=NO_CONVERT, cls=NbSchemaEncoder
+    )
+
+
 class DefaultNotebookConverter(NotebookConverter):
 
+    def __init__(
+        self, executor: Optional[Executor] = None, template_name: Optional[str] = None
+    ) -> None:
+        # async conversions run on this executor so they do not block
+        # the event loop. None uses the event loop's default thread pool.
+        self.executor = executor
+        # nbconvert HTML template, e.g. "lab" (the default) or "classic"
+        self.template_name = template_name
+
     def convert_notebook_to_html(self,
                                 notebook: NotebookNode,
                                 report_mode: bool) -> str:
-        exporter = HTMLExporter()
-        if report_mode:
-            exporter = HTMLExporter(exclude_output_prompt=True, exclude_input=True)
-        (body, _) = exporter.from_notebook_node(notebook)
-        return body
+        return _render_html(
+            notebook=notebook, report_mode=report_mode, template_name=self.template_name
+        )
 
 
     def convert_notebook_to_str(self, notebook: NotebookNode) -> str:
-        return writes(
-            notebook, version=NO_CONVERT, cls=NbSchemaEncoder
-        )
\ No newline at end of file
+        return _render_str(notebook=notebook)
+
+    async def convert_notebook_to_html_async(self,
+                                            notebook: NotebookNode,
+                                            report_mode: bool) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _render_html, notebook, report_mode, self.template_name
+        )
+
+    async def convert_notebook_to_str_async(self, notebook: NotebookNode) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _render_str, notebook)
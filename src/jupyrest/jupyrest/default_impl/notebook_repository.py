@@ -1,10 +1,11 @@
 from pathlib import Path
-from typing import Dict
+from typing import AsyncIterator, Dict
 
 from ..contracts import NotebookRepository
 from ..nbschema import NotebookSchemaProcessor
 from ..notebook_config import NotebookConfig, NotebookConfigFile
-from ..error import NotebookNotFound
+from ..error import NotebookNotFound, InvalidNotebookConfig
+from jsonschema.exceptions import SchemaError
 
 class DefaultNotebookRepository(NotebookRepository):
 
@@ -18,6 +19,7 @@ class DefaultNotebookRepository(NotebookRepository):
 
     def refresh(self):
         self._configs.clear()
+        self.nbschema.clear_compiled_schemas()
         config_paths = list(self.notebooks_dir.glob("**/*.config.json"))
         for config_path in config_paths:
             notebook_path = self.get_notebook_path_from_config_path(
@@ -47,8 +49,22 @@ class DefaultNotebookRepository(NotebookRepository):
             input=notebook_config_file.input,
             output=notebook_config_file.output,
             resolved_input_schema=resolved_input,
-            resolved_output_schema=resolved_output
+            resolved_output_schema=resolved_output,
+            preload_modules=notebook_config_file.preload_modules,
+            priority=notebook_config_file.priority,
+            max_concurrency=notebook_config_file.max_concurrency,
+            artifacts=notebook_config_file.artifacts,
+            coalesce=notebook_config_file.coalesce,
+            cache=notebook_config_file.cache,
         )
+        # checked once here so invalid schemas fail at startup and
+        # requests reuse the compiled validators
+        try:
+            self.nbschema.compile_schema(notebook_config.resolved_input_schema)
+            self.nbschema.compile_schema(notebook_config.resolved_output_schema)
+            self.nbschema.compile_injection_plan(notebook_config.input)
+        except SchemaError as se:
+            raise InvalidNotebookConfig(notebook_id=notebook_id, details=se.message) from se
         return notebook_config
 
     async def get(self, notebook_id: str) -> NotebookConfig:
@@ -57,6 +73,6 @@ class DefaultNotebookRepository(NotebookRepository):
         else:
             raise NotebookNotFound(notebook_id=notebook_id) 
 
-    async def iter_notebook_ids(self):
+    async def iter_notebook_ids(self) -> AsyncIterator[str]:
         for notebook_id in self._configs.keys():
             yield notebook_id
\ No newline at end of file
@@ -1,34 +1,61 @@
-from copy import deepcopy
 from typing import Dict, Any
+import logging
 
-from papermill.parameterize import parameterize_notebook as papermill_parameterize_notebook
+import nbformat
+from papermill.translators import translate_parameters
+from papermill.utils import nb_kernel_name, nb_language
 from nbformat.notebooknode import NotebookNode
 
 from ..contracts import NotebookParameterizier
 from ..nbschema import NotebookSchemaProcessor
-from ..notebook_config import NotebookConfig
+from ..notebook_config import NotebookConfig, JUPYREST_METADATA_KEY
+
+logger = logging.getLogger(__name__)
 
 
 class DefaultNotebookParameterizier(NotebookParameterizier):
+    """
+    Inserts a papermill compatible `injected-parameters` cell into a
+    copy of the notebook config's cached template: after the cell
+    tagged `parameters`, in place of an existing `injected-parameters`
+    cell, or at the top of the notebook.
+    """
 
     def __init__(self, nbschema: NotebookSchemaProcessor, kernelspec_language: str) -> None:
         self.nbschema = nbschema
         self.kernelspec_language = kernelspec_language
 
+    def _new_parameters_cell(self, notebook: NotebookNode, parameters: Dict[str, Any]) -> NotebookNode:
+        # same as papermill's parameterize_notebook
+        param_content = translate_parameters(
+            nb_kernel_name(notebook), nb_language(notebook), parameters, "Parameters"
+        )
+        new_cell = nbformat.v4.new_code_cell(source=param_content)
+        new_cell.metadata["tags"] = ["injected-parameters"]
+        return new_cell
+
     def parameterize_notebook(
         self, notebook_config: NotebookConfig, parameters: Dict[str, Any]
     ) -> NotebookNode:
-        parameters_copy = deepcopy(parameters)
-        input_schema = notebook_config.input
-        parameters_copy = self.nbschema.inject_model_refs(input_schema, parameters_copy)
-        notebook = notebook_config.load_notebook_node()
-        # Parameterize notebooks with papermill, then fix it so it can work in jupyrest
+        # returns a copy where models are injected, parameters is not modified
+        parameters_copy = self.nbschema.inject_model_refs(notebook_config.input, parameters)
+        template = notebook_config.get_template()
+        notebook = template.new_notebook()
         if "language" not in notebook.metadata.kernelspec:
             notebook.metadata.kernelspec["language"] = self.kernelspec_language
-        # Papermill will do a deepcopy of the input notebook and
-        # return the copy with the parameter cell
-        new_notebook = papermill_parameterize_notebook(nb=notebook, parameters=parameters_copy)
-        # Fix papermill's parameters metadata.
-        # We reset the parameters to the original parameters prior to inject_model_refs
-        new_notebook.metadata.papermill.parameters = parameters
-        return new_notebook
\ No newline at end of file
+        new_cell = self._new_parameters_cell(notebook=notebook, parameters=parameters_copy)
+        if template.injected_parameters_cell_index >= 0:
+            notebook.cells[template.injected_parameters_cell_index] = new_cell
+        elif template.parameters_cell_index >= 0:
+            notebook.cells.insert(template.parameters_cell_index + 1, new_cell)
+        else:
+            logger.warning("Input notebook does not contain a cell with tag 'parameters'")
+            notebook.cells.insert(0, new_cell)
+        # papermill metadata records the original parameters, prior to inject_model_refs
+        notebook.metadata.papermill["parameters"] = parameters
+        # read by executors during the execution, removed before the notebook is stored
+        notebook.metadata[JUPYREST_METADATA_KEY] = {
+            "notebook_id": notebook_config.id,
+            "notebook_hash": template.content_hash,
+        }
+        return notebook
@@ -0,0 +1,100 @@
+from typing import Optional
+import logging
+
+from nbformat.notebooknode import NotebookNode
+from jupyter_client.manager import AsyncKernelManager
+from nbclient.exceptions import CellExecutionError, CellTimeoutError
+
+from .executor import IPythonNotebookExecutor
+from .kernel_pool import KernelPool
+
+logger = logging.getLogger(__name__)
+
+
+class PooledIPythonNotebookExecutor(IPythonNotebookExecutor):
+    """
+    Executes notebooks on kernels taken from a KernelPool instead of
+    starting a new kernel for every execution.
+
+    By default a kernel is used for a single execution and a fresh one
+    is warmed up in the background to replace it. With `reuse_kernels`
+    the kernel's namespace is reset and the kernel goes back to the pool;
+    this is faster but state outside of the user namespace (imported
+    modules, environment variables, working directory) carries over
+    between executions. With `max_kernel_uses` a reused kernel is
+    replaced after that many executions.
+    """
+
+    RESET_CODE = "get_ipython().reset(new_session=True, aggressive=False)"
+
+    def __init__(
+        self,
+        kernel_name="python3",
+        timeout_seconds=600,
+        language="python",
+        min_pool_size=1,
+        max_pool_size=4,
+        reuse_kernels=False,
+        health_check_interval_seconds: Optional[float] = 30,
+        max_kernel_uses: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            kernel_name=kernel_name, timeout_seconds=timeout_seconds, language=language
+        )
+        self.reuse_kernels = reuse_kernels
+        self.pool = KernelPool(
+            kernel_name=kernel_name,
+            min_size=min_pool_size,
+            max_size=max_pool_size,
+            health_check_interval_seconds=health_check_interval_seconds,
+            max_uses=max_kernel_uses,
+        )
+
+    async def start(self) -> None:
+        await self.pool.start()
+
+    async def shutdown(self) -> None:
+        await self.pool.shutdown()
+
+    async def _reset_kernel(self, km: AsyncKernelManager) -> bool:
+        kc = km.client()
+        kc.start_channels()
+        try:
+            await kc.wait_for_ready(timeout=self._timeout_seconds)
+            reply = await kc.execute_interactive(
+                f"{self.RESET_CODE}\n{self.UNSET_OUTPUT_PATH_CODE}",
+                silent=True,
+                store_history=False,
+                timeout=self._timeout_seconds,
+            )
+            return reply["content"]["status"] == "ok"
+        except Exception:
+            logger.exception(f"Failed to reset kernel {km.kernel_id}")
+            return False
+        finally:
+            kc.stop_channels()
+
+    async def execute_notebook_async(self, notebook: NotebookNode) -> Optional[str]:
+        km = await self.pool.acquire()
+        reuse = False
+        try:
+            exception: Optional[str] = None
+            timed_out = False
+            client = self._new_notebook_client(notebook, km=km)
+            try:
+                await client.async_execute()
+            except CellTimeoutError as cte:
+                timed_out = True
+                exception = self._get_exception_message(cte)
+            except CellExecutionError as cee:
+                exception = self._get_exception_message(cee)
+            finally:
+                # the client does not clean up kernel managers it does not own
+                if client.kc is not None:
+                    client.kc.stop_channels()
+            # a cell that timed out may still be running, never reuse that kernel
+            if self.reuse_kernels and not timed_out:
+                reuse = await self._reset_kernel(km)
+            return exception
+        finally:
+            await self.pool.release(km, reuse=reuse)
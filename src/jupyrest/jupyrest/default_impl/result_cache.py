@@ -0,0 +1,41 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from ..contracts import NotebookResultCache
+from ..notebook_execution.entity import NotebookExecutionCompletionDetails
+
+
+class LRUNotebookResultCache(NotebookResultCache):
+    """Keeps the `max_entries` most recently used results in process memory."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        # key -> (expiry as time.monotonic(), completion details)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], NotebookExecutionCompletionDetails]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[NotebookExecutionCompletionDetails]:
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+        expires_at, completion_details = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return completion_details.copy(deep=True)
+
+    async def set(
+        self,
+        key: str,
+        completion_details: NotebookExecutionCompletionDetails,
+        ttl_seconds: Optional[int],
+    ) -> None:
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        self._entries[key] = (expires_at, completion_details.copy(deep=True))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
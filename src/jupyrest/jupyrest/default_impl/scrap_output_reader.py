@@ -0,0 +1,44 @@
+import json
+from typing import Any, Optional
+
+from nbformat.notebooknode import NotebookNode
+
+from ..contracts import NotebookOutputReader
+from ..nbschema import NotebookSchemaProcessor, OutputResult
+
+# mimetype prefix of the outputs scrapbook's glue() creates
+SCRAP_MIMETYPE_PREFIX = "application/scrapbook.scrap."
+
+
+class ScrapNotebookOutputReader(NotebookOutputReader):
+    """
+    Reads the output saved by `save_output` without scrapbook's
+    read_notebook, which decodes every scrap of every cell. Outputs are
+    scanned from the end of the notebook and only the last
+    `nbschema_outputs` scrap is decoded, the same scrap read_notebook
+    would return.
+    """
+
+    def __init__(self, nbschema: NotebookSchemaProcessor) -> None:
+        self.nbschema = nbschema
+
+    def _find_scrap(self, notebook: NotebookNode) -> Optional[Any]:
+        for cell in reversed(notebook.cells):
+            for output in reversed(cell.get("outputs", [])):
+                for mimetype, payload in output.get("data", {}).items():
+                    if (
+                        mimetype.startswith(SCRAP_MIMETYPE_PREFIX)
+                        and isinstance(payload, dict)
+                        and payload.get("name", None) == self.nbschema.OUTPUTS_KEY
+                    ):
+                        return payload
+        return None
+
+    def get_output(self, notebook: NotebookNode) -> OutputResult:
+        payload = self._find_scrap(notebook=notebook)
+        if payload is None:
+            return OutputResult(present=False, json_str="")
+        data = payload.get("data", None)
+        # save_output glues strings, which scrapbook stores as is
+        json_str = data if payload.get("encoder", None) == "text" else json.dumps(data)
+        return OutputResult(present=True, json_str=json_str)
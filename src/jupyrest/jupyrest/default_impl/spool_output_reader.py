@@ -0,0 +1,56 @@
+import logging
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from nbformat.notebooknode import NotebookNode
+
+from ..contracts import NotebookOutputReader
+from ..nbschema import OutputResult
+from ..notebook_config import JUPYREST_METADATA_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolNotebookOutputReader(NotebookOutputReader):
+    """
+    Gives every execution its own file in `spool_dir`. `save_output`
+    writes the output to that file instead of gluing it into the
+    notebook, so large outputs are not copied into the ipynb and html
+    artifacts. Kernels must run on this machine.
+
+    Outputs saved into the notebook anyway (e.g. by kernels that were
+    not told about the file) are read by `notebook_output_reader`.
+    """
+
+    def __init__(self, spool_dir: Path, notebook_output_reader: NotebookOutputReader) -> None:
+        # kernels may run in another working directory
+        self.spool_dir = Path(spool_dir).resolve()
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.notebook_output_reader = notebook_output_reader
+
+    def _get_output_path(self, notebook: NotebookNode) -> Optional[Path]:
+        output_path = notebook.metadata.get(JUPYREST_METADATA_KEY, {}).get("output_path", None)
+        return Path(output_path) if output_path is not None else None
+
+    def prepare_notebook(self, notebook: NotebookNode) -> None:
+        output_path = self.spool_dir / f"{uuid4().hex}.json"
+        notebook.metadata.setdefault(JUPYREST_METADATA_KEY, {})["output_path"] = str(output_path)
+
+    def get_output(self, notebook: NotebookNode) -> OutputResult:
+        output_path = self._get_output_path(notebook=notebook)
+        if output_path is not None and output_path.exists():
+            return OutputResult(present=True, json_str=output_path.read_text(encoding="utf-8"))
+        return self.notebook_output_reader.get_output(notebook=notebook)
+
+    def release_notebook(self, notebook: NotebookNode) -> None:
+        output_path = self._get_output_path(notebook=notebook)
+        if output_path is None:
+            return
+        # the path is only meaningful during the execution
+        del notebook.metadata[JUPYREST_METADATA_KEY]["output_path"]
+        for path in (output_path, Path(f"{output_path}.tmp")):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                logger.exception(f"Failed to remove spooled output {path}")
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import nbformat
+from nbformat.notebooknode import NotebookNode
+from jupyter_client.manager import AsyncKernelManager
+from nbclient.exceptions import CellExecutionError, CellTimeoutError
+
+from ..notebook_config import JUPYREST_METADATA_KEY
+from .executor import IPythonNotebookExecutor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _StickyKernel:
+    km: AsyncKernelManager
+    # hash of the notebook and prelude cells the kernel was primed with
+    fingerprint: str
+    # outputs and execution counts of the prelude cells, in cell order
+    prelude_outputs: List[NotebookNode]
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class StickyKernelNotebookExecutor(IPythonNotebookExecutor):
+    """
+    Keeps one kernel per notebook id with the notebook's prelude cells
+    (code cells tagged `jupyrest-prelude`) already executed.
+
+    Later executions of that notebook skip the prelude cells and run the
+    remaining cells in a namespace that is reset to the state right
+    after the prelude. The reset is shallow: objects created by the
+    prelude are shared between executions and should be treated as
+    read-only. Prelude cells must not depend on parameters.
+
+    A kernel is discarded and primed again when the notebook file
+    changes, and can be discarded explicitly with `invalidate`. All
+    kernels are shut down with the executor.
+    Notebooks without prelude cells, and executions that arrive while
+    the notebook's kernel is busy, run on a fresh kernel.
+    """
+
+    PRELUDE_TAG = "jupyrest-prelude"
+    SNAPSHOT_CODE = (
+        "setattr(get_ipython(), '_jupyrest_prelude_ns', dict(get_ipython().user_ns))"
+    )
+    RESTORE_CODE = (
+        "(lambda ip: (ip.user_ns.clear(), ip.user_ns.update(ip._jupyrest_prelude_ns)))"
+        "(get_ipython())"
+    )
+
+    def __init__(
+        self, kernel_name="python3", timeout_seconds=600, language="python", max_kernels=16
+    ) -> None:
+        super().__init__(
+            kernel_name=kernel_name, timeout_seconds=timeout_seconds, language=language
+        )
+        self.max_kernels = max_kernels
+        self._kernels: "OrderedDict[str, _StickyKernel]" = OrderedDict()
+        self._priming_locks: Dict[str, asyncio.Lock] = {}
+
+    def _get_prelude_cells(self, notebook: NotebookNode) -> List[NotebookNode]:
+        return [
+            cell
+            for cell in notebook.cells
+            if cell.cell_type == "code"
+            and self.PRELUDE_TAG in cell.get("metadata", {}).get("tags", [])
+        ]
+
+    def _get_fingerprint(self, notebook: NotebookNode, prelude_cells: List[NotebookNode]) -> str:
+        h = hashlib.sha256(self._kernel_name.encode())
+        # the parameterizer records the hash of the notebook file, so
+        # a changed notebook is primed again even if the prelude is not
+        notebook_hash = notebook.metadata.get(JUPYREST_METADATA_KEY, {}).get("notebook_hash", "")
+        h.update(b"\0")
+        h.update(notebook_hash.encode())
+        for cell in prelude_cells:
+            h.update(b"\0")
+            h.update(cell.source.encode())
+        return h.hexdigest()
+
+    async def _run_code(self, km: AsyncKernelManager, code: str):
+        kc = km.client()
+        kc.start_channels()
+        try:
+            await kc.wait_for_ready(timeout=self._timeout_seconds)
+            reply = await kc.execute_interactive(
+                code, silent=True, store_history=False, timeout=self._timeout_seconds
+            )
+            if reply["content"]["status"] != "ok":
+                raise RuntimeError(
+                    f"Kernel {km.kernel_id} failed to run {code!r}: {reply['content']}"
+                )
+        finally:
+            kc.stop_channels()
+
+    async def _shutdown(self, km: AsyncKernelManager):
+        try:
+            await km.shutdown_kernel(now=True)
+        except Exception:
+            logger.exception(f"Failed to shut down kernel {km.kernel_id}")
+
+    async def _start_sticky_kernel(
+        self, notebook: NotebookNode, prelude_cells: List[NotebookNode], fingerprint: str
+    ) -> Optional[_StickyKernel]:
+        km = AsyncKernelManager(kernel_name=self._kernel_name)
+        prelude_notebook = nbformat.v4.new_notebook(
+            metadata=deepcopy(notebook.metadata), cells=deepcopy(prelude_cells)
+        )
+        client = self._new_notebook_client(prelude_notebook, km=km)
+        try:
+            await client.async_execute()
+            await self._run_code(km, self.SNAPSHOT_CODE)
+        except Exception:
+            # let the regular execution path run and report the error
+            logger.exception("Failed to execute prelude cells")
+            await self._shutdown(km)
+            return None
+        finally:
+            if client.kc is not None:
+                client.kc.stop_channels()
+        return _StickyKernel(
+            km=km, fingerprint=fingerprint, prelude_outputs=prelude_notebook.cells
+        )
+
+    async def invalidate(self, notebook_id: str):
+        """Discard the kernel kept for `notebook_id`, e.g. after the notebook changed."""
+        kernel = self._kernels.pop(notebook_id, None)
+        if kernel is not None:
+            async with kernel.lock:
+                await self._shutdown(kernel.km)
+
+    async def shutdown(self):
+        for notebook_id in list(self._kernels.keys()):
+            await self.invalidate(notebook_id)
+
+    async def _get_sticky_kernel(
+        self, notebook_id: str, notebook: NotebookNode, prelude_cells: List[NotebookNode]
+    ) -> Optional[_StickyKernel]:
+        fingerprint = self._get_fingerprint(notebook, prelude_cells)
+        priming_lock = self._priming_locks.setdefault(notebook_id, asyncio.Lock())
+        async with priming_lock:
+            kernel = self._kernels.get(notebook_id, None)
+            if kernel is not None and not kernel.lock.locked():
+                if kernel.fingerprint != fingerprint or not await kernel.km.is_alive():
+                    await self.invalidate(notebook_id)
+                    kernel = None
+            if kernel is None:
+                kernel = await self._start_sticky_kernel(
+                    notebook, prelude_cells, fingerprint
+                )
+                if kernel is None:
+                    return None
+                self._kernels[notebook_id] = kernel
+                while len(self._kernels) > self.max_kernels:
+                    await self.invalidate(next(iter(self._kernels)))
+            self._kernels.move_to_end(notebook_id)
+            return kernel
+
+    async def execute_notebook_async(self, notebook: NotebookNode) -> Optional[str]:
+        notebook_id = notebook.metadata.get(JUPYREST_METADATA_KEY, {}).get(
+            "notebook_id", None
+        )
+        prelude_cells = self._get_prelude_cells(notebook)
+        if notebook_id is None or len(prelude_cells) == 0:
+            return await super().execute_notebook_async(notebook)
+        kernel = await self._get_sticky_kernel(notebook_id, notebook, prelude_cells)
+        if kernel is None or kernel.lock.locked():
+            return await super().execute_notebook_async(notebook)
+        async with kernel.lock:
+            exception: Optional[str] = None
+            keep_kernel = True
+            client = self._new_notebook_client(
+                notebook, km=kernel.km, skip_cells_with_tag=self.PRELUDE_TAG
+            )
+            try:
+                await self._run_code(kernel.km, self.RESTORE_CODE)
+                await client.async_execute()
+            except CellTimeoutError as cte:
+                # the timed out cell may still be running
+                keep_kernel = False
+                exception = self._get_exception_message(cte)
+            except CellExecutionError as cee:
+                exception = self._get_exception_message(cee)
+            except Exception:
+                keep_kernel = False
+                raise
+            finally:
+                if client.kc is not None:
+                    client.kc.stop_channels()
+                if keep_kernel:
+                    try:
+                        await self._run_code(kernel.km, self.UNSET_OUTPUT_PATH_CODE)
+                    except Exception:
+                        logger.exception(f"Failed to reset kernel {kernel.km.kernel_id}")
+                        keep_kernel = False
+                if not keep_kernel:
+                    if self._kernels.get(notebook_id, None) is kernel:
+                        del self._kernels[notebook_id]
+                    await self._shutdown(kernel.km)
+        for cell, executed in zip(prelude_cells, kernel.prelude_outputs):
+            cell.outputs = deepcopy(executed.outputs)
+            cell.execution_count = executed.execution_count
+        return exception
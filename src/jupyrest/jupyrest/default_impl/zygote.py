@@ -0,0 +1,295 @@
+"""
+Fork based kernel launching.
+
+A zygote is a template python process that imports ipykernel and a
+list of preloaded modules once. Every kernel is then a forked child of
+that process, so it starts with those modules already imported
+(copy-on-write) instead of paying for a cold `python -m ipykernel` start.
+
+Running this module starts the zygote process itself:
+
+    python -m jupyrest.default_impl.zygote --status-dir /tmp/statuses pandas numpy
+
+It reads one JSON request per line from stdin and answers each with
+one JSON line on stdout. The zygote reaps the kernels it forks and
+writes each one's exit code to a file named after its pid in the
+status directory.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import uuid
+from typing import Any, Dict, List, Optional
+
+from jupyter_client.manager import AsyncKernelManager
+from jupyter_client.provisioning import LocalProvisioner
+
+logger = logging.getLogger(__name__)
+
+
+class KernelZygoteError(Exception):
+    pass
+
+
+def _run_forked_kernel(connection_file: str, env: Dict[str, str], cwd: Optional[str]):
+    # detach from the zygote's process group so signals sent to the
+    # kernel's group do not reach the zygote, and keep the zygote's
+    # stdin/stdout protocol pipes away from the kernel.
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    os.environ.clear()
+    os.environ.update(env)
+    # the kernel should exit when the zygote goes away
+    os.environ["JPY_PARENT_PID"] = str(os.getppid())
+    if cwd:
+        os.chdir(cwd)
+    from ipykernel.kernelapp import IPKernelApp
+
+    sys.argv = [sys.executable, "-f", connection_file]
+    IPKernelApp.launch_instance(argv=["-f", connection_file])
+
+
+def _write_exit_status(status_dir: str, pid: int, returncode: int):
+    path = os.path.join(status_dir, str(pid))
+    with open(path + ".tmp", "w") as f:
+        f.write(str(returncode))
+    os.replace(path + ".tmp", path)
+
+
+def _reap_children(status_dir: str):
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        _write_exit_status(status_dir, pid, os.waitstatus_to_exitcode(status))
+
+
+def _serve(preload_modules: List[str], status_dir: str):
+    import ipykernel.kernelapp  # noqa: F401
+
+    for module in preload_modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            print(f"jupyrest zygote: failed to preload {module}", file=sys.stderr)
+            traceback.print_exc()
+    signal.signal(signal.SIGCHLD, lambda signum, frame: _reap_children(status_dir))
+    stdout = sys.stdout
+    stdout.write(json.dumps({"ready": True}) + "\n")
+    stdout.flush()
+    for line in sys.stdin:
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_forked_kernel(
+                    connection_file=request["connection_file"],
+                    env=request["env"],
+                    cwd=request.get("cwd"),
+                )
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(0)
+        stdout.write(json.dumps({"pid": pid}) + "\n")
+        stdout.flush()
+
+
+class KernelZygote:
+    """
+    Client side of a zygote process. The process is started on first
+    use and restarted if it dies.
+    """
+
+    def __init__(self, preload_modules: List[str]) -> None:
+        self.preload_modules = list(preload_modules)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._status_dir: Optional[str] = None
+
+    def get_status_path(self, pid: int) -> str:
+        """File the exit code of the kernel with `pid` is written to."""
+        assert self._status_dir is not None
+        return os.path.join(self._status_dir, str(pid))
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _read_message(self) -> Dict[str, Any]:
+        assert self._process is not None and self._process.stdout is not None
+        line = await self._process.stdout.readline()
+        if not line:
+            self._process = None
+            raise KernelZygoteError("Kernel zygote exited unexpectedly")
+        return json.loads(line)
+
+    async def _ensure_started(self):
+        if self._process is not None and self._process.returncode is None:
+            return
+        logger.info(f"Starting kernel zygote, preloading {self.preload_modules}")
+        if self._status_dir is None:
+            self._status_dir = tempfile.mkdtemp(prefix="jupyrest-zygote-")
+        self._process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            __name__,
+            "--status-dir",
+            self._status_dir,
+            *self.preload_modules,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        await self._read_message()
+
+    async def start(self):
+        async with self._get_lock():
+            await self._ensure_started()
+
+    async def spawn_kernel(
+        self, connection_file: str, env: Dict[str, str], cwd: Optional[str] = None
+    ) -> int:
+        """Fork a kernel from the zygote and return its pid."""
+        async with self._get_lock():
+            await self._ensure_started()
+            assert self._process is not None and self._process.stdin is not None
+            request = dict(connection_file=connection_file, env=env, cwd=cwd)
+            self._process.stdin.write((json.dumps(request) + "\n").encode())
+            await self._process.stdin.drain()
+            return (await self._read_message())["pid"]
+
+    async def shutdown(self):
+        if self._process is not None and self._process.returncode is None:
+            assert self._process.stdin is not None
+            self._process.stdin.close()
+            await self._process.wait()
+        self._process = None
+        if self._status_dir is not None:
+            shutil.rmtree(self._status_dir, ignore_errors=True)
+            self._status_dir = None
+
+
+class _ForkedKernelProcess:
+    """
+    Popen lookalike for a kernel forked by the zygote. The kernel is the
+    zygote's child, so its exit code is read from the file the zygote
+    writes when it reaps the kernel.
+    """
+
+    stdin = stdout = stderr = None
+    # time the zygote has to write the exit code after the kernel is gone
+    STATUS_TIMEOUT_SECONDS = 5.0
+
+    def __init__(self, pid: int, status_path: str) -> None:
+        self.pid = pid
+        self.status_path = status_path
+        self.returncode: Optional[int] = None
+        self._gone_since: Optional[float] = None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is not None:
+            return self.returncode
+        try:
+            os.kill(self.pid, 0)
+            return None
+        except ProcessLookupError:
+            pass
+        try:
+            with open(self.status_path) as f:
+                self.returncode = int(f.read())
+            os.unlink(self.status_path)
+        except FileNotFoundError:
+            # reaped, but the exit code is not written yet
+            now = time.monotonic()
+            if self._gone_since is None:
+                self._gone_since = now
+            if now - self._gone_since < self.STATUS_TIMEOUT_SECONDS:
+                return None
+            logger.warning(f"Exit code of kernel {self.pid} is unknown")
+            self.returncode = -1
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            returncode = self.poll()
+            if returncode is not None:
+                return returncode
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(cmd=str(self.pid), timeout=timeout)
+            time.sleep(0.01)
+
+    def send_signal(self, signum: int):
+        os.kill(self.pid, signum)
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class ZygoteKernelProvisioner(LocalProvisioner):
+    """LocalProvisioner that forks kernels from a KernelZygote."""
+
+    zygote: KernelZygote
+
+    async def launch_kernel(self, cmd: List[str], **kwargs: Any):
+        km = self.parent
+        assert km is not None
+        env = kwargs.get("env") or dict(os.environ)
+        cwd = kwargs.get("cwd")
+        pid = await self.zygote.spawn_kernel(
+            connection_file=km.connection_file,
+            env={k: str(v) for k, v in env.items()},
+            cwd=str(cwd) if cwd is not None else None,
+        )
+        self.process = _ForkedKernelProcess(pid, self.zygote.get_status_path(pid))  # type: ignore
+        self.pid = pid
+        # the forked kernel calls setsid(), so it leads its own group
+        self.pgid = pid
+        self.cwd = cwd
+        return self.connection_info
+
+
+class ZygoteKernelManager(AsyncKernelManager):
+    """AsyncKernelManager whose kernels are forked from a KernelZygote."""
+
+    def __init__(self, zygote: KernelZygote, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._zygote = zygote
+
+    async def _async_pre_start_kernel(self, **kw):
+        if self.provisioner is None:
+            self.kernel_id = self.kernel_id or kw.pop("kernel_id", str(uuid.uuid4()))
+            provisioner = ZygoteKernelProvisioner(
+                kernel_id=self.kernel_id, kernel_spec=self.kernel_spec, parent=self
+            )
+            provisioner.zygote = self._zygote
+            self.provisioner = provisioner
+        return await super()._async_pre_start_kernel(**kw)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status-dir", required=True)
+    parser.add_argument("preload_modules", nargs="*")
+    args = parser.parse_args()
+    _serve(preload_modules=args.preload_modules, status_dir=args.status_dir)
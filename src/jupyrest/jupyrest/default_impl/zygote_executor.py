@@ -0,0 +1,81 @@
+from typing import List, Optional
+import logging
+
+from nbformat.notebooknode import NotebookNode
+from nbclient.exceptions import CellExecutionError, CellTimeoutError
+
+from ..contracts import NotebookRepository
+from .executor import IPythonNotebookExecutor
+from .zygote import KernelZygote, ZygoteKernelManager
+
+logger = logging.getLogger(__name__)
+
+
+class ZygoteNotebookExecutor(IPythonNotebookExecutor):
+    """
+    Executes every notebook on a kernel forked from a zygote process
+    that has already imported `preload_modules` along with the
+    `preload_modules` of every notebook config in `notebook_repository`.
+
+    The modules are collected and imported in `start`, or on the first
+    execution if the executor was not started.
+
+    Only works for ipykernel based kernels on platforms with os.fork().
+    """
+
+    def __init__(
+        self,
+        preload_modules: Optional[List[str]] = None,
+        notebook_repository: Optional[NotebookRepository] = None,
+        kernel_name="python3",
+        timeout_seconds=600,
+        language="python",
+    ) -> None:
+        super().__init__(
+            kernel_name=kernel_name, timeout_seconds=timeout_seconds, language=language
+        )
+        self.preload_modules = list(preload_modules or [])
+        self.notebook_repository = notebook_repository
+        self._zygote: Optional[KernelZygote] = None
+
+    async def _get_preload_modules(self) -> List[str]:
+        modules = list(self.preload_modules)
+        if self.notebook_repository is not None:
+            async for notebook_id in self.notebook_repository.iter_notebook_ids():
+                notebook_config = await self.notebook_repository.get(
+                    notebook_id=notebook_id
+                )
+                modules.extend(notebook_config.preload_modules)
+        return list(dict.fromkeys(modules))
+
+    async def get_zygote(self) -> KernelZygote:
+        if self._zygote is None:
+            self._zygote = KernelZygote(preload_modules=await self._get_preload_modules())
+        return self._zygote
+
+    async def start(self) -> None:
+        # collect the preload modules and import them before the first execution
+        await (await self.get_zygote()).start()
+
+    async def shutdown(self) -> None:
+        if self._zygote is not None:
+            await self._zygote.shutdown()
+            self._zygote = None
+
+    async def execute_notebook_async(self, notebook: NotebookNode) -> Optional[str]:
+        km = ZygoteKernelManager(
+            zygote=await self.get_zygote(), kernel_name=self._kernel_name
+        )
+        client = self._new_notebook_client(notebook, km=km)
+        exception: Optional[str] = None
+        try:
+            await client.async_execute()
+        except (CellExecutionError, CellTimeoutError) as e:
+            exception = self._get_exception_message(e)
+        finally:
+            # the client does not clean up kernel managers it does not own
+            if client.kc is not None:
+                client.kc.stop_channels()
+            if km.has_kernel:
+                await km.shutdown_kernel(now=True)
+        return exception
@@ -79,4 +79,32 @@ class UnrecognizedFileObjectScheme(BaseError):
         super().__init__(
             code="UNRECOGNIZED_FILE_OBJECT_SCHEME",
             message=f"Unrecognized scheme: {scheme}",
+        )
+
+class InvalidNotebookConfig(BaseError):
+    def __init__(self, notebook_id: str, details: str):
+        self.notebook_id = notebook_id
+        super().__init__(
+            code="INVALID_NOTEBOOK_CONFIG",
+            message=f"The config of notebook {notebook_id} is invalid. Details: {details}",
+        )
+
+
+class InvalidPriorityClass(BaseError):
+    def __init__(self, priority: str, priority_classes: List[str]):
+        self.priority = priority
+        super().__init__(
+            code="INVALID_PRIORITY_CLASS",
+            message=f"Unknown priority class {priority}. Expected one of {priority_classes}",
+        )
+
+
+class ExecutionQueueFull(BaseError):
+    def __init__(self, queue_depth: int, retry_after_seconds: int):
+        self.queue_depth = queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        super().__init__(
+            code="EXECUTION_QUEUE_FULL",
+            message=f"Too many notebook executions are queued. Retry after {self.retry_after_seconds} seconds.",
+            data={"queue_depth": queue_depth, "retry_after_seconds": retry_after_seconds},
         )
\ No newline at end of file
@@ -1,6 +1,17 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterable, AsyncIterator, Optional
 
 from .model import NamedModel
+from .error import FileObjectNotFound
+
+# chunk size of content streams, in bytes
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+async def iter_chunks(data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size]
+
 
 class FileObjectClient(ABC):
 
@@ -18,6 +29,44 @@ class FileObjectClient(ABC):
     async def set_content(self, file_object: "FileObject", content: str):
         pass
 
+    async def close(self) -> None:
+        """Called once when the application stops, e.g. to remove
+        temporary files."""
+        pass
+
+    async def exists(self, file_object: "FileObject") -> bool:
+        """Clients that can check for a file without reading it should override this."""
+        try:
+            await self.get_content(file_object)
+        except FileObjectNotFound:
+            return False
+        return True
+
+    async def get_content_stream(
+        self, file_object: "FileObject", chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Content as a stream of utf-8 encoded chunks. Raises
+        FileObjectNotFound when it is awaited if the file does not
+        exist. Clients that open the file once the stream is read
+        raise it from the stream if the file is removed meanwhile.
+        Clients that can read in chunks should override this.
+        """
+        content = await self.get_content(file_object)
+        return iter_chunks(content.encode("utf-8"), chunk_size)
+
+    async def set_content_stream(self, file_object: "FileObject", chunks: AsyncIterable[bytes]):
+        """Set the content from a stream of utf-8 encoded chunks.
+        Clients that can write in chunks should override this.
+        """
+        content = b"".join([chunk async for chunk in chunks])
+        await self.set_content(file_object, content.decode("utf-8"))
+
+    def get_local_path(self, file_object: "FileObject") -> Optional[str]:
+        """Path of the file object on the local filesystem, if the
+        client stores it there. Callers may serve that file directly.
+        """
+        return None
+
     def new_file_object(self, path: str) -> "FileObject":
         return FileObject(path=path, scheme=self.get_scheme())
 
@@ -1,8 +1,8 @@
+from contextlib import asynccontextmanager
 from typing import Protocol, List, Annotated
 from importlib.resources import files, as_file
 from urllib import response
 
-import json
 from ..notebook_execution.entity import (
     NotebookExecution,
     NotebookExecutionStatus,
@@ -10,7 +10,8 @@ from ..notebook_execution.entity import (
 from ..notebook_execution.commands import accept, begin_execution
 from ..notebook_execution.queries import (
     get_execution,
-    get_execution_artifact,
+    get_execution_artifact_path,
+    get_execution_artifact_stream,
     ExecutionArtifactType,
 )
 from .models import (
@@ -19,6 +20,7 @@ from .models import (
     NotebookResponse,
     NotebookList,
     NotebookExecutionAsyncResponse,
+    ExecutionSchedulerResponse,
 )
 from ..error import (
     BaseError,
@@ -29,19 +31,48 @@ from ..error import (
     NotebookNotFound,
     NotebookExecutionArtifactNotFound,
     FileObjectNotFound,
+    ExecutionQueueFull,
+    InvalidPriorityClass,
 )
 from ..contracts import DependencyBag
 from fastapi import FastAPI, Request, BackgroundTasks, HTTPException, status
-from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+
+ARTIFACT_MEDIA_TYPES = {
+    ExecutionArtifactType.HTML: "text/html",
+    ExecutionArtifactType.HTML_REPORT: "text/html",
+    ExecutionArtifactType.IPYNB: "application/json",
+    ExecutionArtifactType.OUTPUT: "application/json",
+    ExecutionArtifactType.EXCEPTION: "text/plain",
+}
 
 
 def create_asgi_app(deps: DependencyBag) -> FastAPI:
 
-    jupyrest_api_app = FastAPI(title="Jupyrest API")
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await deps.notebook_executor.start()
+        try:
+            yield
+        finally:
+            try:
+                await deps.notebook_executor.shutdown()
+            finally:
+                await deps.file_obj_client.close()
+
+    jupyrest_api_app = FastAPI(title="Jupyrest API", lifespan=lifespan)
 
     @jupyrest_api_app.exception_handler(BaseError)
     def error_to_http_exception(request: Request, exc: BaseError):
-        if isinstance(exc, (InvalidInputSchema, InvalidExecutionState)):
+        if isinstance(exc, ExecutionQueueFull):
+            return JSONResponse(
+                status_code=429,
+                content=exc.dict(),
+                headers={"Retry-After": str(exc.retry_after_seconds)},
+            )
+        if isinstance(
+            exc, (InvalidInputSchema, InvalidExecutionState, InvalidPriorityClass)
+        ):
             status_code = 400
         elif isinstance(
             exc,
@@ -61,7 +92,7 @@ def create_asgi_app(deps: DependencyBag) -> FastAPI:
     async def get_notebook_list():
         notebook_repo = deps.notebook_repository
         notebook_ids = []
-        async for notebook_id in notebook_repo.iter_notebook_ids():  # type: ignore
+        async for notebook_id in notebook_repo.iter_notebook_ids():
             notebook_ids.append(notebook_id)
         return NotebookList(notebooks=notebook_ids)
 
@@ -89,16 +120,36 @@ def create_asgi_app(deps: DependencyBag) -> FastAPI:
         background_tasks: BackgroundTasks,
     ):
         execution = await accept(
-            notebook_id=notebook_id, parameters=req.parameters, deps=deps
+            notebook_id=notebook_id,
+            parameters=req.parameters,
+            deps=deps,
+            priority=req.priority,
+            artifacts=req.artifacts,
         )
         background_tasks.add_task(begin_execution, execution=execution, deps=deps)
         content = NotebookExecutionAsyncResponse(
             execution_id=execution.execution_id,
             status=execution.status,
             notebook_id=execution.notebook_id,
+            queue_depth=deps.notebook_execution_scheduler.get_stats().queued,
         )
         return content
 
+    @jupyrest_api_app.get(
+        "/api/scheduler", response_model=ExecutionSchedulerResponse
+    )
+    async def get_scheduler():
+        stats = deps.notebook_execution_scheduler.get_stats()
+        return ExecutionSchedulerResponse(
+            running=stats.running,
+            queued=stats.queued,
+            max_concurrency=stats.max_concurrency,
+            max_queue_size=stats.max_queue_size,
+            average_wait_seconds=stats.average_wait_seconds,
+            average_run_seconds=stats.average_run_seconds,
+            queued_by_priority=stats.queued_by_priority,
+        )
+
     @jupyrest_api_app.get(
         "/api/notebook_executions/{execution_id}",
         response_model=NotebookExecutionResponse,
@@ -148,23 +199,15 @@ def create_asgi_app(deps: DependencyBag) -> FastAPI:
     async def get_notebook_execution_artifact(
         execution_id: str, artifact_type: ExecutionArtifactType
     ):
-        content = await get_execution_artifact(
-            execution_id=execution_id, deps=deps, artifact_type=artifact_type
+        execution = await get_execution(execution_id=execution_id, deps=deps)
+        path = await get_execution_artifact_path(
+            execution=execution, deps=deps, artifact_type=artifact_type
         )
-
-        if artifact_type in (
-            ExecutionArtifactType.HTML,
-            ExecutionArtifactType.HTML_REPORT,
-        ):
-            return HTMLResponse(content=content)
-        elif artifact_type in (
-            ExecutionArtifactType.IPYNB,
-            ExecutionArtifactType.OUTPUT,
-        ):
-            return JSONResponse(content=json.loads(content))
-        elif artifact_type == ExecutionArtifactType.EXCEPTION:
-            return PlainTextResponse(content=content)
-        else:
-            raise HTTPException(status_code=404, detail="Artifact not found")
+        if path is not None:
+            return FileResponse(path=path, media_type=ARTIFACT_MEDIA_TYPES[artifact_type])
+        chunks = await get_execution_artifact_stream(
+            execution=execution, deps=deps, artifact_type=artifact_type
+        )
+        return StreamingResponse(chunks, media_type=ARTIFACT_MEDIA_TYPES[artifact_type])
 
     return jupyrest_api_app
@@ -5,11 +5,16 @@ from typing import Dict, Any, Optional, List
 from ..notebook_execution.entity import (
     NotebookExecutionStatus,
     NotebookExecutionCompletionStatus,
+    ExecutionArtifactType,
 )
 
 
 class NotebookExecutionRequest(BaseModel):
     parameters: Dict
+    # scheduling priority class, defaults to the notebook config's
+    priority: Optional[str] = None
+    # artifacts to store, defaults to the notebook config's
+    artifacts: Optional[List[ExecutionArtifactType]] = None
 
 
 class ExecutionCompletionDetails(BaseModel):
@@ -36,6 +41,18 @@ class NotebookExecutionAsyncResponse(BaseModel):
     execution_id: str
     status: str
     notebook_id: str
+    # executions, including this one, that have not started yet
+    queue_depth: Optional[int] = None
+
+
+class ExecutionSchedulerResponse(BaseModel):
+    running: int
+    queued: int
+    max_concurrency: Optional[int] = None
+    max_queue_size: Optional[int] = None
+    average_wait_seconds: float
+    average_run_seconds: float
+    queued_by_priority: Dict[str, int] = {}
 
 
 class NotebookResponse(BaseModel):
@@ -14,13 +14,16 @@ class AzureApplicationBuilder(DefaultApplicationBuilder):
             notebooks_dir: Path,
             container_client: ContainerClient,
             queue_client: QueueClient,
-            models: Optional[ModelSet] = {}
+            models: Optional[ModelSet] = {},
+            **kwargs
     ) -> None:
+        # kwargs are passed on to DefaultApplicationBuilder, e.g. lazy_html_rendering
         notebook_execution_repository = AzureBlobNotebookExecutionRepository(container_client=container_client)
         file_object_client = AzureBlobFileObjectClient(container_client=container_client)
         super().__init__(
             notebooks_dir=notebooks_dir,
             notebook_execution_repository=notebook_execution_repository,
             file_object_client=file_object_client,
-            models=models)
+            models=models,
+            **kwargs)
         self.execution_task_handler = AzureQueueNotebookExecutionTaskHandler(queue_client=queue_client)
\ No newline at end of file
@@ -1,6 +1,8 @@
+from typing import AsyncIterable, AsyncIterator
+
 from ...error import FileObjectNotFound
 
-from ...file_object import FileObject, FileObjectClient
+from ...file_object import DEFAULT_CHUNK_SIZE, FileObject, FileObjectClient
 from azure.storage.blob.aio import ContainerClient
 from azure.core.exceptions import ResourceNotFoundError
 
@@ -20,6 +22,25 @@ class AzureBlobFileObjectClient(FileObjectClient):
         except ResourceNotFoundError as rnfe:
             raise FileObjectNotFound(path=file_object.path) from rnfe
 
+    async def exists(self, file_object: "FileObject") -> bool:
+        blob_client = self.container_client.get_blob_client(blob=file_object.path)
+        return await blob_client.exists()
+
     async def set_content(self, file_object: "FileObject", content: str):
         blob_client = self.container_client.get_blob_client(blob=file_object.path)
-        await blob_client.upload_blob(content.encode('utf-8'), overwrite=True)
\ No newline at end of file
+        await blob_client.upload_blob(content.encode('utf-8'), overwrite=True)
+
+    async def get_content_stream(
+        self, file_object: "FileObject", chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        # chunks are sized by the container client's max_chunk_get_size
+        try:
+            blob_client = self.container_client.get_blob_client(blob=file_object.path)
+            downloader = await blob_client.download_blob()
+        except ResourceNotFoundError as rnfe:
+            raise FileObjectNotFound(path=file_object.path) from rnfe
+        return downloader.chunks()
+
+    async def set_content_stream(self, file_object: "FileObject", chunks: AsyncIterable[bytes]):
+        blob_client = self.container_client.get_blob_client(blob=file_object.path)
+        await blob_client.upload_blob(chunks, overwrite=True)
@@ -1,19 +1,57 @@
+import tempfile
 from pathlib import Path
 from typing import Optional
 from jupyrest.default_impl.builder import ModelSet
 from ...default_impl.builder import DefaultApplicationBuilder
 from .file_object_client import InMemoryFileObjectClient
-from .execution_repository import InMemoryNotebookExecutionRepository
+from .tiered_file_object_client import TieredInMemoryFileObjectClient
+from .execution_repository import (
+    InMemoryNotebookExecutionRepository,
+    SnapshotNotebookExecutionRepository,
+)
 
 
 class InMemoryApplicationBuilder(DefaultApplicationBuilder):
 
-    def __init__(self, notebooks_dir: Path, models: Optional[ModelSet] = {}) -> None:
+    def __init__(
+        self,
+        notebooks_dir: Path,
+        models: Optional[ModelSet] = {},
+        max_executions: Optional[int] = None,
+        max_execution_bytes: Optional[int] = None,
+        execution_ttl_seconds: Optional[float] = None,
+        snapshot_executions: bool = False,
+        max_file_memory_bytes: Optional[int] = None,
+        file_spill_dir: Optional[Path] = None,
+        file_retention_seconds: Optional[float] = None,
+        **kwargs,
+    ) -> None:
+        # kwargs are passed on to DefaultApplicationBuilder, e.g. lazy_html_rendering
         notebook_execution_repository = InMemoryNotebookExecutionRepository()
+        if (
+            snapshot_executions
+            or max_executions is not None
+            or max_execution_bytes is not None
+            or execution_ttl_seconds is not None
+        ):
+            notebook_execution_repository = SnapshotNotebookExecutionRepository(
+                max_entries=max_executions,
+                max_bytes=max_execution_bytes,
+                ttl_seconds=execution_ttl_seconds,
+            )
         file_object_client = InMemoryFileObjectClient()
+        if max_file_memory_bytes is not None or file_retention_seconds is not None:
+            file_object_client = TieredInMemoryFileObjectClient(
+                spill_dir=file_spill_dir or Path(tempfile.mkdtemp(prefix="jupyrest-spill-")),
+                max_memory_bytes=max_file_memory_bytes,
+                retention_seconds=file_retention_seconds,
+                # a temporary directory is removed when the application stops
+                remove_spill_dir=file_spill_dir is None,
+            )
         super().__init__(
             notebooks_dir=notebooks_dir,
             notebook_execution_repository=notebook_execution_repository,
             file_object_client=file_object_client,
-            models=models
-        )
\ No newline at end of file
+            models=models,
+            **kwargs
+        )
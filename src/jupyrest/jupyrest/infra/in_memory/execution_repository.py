@@ -1,7 +1,10 @@
-from typing import Dict
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
 
 from ...contracts import NotebookExecutionRepository
-from ...notebook_execution.entity import NotebookExecution
+from ...notebook_execution.entity import NotebookExecution, NotebookExecutionStatus
 from ...error import NotebookExecutionNotFound
 
 class InMemoryNotebookExecutionRepository(NotebookExecutionRepository):
@@ -18,4 +21,162 @@ class InMemoryNotebookExecutionRepository(NotebookExecutionRepository):
         self._executions[execution.execution_id] = execution.json()
 
     async def create(self, execution: NotebookExecution) -> None:
-        self._executions[execution.execution_id] = execution.json()
\ No newline at end of file
+        self._executions[execution.execution_id] = execution.json()
+
+
+@dataclass
+class ExecutionRepositoryStats:
+    entries: int
+    # 0 unless max_bytes is set
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+@dataclass
+class _Snapshot:
+    execution: NotebookExecution
+    # bytes of the execution's utf-8 encoded JSON, counted against
+    # max_bytes. 0 when max_bytes is None, as it is not needed.
+    size: int
+
+
+class SnapshotNotebookExecutionRepository(NotebookExecutionRepository):
+    """
+    Keeps executions as objects instead of JSON. `save` stores a deep
+    copy, so later changes by the caller do not leak in, and `get`
+    returns a shallow copy: callers may assign its fields but must not
+    modify them in place.
+
+    Finished executions (COMPLETED or INTERNAL_ERROR) are dropped
+    `ttl_seconds` after they were last saved, and the least recently
+    used ones are dropped while there are more than `max_entries`
+    executions or more than `max_bytes` of execution JSON. Executions
+    that have not finished are never dropped. `None` means unbounded.
+
+    A coalesced execution (one with a leader) is finished once its
+    leader is, and it is dropped together with its leader.
+    """
+
+    TERMINAL_STATUSES = (NotebookExecutionStatus.COMPLETED, NotebookExecutionStatus.INTERNAL_ERROR)
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # least recently used first
+        self._snapshots: "OrderedDict[str, _Snapshot]" = OrderedDict()
+        # finished executions by expiry (time.monotonic()), earliest first
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        # coalesced executions by the execution_id of their leader
+        self._followers: Dict[str, Set[str]] = {}
+        # executions that can be dropped, so the least recently used
+        # ones are only looked for when there are any
+        self._finished: Set[str] = set()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _is_terminal(self, execution: NotebookExecution) -> bool:
+        if execution.leader_execution_id is not None:
+            leader = self._snapshots.get(execution.leader_execution_id, None)
+            return leader is None or self._is_terminal(leader.execution)
+        return execution.status in self.TERMINAL_STATUSES
+
+    def _remove_follower(self, execution: NotebookExecution):
+        leader_execution_id = execution.leader_execution_id
+        if leader_execution_id is None:
+            return
+        followers = self._followers.get(leader_execution_id, set())
+        followers.discard(execution.execution_id)
+        if not followers:
+            self._followers.pop(leader_execution_id, None)
+
+    def _evict(self, execution_id: str):
+        snapshot = self._snapshots.pop(execution_id)
+        self._expiry.pop(execution_id, None)
+        self._bytes -= snapshot.size
+        self._finished.discard(execution_id)
+        self._evictions += 1
+        self._remove_follower(snapshot.execution)
+        # followers can no longer report the leader's result
+        for follower_execution_id in self._followers.pop(execution_id, set()):
+            if follower_execution_id in self._snapshots:
+                self._evict(follower_execution_id)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        while self._expiry:
+            execution_id, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                return
+            self._evict(execution_id)
+
+    def _is_over_budget(self) -> bool:
+        return (self.max_entries is not None and len(self._snapshots) > self.max_entries) or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        )
+
+    def _evict_least_recently_used(self):
+        if not self._finished or not self._is_over_budget():
+            return
+        for execution_id, snapshot in list(self._snapshots.items()):
+            if execution_id in self._snapshots and self._is_terminal(snapshot.execution):
+                self._evict(execution_id)
+                if not self._is_over_budget():
+                    return
+
+    def _store(self, execution: NotebookExecution):
+        execution_id = execution.execution_id
+        previous = self._snapshots.pop(execution_id, None)
+        if previous is not None:
+            self._bytes -= previous.size
+            self._remove_follower(previous.execution)
+        self._expiry.pop(execution_id, None)
+        size = len(execution.json().encode()) if self.max_bytes is not None else 0
+        snapshot = _Snapshot(execution=execution.copy(deep=True), size=size)
+        self._snapshots[execution_id] = snapshot
+        self._bytes += snapshot.size
+        if execution.leader_execution_id is not None:
+            self._followers.setdefault(execution.leader_execution_id, set()).add(execution_id)
+        if self._is_terminal(execution):
+            self._finished.add(execution_id)
+            if self.ttl_seconds is not None:
+                self._expiry[execution_id] = time.monotonic() + self.ttl_seconds
+        else:
+            # followers of unfinished leaders are dropped with their leader
+            self._finished.discard(execution_id)
+        self._evict_expired()
+        self._evict_least_recently_used()
+
+    async def get(self, execution_id: str) -> NotebookExecution:
+        self._evict_expired()
+        snapshot = self._snapshots.get(execution_id, None)
+        if snapshot is None:
+            self._misses += 1
+            raise NotebookExecutionNotFound(execution_id=execution_id)
+        self._hits += 1
+        self._snapshots.move_to_end(execution_id)
+        return snapshot.execution.copy()
+
+    async def save(self, execution: NotebookExecution) -> None:
+        self._store(execution)
+
+    async def create(self, execution: NotebookExecution) -> None:
+        self._store(execution)
+
+    def get_stats(self) -> ExecutionRepositoryStats:
+        return ExecutionRepositoryStats(
+            entries=len(self._snapshots),
+            bytes=self._bytes,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
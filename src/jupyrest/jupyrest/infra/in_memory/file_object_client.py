@@ -18,5 +18,8 @@ class InMemoryFileObjectClient(FileObjectClient):
         except KeyError as ke:
             raise FileObjectNotFound(path=file_object.path) from ke
 
+    async def exists(self, file_object: "FileObject") -> bool:
+        return file_object.path in self._files
+
     async def set_content(self, file_object: "FileObject", content: str):
         self._files[file_object.path] = content
\ No newline at end of file
@@ -0,0 +1,225 @@
+import asyncio
+import mmap
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Set
+
+from ...file_object import DEFAULT_CHUNK_SIZE, FileObject, iter_chunks
+from ...error import FileObjectNotFound
+from .file_object_client import InMemoryFileObjectClient
+
+
+def _write_file(path: Path, data: bytes):
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _read_file(path: Path) -> str:
+    # the content is copied into a str either way, so a mapping would
+    # not save anything over a plain read
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def _map_file(path: Path) -> Optional[mmap.mmap]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+async def _iter_mapped_file(m: Optional[mmap.mmap], chunk_size: int) -> AsyncIterator[bytes]:
+    if m is None:
+        return
+    try:
+        for start in range(0, len(m), chunk_size):
+            yield m[start : start + chunk_size]
+    finally:
+        m.close()
+
+
+def _unlink(path: Path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class TieredInMemoryFileObjectClient(InMemoryFileObjectClient):
+    """
+    InMemoryFileObjectClient that keeps at most `max_memory_bytes` of
+    (utf-8 encoded) content in memory. The least recently used files
+    are spilled to `spill_dir`. Content streams of spilled files are
+    read with mmap. Spilled files stay on disk until they are
+    overwritten, expire or the client is closed. With
+    `remove_spill_dir`, close also removes `spill_dir`.
+
+    Files older than `retention_seconds` are dropped from both tiers.
+    `None` means unbounded.
+    """
+
+    def __init__(
+        self,
+        spill_dir: Path,
+        max_memory_bytes: Optional[int] = None,
+        retention_seconds: Optional[float] = None,
+        remove_spill_dir: bool = False,
+    ) -> None:
+        super().__init__()
+        self.spill_dir = Path(spill_dir)
+        self.remove_spill_dir = remove_spill_dir
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_bytes = max_memory_bytes
+        self.retention_seconds = retention_seconds
+        # in memory files, least recently used first
+        self._files: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._memory_bytes = 0
+        # spilled files, path -> file in spill_dir
+        self._spilled: Dict[str, Path] = {}
+        # in memory files that are being written to spill_dir
+        self._spilling: Set[str] = set()
+        self._spilling_bytes = 0
+        # path -> time.monotonic() when the content was set, oldest first
+        self._set_times: "OrderedDict[str, float]" = OrderedDict()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def _remove(self, path: str):
+        if path in self._files:
+            del self._files[path]
+            self._memory_bytes -= self._sizes.pop(path)
+        spilled = self._spilled.pop(path, None)
+        if spilled is not None:
+            _unlink(spilled)
+        self._set_times.pop(path, None)
+
+    def _evict_expired(self):
+        if self.retention_seconds is None:
+            return
+        horizon = time.monotonic() - self.retention_seconds
+        while self._set_times:
+            path, set_time = next(iter(self._set_times.items()))
+            if set_time > horizon:
+                return
+            self._remove(path)
+
+    async def _spill(self):
+        loop = asyncio.get_running_loop()
+        while (
+            self.max_memory_bytes is not None
+            and self._memory_bytes - self._spilling_bytes > self.max_memory_bytes
+        ):
+            path = next((p for p in self._files if p not in self._spilling), None)
+            if path is None:
+                return
+            content = self._files[path]
+            size = self._sizes[path]
+            spill_path = self.spill_dir / uuid.uuid4().hex
+            self._spilling.add(path)
+            self._spilling_bytes += size
+            try:
+                await loop.run_in_executor(None, _write_file, spill_path, content.encode())
+            finally:
+                self._spilling.discard(path)
+                self._spilling_bytes -= size
+            if self._files.get(path, None) is content:
+                del self._files[path]
+                self._memory_bytes -= self._sizes.pop(path)
+                self._spilled[path] = spill_path
+            else:
+                # overwritten or removed while it was being written
+                _unlink(spill_path)
+
+    async def close(self) -> None:
+        spilled = list(self._spilled.values())
+        self._spilled.clear()
+        for path in list(self._set_times):
+            if path not in self._files:
+                del self._set_times[path]
+        loop = asyncio.get_running_loop()
+        if self.remove_spill_dir:
+            await loop.run_in_executor(None, shutil.rmtree, self.spill_dir, True)
+        else:
+            for spill_path in spilled:
+                await loop.run_in_executor(None, _unlink, spill_path)
+
+    async def get_content(self, file_object: FileObject) -> str:
+        self._evict_expired()
+        path = file_object.path
+        if path in self._files:
+            self._files.move_to_end(path)
+            return self._files[path]
+        spill_path = self._spilled.get(path, None)
+        if spill_path is None:
+            raise FileObjectNotFound(path=path)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, _read_file, spill_path)
+        except FileNotFoundError:
+            if self._spilled.get(path, None) is spill_path:
+                raise FileObjectNotFound(path=path)
+            # overwritten or removed while it was being read
+            return await self.get_content(file_object)
+
+    async def exists(self, file_object: FileObject) -> bool:
+        self._evict_expired()
+        return file_object.path in self._files or file_object.path in self._spilled
+
+    async def get_content_stream(
+        self, file_object: FileObject, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        self._evict_expired()
+        path = file_object.path
+        if path in self._files:
+            self._files.move_to_end(path)
+            return iter_chunks(self._files[path].encode("utf-8"), chunk_size)
+        spill_path = self._spilled.get(path, None)
+        if spill_path is None:
+            raise FileObjectNotFound(path=path)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, os.stat, spill_path)
+        except FileNotFoundError:
+            if self._spilled.get(path, None) is spill_path:
+                raise FileObjectNotFound(path=path)
+            return await self.get_content_stream(file_object, chunk_size)
+        return self._iter_spilled_file(file_object, spill_path, chunk_size)
+
+    async def _iter_spilled_file(
+        self, file_object: FileObject, spill_path: Path, chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        # the file is only mapped once the stream is read, so a stream
+        # that is never read does not hold on to a mapping
+        loop = asyncio.get_running_loop()
+        try:
+            # the mapping stays readable if the file is removed meanwhile
+            m = await loop.run_in_executor(None, _map_file, spill_path)
+        except FileNotFoundError:
+            if self._spilled.get(file_object.path, None) is spill_path:
+                raise FileObjectNotFound(path=file_object.path)
+            # the file was overwritten or moved back into memory
+            chunks = await self.get_content_stream(file_object, chunk_size)
+        else:
+            chunks = _iter_mapped_file(m, chunk_size)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    async def set_content(self, file_object: FileObject, content: str):
+        path = file_object.path
+        self._remove(path)
+        self._files[path] = content
+        self._sizes[path] = len(content.encode())
+        self._memory_bytes += self._sizes[path]
+        self._set_times[path] = time.monotonic()
+        self._evict_expired()
+        await self._spill()
@@ -0,0 +1,32 @@
+from pathlib import Path
+from typing import Optional
+from jupyrest.default_impl.builder import ModelSet
+from ...default_impl.builder import DefaultApplicationBuilder
+from ..in_memory.execution_repository import SnapshotNotebookExecutionRepository
+from .file_object_client import LocalFileObjectClient
+
+
+class LocalApplicationBuilder(DefaultApplicationBuilder):
+
+    def __init__(
+        self,
+        notebooks_dir: Path,
+        artifacts_dir: Path,
+        models: Optional[ModelSet] = {},
+        max_executions: Optional[int] = None,
+        execution_ttl_seconds: Optional[float] = None,
+        **kwargs,
+    ) -> None:
+        # kwargs are passed on to DefaultApplicationBuilder, e.g. lazy_html_rendering
+        notebook_execution_repository = SnapshotNotebookExecutionRepository(
+            max_entries=max_executions,
+            ttl_seconds=execution_ttl_seconds,
+        )
+        file_object_client = LocalFileObjectClient(root_dir=artifacts_dir)
+        super().__init__(
+            notebooks_dir=notebooks_dir,
+            notebook_execution_repository=notebook_execution_repository,
+            file_object_client=file_object_client,
+            models=models,
+            **kwargs
+        )
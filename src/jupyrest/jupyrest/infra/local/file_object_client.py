@@ -0,0 +1,95 @@
+import hashlib
+import uuid
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional
+from urllib.parse import quote
+
+import aiofiles
+import aiofiles.os
+
+from ...error import FileObjectNotFound
+from ...file_object import DEFAULT_CHUNK_SIZE, FileObject, FileObjectClient, iter_chunks
+
+
+async def _iter_file(path: Path, file_object: FileObject, chunk_size: int) -> AsyncIterator[bytes]:
+    # the file is only opened once the stream is read, so a stream
+    # that is never read does not hold on to a file handle
+    try:
+        f = await aiofiles.open(path, mode="rb")
+    except FileNotFoundError as fnfe:
+        raise FileObjectNotFound(path=file_object.path) from fnfe
+    try:
+        while True:
+            chunk = await f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        await f.close()
+
+
+class LocalFileObjectClient(FileObjectClient):
+    """
+    Stores file objects under `root_dir` on the local filesystem.
+
+    Files are spread over `shard_depth` levels of 256 directories by
+    a hash of their path. With the default depth of 2, 10 million
+    files average about 150 per directory.
+    Content is written to a temporary file and renamed into place,
+    so readers never see a partial file.
+    """
+
+    def __init__(self, root_dir: Path, shard_depth: int = 2) -> None:
+        self.root_dir = Path(root_dir)
+        self.shard_depth = shard_depth
+
+    @classmethod
+    def get_scheme(cls) -> str:
+        return "local"
+
+    def _get_path(self, file_object: FileObject) -> Path:
+        digest = hashlib.sha256(file_object.path.encode()).hexdigest()
+        shards = [digest[2 * i : 2 * i + 2] for i in range(self.shard_depth)]
+        return self.root_dir.joinpath(*shards, quote(file_object.path, safe=""))
+
+    def get_local_path(self, file_object: FileObject) -> Optional[str]:
+        return str(self._get_path(file_object))
+
+    async def get_content(self, file_object: FileObject) -> str:
+        try:
+            async with aiofiles.open(self._get_path(file_object), mode="r", encoding="utf-8", newline="") as f:
+                return await f.read()
+        except FileNotFoundError as fnfe:
+            raise FileObjectNotFound(path=file_object.path) from fnfe
+
+    async def exists(self, file_object: FileObject) -> bool:
+        return await aiofiles.os.path.isfile(self._get_path(file_object))
+
+    async def get_content_stream(
+        self, file_object: FileObject, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        path = self._get_path(file_object)
+        try:
+            await aiofiles.os.stat(path)
+        except FileNotFoundError as fnfe:
+            raise FileObjectNotFound(path=file_object.path) from fnfe
+        return _iter_file(path, file_object, chunk_size)
+
+    async def set_content(self, file_object: FileObject, content: str):
+        await self.set_content_stream(file_object, iter_chunks(content.encode("utf-8")))
+
+    async def set_content_stream(self, file_object: FileObject, chunks: AsyncIterable[bytes]):
+        path = self._get_path(file_object)
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, mode="wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+            await aiofiles.os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, parse_obj_as
-from typing import Callable, Type, Dict, cast
+from pydantic import BaseModel
+from typing import Any, Callable, Type, Dict, Optional, cast
 from typing_extensions import Self
 import json
 
@@ -58,19 +58,26 @@ class NamedModel(BaseModel):
         else:
             raise ValueError(f"Class {cls} does not have a namespace")
 
-    @classmethod
-    def _iter_subclasses(cls):
-        """Iterate over the subclasses for a
-        particular type `cls` including `cls` itself.
-        """
-        global named_model_registry
-        if cls is not NamedModel:
-            if cls.get_class_namespace() not in named_model_registry:
-                named_model_registry[cls.get_class_namespace()] = cls
-
-            yield cls
-        for sk in cls.__subclasses__():
-            yield from sk._iter_subclasses()
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Register subclasses that declare their own namespace."""
+        super().__init_subclass__(**kwargs)
+        config = cls.__dict__.get("Config", None)
+        if config is None or "__ns__" not in vars(config):
+            return
+        ns = str(config.__ns__)
+        existing = named_model_registry.get(ns, None)
+        if (
+            existing is not None
+            and existing is not cls
+            # allow a class to be redefined, e.g. when its module is reloaded
+            and (existing.__module__, existing.__qualname__)
+            != (cls.__module__, cls.__qualname__)
+        ):
+            raise NamedModelConflict(
+                f"Namespace {ns} of {cls.__module__}.{cls.__qualname__} is already "
+                f"used by {existing.__module__}.{existing.__qualname__}"
+            )
+        named_model_registry[ns] = cls
 
     def dict(self, *args, **kwargs):
         """When we convert to a dict, we want
@@ -81,43 +88,52 @@ class NamedModel(BaseModel):
         d[NS_KEY] = self.get_class_namespace()
         return d
 
-    def json(self, *args, **kwargs):
-        d = self.__config__.json_loads(super().json(*args, **kwargs))
+    def json(
+        self,
+        *,
+        include=None,
+        exclude=None,
+        by_alias: bool = False,
+        skip_defaults: Optional[bool] = None,
+        exclude_unset: bool = False,
+        exclude_defaults: bool = False,
+        exclude_none: bool = False,
+        encoder: Optional[Callable[[Any], Any]] = None,
+        models_as_dict: bool = True,
+        **dumps_kwargs: Any,
+    ) -> str:
+        """Same as BaseModel.json but the namespace is added
+        before the data is serialized, so it is serialized once.
+        As before, `dumps_kwargs` (e.g. indent) are ignored and the
+        json is always compact.
+        """
+        if skip_defaults is not None:
+            exclude_unset = skip_defaults
+        d = dict(
+            self._iter(
+                to_dict=models_as_dict,
+                by_alias=by_alias,
+                include=include,
+                exclude=exclude,
+                exclude_unset=exclude_unset,
+                exclude_defaults=exclude_defaults,
+                exclude_none=exclude_none,
+            )
+        )
         NS_KEY = self._get_ns_key()
         d[NS_KEY] = self.get_class_namespace()
-        return self.__config__.json_dumps(d)
+        return self.__config__.json_dumps(d, default=encoder or self.__json_encoder__)
 
     @classmethod
     def parse_obj(cls, data, *args, **kwargs) -> Self:
-        NS_KEY = cls._get_ns_key()
-
-        def data_has_ns_info(o):
-            """This will tell us whether we should
-            try parsing `data` or not
-            """
-            return isinstance(o, dict) and NS_KEY in data and isinstance(o[NS_KEY], str)
-
-        def subclass_has_ns_info(sk):
-            return hasattr(sk, NS_KEY) and isinstance(getattr(sk, NS_KEY), str)
-
-        def subclass_has_name(name: str) -> Callable[[Type["NamedModel"]], bool]:
-            def _check_name(sk: Type["NamedModel"]) -> bool:
-                return sk.get_class_namespace() == name
-
-            return _check_name
-
-        def get_subclass_for_ns(ns: str):
-            if ns not in named_model_registry:
-                list(cls._iter_subclasses())
-            return named_model_registry.get(ns, None)
-
-        # if data has the namespace information we are looking for
-        if data_has_ns_info(data):
-            subclass = get_subclass_for_ns(data[NS_KEY])
-            if subclass is not None:
-                return cast(Self, parse_obj_as(subclass, data))
-
-        return parse_obj_as(cls, data)
+        # if data has the namespace of a registered model, build that model
+        if isinstance(data, dict):
+            ns = data.get(cls._get_ns_key(), None)
+            if isinstance(ns, str):
+                subclass = named_model_registry.get(ns, None)
+                if subclass is not None:
+                    return cast(Self, subclass(**data))
+        return super().parse_obj(data)
 
     class Config:
         # the name of this type (the namespace)
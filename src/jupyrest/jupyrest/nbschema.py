@@ -1,19 +1,34 @@
 import json
+import os
+from abc import ABC, abstractmethod
 from nbformat.notebooknode import NotebookNode
 import scrapbook as sb
 from jsonschema import Draft7Validator, RefResolver
 from jsonschema.exceptions import best_match
-from typing import Optional, Dict, Type, Union, Any, Set, List, Iterable
-from pydantic.schema import schema as pydantic_schema
-from unittest.mock import patch
+from typing import Optional, Dict, Type, Union, Any, Set, List, Iterable, Tuple
+from pydantic.schema import (
+    get_flat_models_from_models,
+    get_model_name_map,
+    model_process_schema,
+)
 from urllib.parse import urlparse
-from pydantic import BaseModel
+from pydantic import BaseModel, parse_obj_as
+from pydantic.json import pydantic_encoder
+from dataclasses import dataclass
 from datetime import datetime, date
 from papermill.translators import papermill_translators, PythonTranslator
 from enum import Enum
 from copy import deepcopy
+import logging
 from .model import NamedModel
 
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover
+    fastjsonschema = None
+
+logger = logging.getLogger(__name__)
+
 class SchemaValidationResponse(BaseModel):
     is_valid: bool
     error: Optional[str] = None
@@ -30,6 +45,9 @@ class ModelCollection:
 
     def __init__(self) -> None:
         self._map: Dict[str, Type[NbSchemaBase]] = {}
+        # JSON schema definitions generated for each alias
+        self._definitions: Dict[str, Dict[str, Dict]] = {}
+        self._model_name_map: Optional[Dict[Any, str]] = None
 
     def add_model(self, alias: str, model_type: Type[NbSchemaBase], overwrite=False):
         """
@@ -38,6 +56,34 @@ class ModelCollection:
         """
         if alias not in self._map or overwrite:
             self._map[alias] = model_type
+            self._definitions.clear()
+            self._model_name_map = None
+
+    def _get_model_name_map(self) -> Dict[Any, str]:
+        # models of the collection are named by their alias, models
+        # they reference but are not in the collection keep pydantic's name
+        if self._model_name_map is None:
+            flat_models = get_flat_models_from_models(list(self._map.values()))
+            name_map = get_model_name_map(flat_models)
+            name_map.update({model_type: alias for alias, model_type in self._map.items()})
+            self._model_name_map = name_map
+        return self._model_name_map
+
+    def get_definitions(self, alias: str) -> Dict[str, Dict]:
+        """
+        JSON schema definitions of the model with `alias` (under the
+        alias) and of the models it references, by definition name.
+        Generated once per alias, callers must not modify them.
+        """
+        model_type = self.get_model(alias=alias)
+        if alias not in self._definitions:
+            model_schema, definitions, _ = model_process_schema(
+                model_type, model_name_map=self._get_model_name_map()
+            )
+            definitions = dict(definitions)
+            definitions[alias] = model_schema
+            self._definitions[alias] = definitions
+        return self._definitions[alias]
 
     def has_alias(self, alias: str) -> bool:
         return alias in self._map
@@ -60,6 +106,18 @@ class ModelCollection:
         raise KeyError(f"Alias for model {model_type} not found.")
 
 
+def _encode_model_values(value: Any) -> Any:
+    """Encode what o.dict() returns the way o.json() would, without
+    serializing it to a string."""
+    if isinstance(value, dict):
+        return {k: _encode_model_values(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_model_values(v) for v in value]
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return _encode_model_values(pydantic_encoder(value))
+
+
 class NbSchemaEncoder(json.JSONEncoder):
     """
     JSONEncoder that can encode NbSchemaBase objects to json().
@@ -68,7 +126,11 @@ class NbSchemaEncoder(json.JSONEncoder):
 
     def default(self, o: Any) -> Any:
         if isinstance(o, NbSchemaBase):
-            return json.loads(o.json())
+            if o.__config__.json_encoders or o.__custom_root_type__:
+                # custom encoders and root types only apply within the model's json()
+                return json.loads(o.json())
+            # serialized in the same pass as the data around the model
+            return _encode_model_values(o.dict())
         elif isinstance(o, (datetime, date)):
             return o.isoformat()
         else:
@@ -95,18 +157,121 @@ class OutputResult(NamedModel):
         __ns__ = "jupyrest.nbschema.OutputResult"
 
 
+class _InjectionPlan(ABC):
+    """Injects models into the part of a payload a schema node describes.
+    Payloads are not modified, containers on the way to a model are copied."""
+
+    @abstractmethod
+    def apply(self, payload: Any) -> Any:
+        pass
+
+
+@dataclass
+class _ModelPlan(_InjectionPlan):
+    model_type: Type[NbSchemaBase]
+
+    def apply(self, payload: Any) -> Any:
+        return self.model_type.parse_obj(payload)
+
+
+@dataclass
+class _ObjectPlan(_InjectionPlan):
+    # only the properties that lead to a model
+    properties: Dict[str, _InjectionPlan]
+
+    def apply(self, payload: Any) -> Any:
+        if not isinstance(payload, dict):
+            return payload
+        injected = dict(payload)
+        for prop, plan in self.properties.items():
+            if prop in payload and payload[prop] is not None:
+                injected[prop] = plan.apply(payload[prop])
+        return injected
+
+
+@dataclass
+class _ArrayPlan(_InjectionPlan):
+    items: _InjectionPlan
+
+    def __post_init__(self):
+        # one pydantic call for the whole array. parse_obj_as does not
+        # call parse_obj, so models that override it (e.g. NamedModel)
+        # are parsed item by item.
+        self._bulk_parse = (
+            isinstance(self.items, _ModelPlan)
+            and getattr(self.items.model_type.parse_obj, "__func__", None)
+            is BaseModel.parse_obj.__func__  # type: ignore
+        )
+
+    def apply(self, payload: Any) -> Any:
+        if not isinstance(payload, list):
+            return payload
+        if self._bulk_parse:
+            return parse_obj_as(List[self.items.model_type], payload)  # type: ignore
+        return [self.items.apply(item) if item is not None else item for item in payload]
+
+
+@dataclass
+class _AnyOfPlan(_InjectionPlan):
+    # (validator of the resolved branch schema, plan or None) per branch
+    branches: List[Tuple[Draft7Validator, Optional[_InjectionPlan]]]
+
+    def apply(self, payload: Any) -> Any:
+        # the first branch the payload is valid for decides, as in oneOf
+        for validator, plan in self.branches:
+            if validator.is_valid(payload):
+                return plan.apply(payload) if plan is not None else payload
+        return payload
+
+
+@dataclass
+class _CompiledSchema:
+    # kept so that id(schema) is not reused while the entry exists
+    schema: Dict
+    validator: Draft7Validator
+    # generated validation function, None with the jsonschema backend
+    fast_validator: Optional[Any] = None
+
+
 class NotebookSchemaProcessor:
 
     OUTPUTS_KEY = "nbschema_outputs"
     SCHEME = "nbschema"
-
-    def __init__(self, models: Dict[str, Type[NbSchemaBase]]) -> None:
+    # set in the kernel when jupyrest collects the output from a file
+    OUTPUT_PATH_ENV_VAR = "JUPYREST_OUTPUT_PATH"
+    VALIDATION_BACKENDS = ("jsonschema", "fastjsonschema")
+    # fastjsonschema accepts instances that jsonschema rejects for these
+    # (e.g. multipleOf 0.1 with 0.3), schemas using them are validated
+    # by jsonschema only
+    FAST_VALIDATION_UNSAFE_KEYWORDS = frozenset(
+        ("multipleOf", "pattern", "patternProperties", "const")
+    )
+
+    def __init__(
+        self, models: Dict[str, Type[NbSchemaBase]], validation_backend: str = "jsonschema"
+    ) -> None:
+        """
+        With `validation_backend="fastjsonschema"` compiled schemas are
+        also turned into generated Python code, which validates large
+        payloads much faster. jsonschema still produces the error message
+        of an invalid instance, and validates schemas fastjsonschema
+        cannot compile or that use FAST_VALIDATION_UNSAFE_KEYWORDS.
+        """
+        if validation_backend not in self.VALIDATION_BACKENDS:
+            raise ValueError(f"Unknown validation backend {validation_backend}")
+        if validation_backend == "fastjsonschema" and fastjsonschema is None:
+            raise ValueError("The fastjsonschema validation backend requires fastjsonschema")
+        self.validation_backend = validation_backend
         self._models = ModelCollection()
         for model_alias, model_type in models.items():
             self._models.add_model(alias=model_alias, model_type=model_type)
         self._ref_resolver = RefResolver(
             "", {}, handlers={self.SCHEME: self._resolve_ref}
         )
+        # schemas passed to compile_schema and compile_injection_plan, by
+        # id(schema). Lookups check that the entry is for the same object.
+        self._compiled_schemas: Dict[int, _CompiledSchema] = {}
+        self._injection_plans: Dict[int, Tuple[Dict, Optional[_InjectionPlan]]] = {}
         papermill_translators.register("python", NbSchemaTranslator)
 
     @classmethod
@@ -116,14 +281,74 @@ class NotebookSchemaProcessor:
             raise ValueError(f"Invalid uri scheme {scheme}")
         return uri.replace(f"{cls.SCHEME}://", "")
 
+    def _get_compiled_schema(self, schema: Dict) -> Optional[_CompiledSchema]:
+        compiled = self._compiled_schemas.get(id(schema), None)
+        return compiled if compiled is not None and compiled.schema is schema else None
+
     def _get_validator(self, schema: Dict):
+        compiled = self._get_compiled_schema(schema)
+        if compiled is not None:
+            return compiled.validator
         Draft7Validator.check_schema(schema)
         return Draft7Validator(schema=schema)
 
+    def compile_schema(self, schema: Dict):
+        """
+        Check `schema` and keep its validator for validate_instance
+        calls with this same schema object. The schema must not be
+        modified afterwards.
+
+        Raises jsonschema.exceptions.SchemaError if the schema is invalid.
+        """
+        Draft7Validator.check_schema(schema)
+        compiled = _CompiledSchema(schema=schema, validator=Draft7Validator(schema=schema))
+        self._compiled_schemas[id(schema)] = compiled
+        if self.validation_backend == "fastjsonschema" and not self._uses_keywords(
+            schema, self.FAST_VALIDATION_UNSAFE_KEYWORDS
+        ):
+            try:
+                # like Draft7Validator: no defaults filled in, formats not checked
+                compiled.fast_validator = fastjsonschema.compile(
+                    schema,
+                    use_default=False,
+                    use_formats=False,
+                    detailed_exceptions=False,
+                )
+            except Exception:
+                logger.warning(
+                    "Schema not supported by fastjsonschema, using jsonschema",
+                    exc_info=True,
+                )
+
+    @classmethod
+    def _uses_keywords(cls, schema: Any, keywords: frozenset) -> bool:
+        # property names that look like keywords count too, which only
+        # costs the fast path
+        if isinstance(schema, dict):
+            return any(
+                key in keywords or cls._uses_keywords(value, keywords)
+                for key, value in schema.items()
+            )
+        if isinstance(schema, list):
+            return any(cls._uses_keywords(item, keywords) for item in schema)
+        return False
+
+    def clear_compiled_schemas(self):
+        self._compiled_schemas.clear()
+        self._injection_plans.clear()
+
 
     def validate_instance(
         self, instance: Dict, schema: Dict
     ) -> SchemaValidationResponse:
+        compiled = self._get_compiled_schema(schema)
+        if compiled is not None and compiled.fast_validator is not None:
+            try:
+                compiled.fast_validator(instance)
+                return SchemaValidationResponse(is_valid=True)
+            except fastjsonschema.JsonSchemaValueException:
+                # jsonschema reports the error below
+                pass
         # Check that this is a valid JSONSchema. Raise an exception if it is not.
         validator = self._get_validator(schema=schema)
         error = best_match(validator.iter_errors(instance=instance))
@@ -139,57 +364,86 @@ class NotebookSchemaProcessor:
     def models(self):
         return self._models
 
+    def _build_injection_plan(self, schema: Any, root: Any = None) -> Optional[_InjectionPlan]:
+        """None when no model can appear under `schema`, a node of `root`."""
+        if not isinstance(schema, dict):
+            return None
+        if root is None:
+            root = schema
+        # Case 1: schema is a $ref to nbschema://
+        ref = schema.get("$ref", None)
+        if isinstance(ref, str) and urlparse(ref).scheme == self.SCHEME:
+            return _ModelPlan(model_type=self._models.get_model(alias=self._uri_to_alias(uri=ref)))
+        # Case 2: schema "type" is an object or array.
+        schema_type = schema.get("type", None)
+        if schema_type == "object":
+            properties = {}
+            for prop, prop_schema in schema.get("properties", {}).items():
+                plan = self._build_injection_plan(prop_schema, root)
+                if plan is not None:
+                    properties[prop] = plan
+            return _ObjectPlan(properties=properties) if properties else None
+        if schema_type == "array":
+            items = self._build_injection_plan(schema.get("items", None), root)
+            return _ArrayPlan(items=items) if items is not None else None
+        # Case 3: anyOf / oneOf, the payload is matched against each branch
+        branches = schema.get("anyOf", None) or schema.get("oneOf", None)
+        if isinstance(branches, list):
+            plans = [self._build_injection_plan(branch, root) for branch in branches]
+            if all(plan is None for plan in plans):
+                return None
+            # refs in a branch (e.g. to #/definitions) are relative to the root
+            resolver = RefResolver.from_schema(
+                self.fix_schemas(schema=root, add_model_definitions=True)
+            )
+            return _AnyOfPlan(
+                branches=[
+                    (
+                        Draft7Validator(
+                            self.fix_schemas(schema=branch, add_model_definitions=False),
+                            resolver=resolver,
+                        ),
+                        plan,
+                    )
+                    for branch, plan in zip(branches, plans)
+                ]
+            )
+        return None
+
+    def compile_injection_plan(self, schema: Dict):
+        """
+        Keep the injection plan of `schema` for inject_model_refs calls
+        with this same schema object. The schema must not be modified
+        afterwards.
+        """
+        self._injection_plans[id(schema)] = (schema, self._build_injection_plan(schema))
+
     def inject_model_refs(self, schema: Dict, payload: Dict):
         """
         This function assumes that `payload` adheres to the JSON Schema
         defined by `schema`.
 
-        Does not support "anyOf", "allOf", "oneOf" or "contains".
-
-        Recursively walk the key value pairs of each of the input
-        dicts (schema and payload) in lockstep.
-
         Wherever `schema` has a $ref to an nbschema model, replace
         the corresponding object in `payload` with a instance of the
         NbSchemaBase class that is referenced. NbSchemaBase objects know
-        how to create themselves from a dict.
+        how to create themselves from a dict. The refs can be nested in
+        "properties" of objects, "items" of arrays and branches of
+        "anyOf" or "oneOf", where the first branch the payload is valid
+        for is used. "allOf" and "contains" are not supported.
+
+        `payload` is not modified, the dicts and lists that lead to a
+        model are copied.
 
         Returns a payload object with NbSchemaBase objects injected if any.
         """
         if schema is None or payload is None:
             return payload
-        # Case 1: schema is a $ref to nbschema://
-        ref = schema.get("$ref", None)
-        if ref is not None:
-            u = urlparse(ref)
-            if u.scheme == "nbschema":
-                alias = self._uri_to_alias(uri=ref)
-                klass = self._models.get_model(alias=alias)
-                obj = klass.parse_obj(payload)
-                return obj
-
-        # Case 2: schema "type" is an object or array.
-        schema_type = schema.get("type", None)
-        if schema_type is not None:
-            if schema_type == "object":
-                # if object, recursive call on kv pairs
-                props = schema.get("properties", {})
-                for prop in props:
-                    if prop in payload:
-                        new_schema = props[prop]
-                        new_payload = payload[prop]
-                        payload[prop] = self.inject_model_refs(new_schema, new_payload)
-                return payload
-            elif schema_type == "array":
-                # if list, recursive call on list items
-                item_schema = schema.get("items", None)
-                if item_schema is not None:
-                    objs = []
-                    for item in payload:
-                        obj = self.inject_model_refs(item_schema, item)
-                        objs.append(obj)
-                    return objs
-        return payload
+        compiled = self._injection_plans.get(id(schema), None)
+        if compiled is not None and compiled[0] is schema:
+            plan = compiled[1]
+        else:
+            plan = self._build_injection_plan(schema)
+        return plan.apply(payload) if plan is not None else payload
 
     @classmethod
     def save_output(cls, data: Union[str, NbSchemaBase], **kwargs):
@@ -204,6 +458,9 @@ class NotebookSchemaProcessor:
         >>> save_output(data='{"json_key": "json_value"}')
         >>> save_output(data=json.dumps(my_obj))
 
+        When jupyrest provides an output file (see SpoolNotebookOutputReader)
+        the data is written to it instead and does not appear in the notebook.
+
         :param data: data to save
         :param kwagrs: passed on to scrapbook.glue
         """
@@ -214,6 +471,13 @@ class NotebookSchemaProcessor:
             json_str = json.dumps(data, cls=NbSchemaEncoder)
         # test that this string is valid JSON
         json.loads(json_str)
+        output_path = os.environ.get(cls.OUTPUT_PATH_ENV_VAR, None)
+        if output_path:
+            tmp_path = f"{output_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json_str)
+            os.replace(tmp_path, output_path)
+            return
         sb.glue(cls.OUTPUTS_KEY, json_str, **kwargs)
 
     def get_notebook_output(self, notebook: NotebookNode) -> OutputResult:
@@ -279,21 +543,11 @@ class NotebookSchemaProcessor:
             curr["$ref"] = ref_value
 
         def resolve_definitions(model_refs: Iterable[str]):
-            model_name_map = {}
-            models = []
+            definitions = {}
             for model_ref in model_refs:
                 alias = NotebookSchemaProcessor._uri_to_alias(uri=model_ref)
-                model_type = mc.get_model(alias)
-                model_name_map[model_type] = alias
-                models.append(model_type)
-
-            def new_get_model_name_map(*args, **kwargs):
-                return model_name_map
-
-            with patch(
-                "pydantic.schema.get_model_name_map", new=new_get_model_name_map
-            ):
-                return pydantic_schema(models)
+                definitions.update(deepcopy(mc.get_definitions(alias)))
+            return {"definitions": definitions} if definitions else {}
 
         def update_nbschema_refs(
             obj: Dict, ref_locs: Dict[str, List[List[Union[str, int]]]]
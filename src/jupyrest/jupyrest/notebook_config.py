@@ -1,13 +1,118 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Protocol, Iterable
+import hashlib
+import os
+from copy import deepcopy
+from dataclasses import dataclass
+from pathlib import Path
+import nbformat
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Optional, Dict, Protocol, Iterable, List
 from nbformat.notebooknode import NotebookNode
-from papermill.iorw import load_notebook_node
+from papermill import __version__ as papermill_version
+from .notebook_execution.entity import ExecutionArtifactType
+
+# key in the parameterized notebook's metadata where jupyrest records
+# details about the execution (e.g. the notebook id) for executors
+JUPYREST_METADATA_KEY = "jupyrest"
+
+@dataclass
+class NotebookTemplate:
+    """A parsed and validated notebook file. `notebook` is shared
+    between executions and must not be modified, use `new_notebook`."""
+    notebook: NotebookNode
+    content_hash: str
+    mtime_ns: int
+    size: int
+    # positions of the first cells tagged `parameters` and
+    # `injected-parameters`, -1 when there is none
+    parameters_cell_index: int = -1
+    injected_parameters_cell_index: int = -1
+
+    @classmethod
+    def load(cls, notebook_path: str) -> "NotebookTemplate":
+        stat = os.stat(notebook_path)
+        content = Path(notebook_path).read_bytes()
+        # same as papermill's load_notebook_node
+        notebook = nbformat.reads(content.decode("utf-8"), as_version=4)
+        notebook = nbformat.v4.upgrade(notebook) or notebook
+        if not hasattr(notebook.metadata, "papermill"):
+            notebook.metadata["papermill"] = {
+                "default_parameters": dict(),
+                "parameters": dict(),
+                "environment_variables": dict(),
+                "version": papermill_version,
+            }
+        for cell in notebook.cells:
+            if not hasattr(cell.metadata, "tags"):
+                cell.metadata["tags"] = []
+            if not hasattr(cell.metadata, "papermill"):
+                cell.metadata["papermill"] = dict()
+        def find_tagged_cell(tag: str) -> int:
+            return next(
+                (i for i, cell in enumerate(notebook.cells) if tag in cell.metadata.tags),
+                -1,
+            )
+
+        return cls(
+            notebook=notebook,
+            content_hash=hashlib.sha256(content).hexdigest(),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            parameters_cell_index=find_tagged_cell("parameters"),
+            injected_parameters_cell_index=find_tagged_cell("injected-parameters"),
+        )
+
+    def is_stale(self, notebook_path: str) -> bool:
+        stat = os.stat(notebook_path)
+        return (stat.st_mtime_ns, stat.st_size) != (self.mtime_ns, self.size)
+
+    def new_notebook(self) -> NotebookNode:
+        """Copy of the notebook that can be executed. Every cell is a new
+        node with its own metadata, attachments and output list. Sources
+        (strings) and outputs (replaced, never modified, by executors)
+        are shared with the template."""
+        notebook = NotebookNode(self.notebook)
+        notebook.metadata = deepcopy(self.notebook.metadata)
+        notebook.cells = [self._copy_cell(cell) for cell in self.notebook.cells]
+        return notebook
+
+    @staticmethod
+    def _copy_cell(cell: NotebookNode) -> NotebookNode:
+        new_cell = NotebookNode(cell)
+        new_cell.metadata = deepcopy(cell.metadata)
+        if "attachments" in cell:
+            new_cell.attachments = deepcopy(cell.attachments)
+        if "outputs" in cell:
+            new_cell.outputs = list(cell.outputs)
+        return new_cell
+
+
+class NotebookCacheConfig(BaseModel):
+    # only enable for notebooks whose result depends on nothing but
+    # the notebook and its parameters
+    enabled: bool = False
+    # None keeps results until the cache evicts them
+    ttl_seconds: Optional[int] = None
 
 
 class NotebookConfigFile(BaseModel):
     id: Optional[str] = None
     input: Dict = {}
     output: Dict = {}
+    # modules the ZygoteNotebookExecutor imports before forking kernels
+    preload_modules: List[str] = []
+    # scheduling priority class, unless the request sets one
+    priority: Optional[str] = None
+    # maximum number of executions of this notebook running at once
+    max_concurrency: Optional[int] = None
+    # artifacts stored for an execution unless the request selects them,
+    # None stores all of them
+    artifacts: Optional[List[ExecutionArtifactType]] = None
+    # identical requests (same notebook, parameters and artifacts) that
+    # arrive while one of them is running share its execution
+    coalesce: bool = False
+    # reuse the artifacts of an earlier successful execution with the
+    # same notebook content, parameters and artifacts
+    cache: NotebookCacheConfig = NotebookCacheConfig()
 
 
 class NotebookConfig(BaseModel):
@@ -17,6 +122,22 @@ class NotebookConfig(BaseModel):
     output: Dict = {}
     resolved_input_schema: Dict = {}
     resolved_output_schema: Dict = {}
+    preload_modules: List[str] = []
+    priority: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    artifacts: Optional[List[ExecutionArtifactType]] = None
+    coalesce: bool = False
+    cache: NotebookCacheConfig = NotebookCacheConfig()
+    _template: Optional[NotebookTemplate] = PrivateAttr(default=None)
+
+    def get_template(self) -> NotebookTemplate:
+        """The parsed notebook, loaded again when the file changes."""
+        if self._template is None or self._template.is_stale(self.notebook_path):
+            self._template = NotebookTemplate.load(self.notebook_path)
+        return self._template
 
     def load_notebook_node(self) -> NotebookNode:
-        return load_notebook_node(notebook_path=self.notebook_path)
\ No newline at end of file
+        return deepcopy(self.get_template().notebook)
+
+    def get_content_hash(self) -> str:
+        return self.get_template().content_hash
\ No newline at end of file
@@ -1,24 +1,89 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 from datetime import datetime
+import hashlib
 import json
 from .entity import (
     NotebookExecution,
     NotebookExecutionStatus,
     NotebookExecutionCompletionStatus,
     NotebookExecutionCompletionDetails,
+    ExecutionArtifactType,
 )
 from ..contracts import DependencyBag
-from ..error import InvalidInputSchema
+from ..notebook_config import NotebookConfig, JUPYREST_METADATA_KEY
+from ..error import InvalidInputSchema, NotebookExecutionNotFound
 from .common import _assert_status
 import logging
-import asyncio
 
 logger = logging.getLogger(__name__)
 
 
+def _get_execution_key(
+    notebook_config: NotebookConfig,
+    parameters: Dict[str, Any],
+    artifacts: Optional[List[ExecutionArtifactType]],
+) -> str:
+    """Identifies executions that produce the same result."""
+    key = dict(
+        notebook_id=notebook_config.id,
+        notebook_hash=notebook_config.get_content_hash(),
+        parameters=parameters,
+        artifacts=sorted(artifacts) if artifacts is not None else None,
+    )
+    canonical = json.dumps(key, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def _has_artifacts(
+    completion_details: NotebookExecutionCompletionDetails, deps: DependencyBag
+) -> bool:
+    file_objects = [
+        completion_details.ipynb,
+        completion_details.output,
+        completion_details.exception,
+    ]
+    if completion_details.ipynb is None or not deps.notebook_artifact_renderer.renders_html_on_read():
+        # otherwise html artifacts are rendered from the ipynb when read
+        file_objects += [completion_details.html, completion_details.html_report]
+    for file_object in file_objects:
+        if file_object is not None and not await deps.file_obj_client.exists(file_object):
+            return False
+    return True
+
+
+async def _get_in_flight_leader(
+    key: str, execution: NotebookExecution, deps: DependencyBag
+) -> Optional[NotebookExecution]:
+    coalescer = deps.notebook_execution_coalescer
+    while True:
+        leader_id = coalescer.lead_or_follow(key=key, execution_id=execution.execution_id)
+        if leader_id is None:
+            return None
+        # a leader accepted in this process is followed once it is saved
+        if not await coalescer.wait_saved(key=key, execution_id=leader_id):
+            # its save failed and it released the key
+            continue
+        try:
+            leader = await deps.notebook_execution_repository.get(execution_id=leader_id)
+        except NotebookExecutionNotFound:
+            # e.g. evicted from the repository
+            leader = None
+        if leader is not None and leader.status in (
+            NotebookExecutionStatus.ACCEPTED,
+            NotebookExecutionStatus.EXECUTING,
+        ):
+            return leader
+        # the leader finished without releasing the key
+        coalescer.release(key=key, execution_id=leader_id)
+
+
 async def accept(
-    notebook_id: str, parameters: Dict[str, Any], deps: DependencyBag
+    notebook_id: str,
+    parameters: Dict[str, Any],
+    deps: DependencyBag,
+    priority: Optional[str] = None,
+    artifacts: Optional[List[ExecutionArtifactType]] = None,
 ) -> NotebookExecution:
     notebook_config = await deps.notebook_repository.get(notebook_id=notebook_id)
     input_validation = deps.notebook_input_output_validator.validate_input(
@@ -33,11 +98,55 @@ async def accept(
             accepted_time=datetime.utcnow(),
             start_time=None,
             completion_details=None,
+            priority=priority or notebook_config.priority,
+            artifacts=artifacts if artifacts is not None else notebook_config.artifacts,
         )
     else:
         schema_error = input_validation.error or ""
         raise InvalidInputSchema(schema_error=schema_error)
-    await deps.notebook_execution_repository.save(execution=execution)
+    if notebook_config.cache.enabled or notebook_config.coalesce:
+        key = _get_execution_key(
+            notebook_config=notebook_config,
+            parameters=parameters,
+            artifacts=execution.artifacts,
+        )
+    if notebook_config.cache.enabled:
+        cached = await deps.notebook_result_cache.get(key=key)
+        if cached is not None and not await _has_artifacts(cached, deps=deps):
+            # e.g. removed by a file object client's retention
+            await deps.notebook_result_cache.delete(key=key)
+            cached = None
+        if cached is not None:
+            # completed right away with the artifacts of the cached execution
+            now = datetime.utcnow()
+            execution.status = NotebookExecutionStatus.COMPLETED
+            execution.start_time = now
+            execution.completion_details = cached.copy(update=dict(end_time=now))
+            await deps.notebook_execution_repository.save(execution=execution)
+            return execution
+    if notebook_config.coalesce:
+        leader = await _get_in_flight_leader(key=key, execution=execution, deps=deps)
+        if leader is not None:
+            # followers are never run, they resolve to the leader's state
+            execution.leader_execution_id = leader.execution_id
+            await deps.notebook_execution_repository.save(execution=execution)
+            return execution
+        execution.coalesce_key = key
+    try:
+        # raises ExecutionQueueFull before anything is saved
+        deps.notebook_execution_scheduler.admit(execution=execution)
+        await deps.notebook_execution_repository.save(execution=execution)
+        if execution.coalesce_key is not None:
+            deps.notebook_execution_coalescer.mark_saved(
+                key=execution.coalesce_key, execution_id=execution.execution_id
+            )
+    except Exception:
+        deps.notebook_execution_scheduler.withdraw(execution_id=execution.execution_id)
+        if execution.coalesce_key is not None:
+            deps.notebook_execution_coalescer.release(
+                key=execution.coalesce_key, execution_id=execution.execution_id
+            )
+        raise
     return execution
 
 
@@ -45,34 +154,104 @@ async def begin_execution(
     execution: NotebookExecution,
     deps: DependencyBag,
 ):
+    if execution.status == NotebookExecutionStatus.COMPLETED:
+        # served from the result cache
+        return
     _assert_status(
         execution=execution, expected_status=[NotebookExecutionStatus.ACCEPTED]
     )
-    await deps.notebook_execution_task_handler.submit_execution_task(
-        execution_id=execution.execution_id, deps=deps
-    )
+    if execution.leader_execution_id is not None:
+        return
+    try:
+        await deps.notebook_execution_task_handler.submit_execution_task(
+            execution_id=execution.execution_id, deps=deps
+        )
+    except Exception:
+        deps.notebook_execution_scheduler.withdraw(execution_id=execution.execution_id)
+        if execution.coalesce_key is not None:
+            deps.notebook_execution_coalescer.release(
+                key=execution.coalesce_key, execution_id=execution.execution_id
+            )
+        raise
 
 
 async def complete_execution(
     execution_id: str,
     deps: DependencyBag,
 ):
-    execution = await deps.notebook_execution_repository.get(execution_id)
+    execution = None
+    try:
+        execution = await deps.notebook_execution_repository.get(execution_id)
+        notebook_config = await deps.notebook_repository.get(
+            notebook_id=execution.notebook_id
+        )
+        # the execution stays ACCEPTED while it waits for a slot
+        async with deps.notebook_execution_scheduler.slot(
+            execution=execution, notebook_config=notebook_config
+        ):
+            cache_key = None
+            if notebook_config.cache.enabled:
+                # keyed on the notebook content this execution runs
+                cache_key = _get_execution_key(
+                    notebook_config=notebook_config,
+                    parameters=execution.parameters,
+                    artifacts=execution.artifacts,
+                )
+            await _run_execution(
+                execution=execution, notebook_config=notebook_config, deps=deps
+            )
+        completion_details = execution.completion_details
+        if (
+            cache_key is not None
+            and completion_details is not None
+            and completion_details.completion_status
+            == NotebookExecutionCompletionStatus.SUCCEEDED
+        ):
+            await deps.notebook_result_cache.set(
+                key=cache_key,
+                completion_details=completion_details,
+                ttl_seconds=notebook_config.cache.ttl_seconds,
+            )
+    finally:
+        # e.g. the notebook was removed before the execution got a slot
+        deps.notebook_execution_scheduler.withdraw(execution_id=execution_id)
+        if execution is not None and execution.coalesce_key is not None:
+            deps.notebook_execution_coalescer.release(
+                key=execution.coalesce_key, execution_id=execution.execution_id
+            )
+
+
+async def _run_execution(
+    execution: NotebookExecution,
+    notebook_config: NotebookConfig,
+    deps: DependencyBag,
+):
     execution.status = NotebookExecutionStatus.EXECUTING
     execution.start_time = datetime.utcnow()
     await deps.notebook_execution_repository.save(execution=execution)
     _assert_status(
         execution=execution, expected_status=[NotebookExecutionStatus.EXECUTING]
     )
-    notebook_config = await deps.notebook_repository.get(
-        notebook_id=execution.notebook_id
-    )
     executor = deps.notebook_executor
     notebook = deps.notebook_parameterizier.parameterize_notebook(
         notebook_config=notebook_config, parameters=execution.parameters
     )
+    artifacts = set(
+        execution.artifacts
+        if execution.artifacts is not None
+        else ExecutionArtifactType
+    )
+    output_result = None
+    deps.notebook_output_reader.prepare_notebook(notebook=notebook)
     try:
-        exception = await executor.execute_notebook_async(notebook=notebook)
+        try:
+            exception = await executor.execute_notebook_async(notebook=notebook)
+            if ExecutionArtifactType.OUTPUT in artifacts:
+                output_result = deps.notebook_output_reader.get_output(notebook=notebook)
+        finally:
+            # before the notebook is rendered into artifacts
+            deps.notebook_output_reader.release_notebook(notebook=notebook)
+            notebook.metadata.pop(JUPYREST_METADATA_KEY, None)
     except Exception as e:
         logger.exception(f"Execution error {execution.execution_id}")
         execution.status = NotebookExecutionStatus.INTERNAL_ERROR
@@ -83,24 +262,23 @@ async def complete_execution(
             completion_status = NotebookExecutionCompletionStatus.FAILED
         else:
             completion_status = NotebookExecutionCompletionStatus.SUCCEEDED
-        output_result = deps.notebook_output_reader.get_output(notebook=notebook)
-
-        ipynb_path = deps.notebook_execution_file_namer.get_ipynb_name(
-            execution=execution
-        )
-        html_report_path = deps.notebook_execution_file_namer.get_html_report_name(
-            execution=execution
-        )
-        html_path = deps.notebook_execution_file_namer.get_html_name(
-            execution=execution
-        )
-
-        ipynb = deps.file_obj_client.new_file_object(path=ipynb_path)
-        html_report = deps.file_obj_client.new_file_object(path=html_report_path)
-        html = deps.file_obj_client.new_file_object(path=html_path)
+        file_namer = deps.notebook_execution_file_namer
+        ipynb = html_report = html = None
+        if ExecutionArtifactType.IPYNB in artifacts:
+            ipynb = deps.file_obj_client.new_file_object(
+                path=file_namer.get_ipynb_name(execution=execution)
+            )
+        if ExecutionArtifactType.HTML_REPORT in artifacts:
+            html_report = deps.file_obj_client.new_file_object(
+                path=file_namer.get_html_report_name(execution=execution)
+            )
+        if ExecutionArtifactType.HTML in artifacts:
+            html = deps.file_obj_client.new_file_object(
+                path=file_namer.get_html_name(execution=execution)
+            )
         exception_file = None
         output_file = None
-        if output_result.present:
+        if output_result is not None and output_result.present:
             output_path = deps.notebook_execution_file_namer.get_output_name(
                 execution=execution
             )
@@ -109,6 +287,7 @@ async def complete_execution(
                 output_file, output_result.json_str
             )
 
+        # the exception is always stored so failures can be diagnosed
         if exception is not None:
             exception_path = deps.notebook_execution_file_namer.get_exception_name(
                 execution=execution
@@ -116,23 +295,8 @@ async def complete_execution(
             exception_file = deps.file_obj_client.new_file_object(path=exception_path)
             await deps.file_obj_client.set_content(exception_file, exception)
 
-        await asyncio.gather(
-            deps.file_obj_client.set_content(
-                ipynb,
-                deps.notebook_converter.convert_notebook_to_str(notebook=notebook),
-            ),
-            deps.file_obj_client.set_content(
-                html_report,
-                deps.notebook_converter.convert_notebook_to_html(
-                    notebook=notebook, report_mode=True
-                ),
-            ),
-            deps.file_obj_client.set_content(
-                html,
-                deps.notebook_converter.convert_notebook_to_html(
-                    notebook=notebook, report_mode=False
-                ),
-            ),
+        await deps.notebook_artifact_renderer.write_artifacts(
+            notebook=notebook, ipynb=ipynb, html=html, html_report=html_report
         )
 
         execution.completion_details = NotebookExecutionCompletionDetails(
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from enum import Enum
 from datetime import datetime
 from ..file_object import FileObject
@@ -17,12 +17,21 @@ class NotebookExecutionCompletionStatus(str, Enum):
     FAILED = "FAILED"
 
 
+class ExecutionArtifactType(str, Enum):
+    HTML = "html"
+    IPYNB = "ipynb"
+    HTML_REPORT = "html_report"
+    OUTPUT = "output"
+    EXCEPTION = "exception"
+
+
 class NotebookExecutionCompletionDetails(NamedModel):
     completion_status: NotebookExecutionCompletionStatus
     end_time: datetime
-    ipynb: FileObject
-    html_report: FileObject
-    html: FileObject
+    # None when the artifact was not requested
+    ipynb: Optional[FileObject] = None
+    html_report: Optional[FileObject] = None
+    html: Optional[FileObject] = None
     exception: Optional[FileObject]
     output: Optional[FileObject]
 
@@ -38,6 +47,13 @@ class NotebookExecution(NamedModel):
     accepted_time: datetime
     start_time: Optional[datetime]
     completion_details: Optional[NotebookExecutionCompletionDetails] = None
+    priority: Optional[str] = None
+    # artifacts to store on completion, None stores all of them
+    artifacts: Optional[List[ExecutionArtifactType]] = None
+    # set on coalesced executions, which share the leader's execution
+    leader_execution_id: Optional[str] = None
+    # set on executions that followers can coalesce with
+    coalesce_key: Optional[str] = None
 
     class Config:
         __ns__ = "jupyrest.notebook_execution.entity.NotebookExecution"
\ No newline at end of file
@@ -1,36 +1,76 @@
-from enum import Enum
-from typing import Union
-from .entity import NotebookExecution, NotebookExecutionStatus
+import aiofiles.os
+from typing import AsyncIterator, Optional, Union
+from .entity import NotebookExecution, NotebookExecutionStatus, ExecutionArtifactType
 from ..contracts import DependencyBag
 from .common import _assert_status
-from ..error import NotebookExecutionArtifactNotFound
+from ..error import FileObjectNotFound, NotebookExecutionArtifactNotFound
+from ..file_object import FileObject, iter_chunks
 
 async def get_execution(execution_id: str, deps: DependencyBag) -> NotebookExecution:
     execution_repository = deps.notebook_execution_repository
     execution = await execution_repository.get(
         execution_id=execution_id
     )
+    if execution.leader_execution_id is not None:
+        # a coalesced execution reports the leader's progress and artifacts
+        leader = await execution_repository.get(
+            execution_id=execution.leader_execution_id
+        )
+        execution = leader.copy(
+            update=dict(
+                execution_id=execution.execution_id,
+                accepted_time=execution.accepted_time,
+                priority=execution.priority,
+                leader_execution_id=execution.leader_execution_id,
+                coalesce_key=None,
+            )
+        )
     return execution
 
-class ExecutionArtifactType(str, Enum):
-    HTML = "html"
-    IPYNB = "ipynb"
-    HTML_REPORT = "html_report"
-    OUTPUT = "output"
-    EXCEPTION = "exception"
+def _get_artifact_file_object(execution: NotebookExecution, artifact_type: ExecutionArtifactType) -> Optional[FileObject]:
+    completion_details = execution.completion_details
+    assert completion_details is not None
+    return {
+        ExecutionArtifactType.HTML: completion_details.html,
+        ExecutionArtifactType.HTML_REPORT: completion_details.html_report,
+        ExecutionArtifactType.IPYNB: completion_details.ipynb,
+        ExecutionArtifactType.OUTPUT: completion_details.output,
+        ExecutionArtifactType.EXCEPTION: completion_details.exception,
+    }.get(artifact_type, None)
+
+async def get_execution_artifact_path(execution: NotebookExecution, deps: DependencyBag, artifact_type: ExecutionArtifactType) -> Optional[str]:
+    """Local path of a stored artifact that can be served as a file,
+    None when the artifact has to be read with get_execution_artifact_stream.
+    """
+    _assert_status(execution=execution, expected_status=[NotebookExecutionStatus.COMPLETED])
+    file_obj = _get_artifact_file_object(execution=execution, artifact_type=artifact_type)
+    if file_obj is None:
+        return None
+    path = deps.file_obj_client.get_local_path(file_object=file_obj)
+    # lazily rendered html is not stored until it is first read
+    if path is None or not await aiofiles.os.path.isfile(path):
+        return None
+    return path
 
 async def get_execution_artifact(execution_id: Union[str, NotebookExecution], deps: DependencyBag, artifact_type: ExecutionArtifactType) -> str:
     if isinstance(execution_id, str):
         execution = await get_execution(execution_id=execution_id, deps=deps)
+    else:
+        execution = execution_id
     _assert_status(execution=execution, expected_status=[NotebookExecutionStatus.COMPLETED])
     completion_details = execution.completion_details
     assert completion_details is not None
-    if artifact_type == ExecutionArtifactType.HTML:
-        file_obj = completion_details.html
-    elif artifact_type == ExecutionArtifactType.IPYNB:
+    if artifact_type == ExecutionArtifactType.HTML and completion_details.html is not None:
+        # html artifacts may be rendered on first read
+        return await deps.notebook_artifact_renderer.read_html(
+            ipynb=completion_details.ipynb, html=completion_details.html, report_mode=False
+        )
+    elif artifact_type == ExecutionArtifactType.HTML_REPORT and completion_details.html_report is not None:
+        return await deps.notebook_artifact_renderer.read_html(
+            ipynb=completion_details.ipynb, html=completion_details.html_report, report_mode=True
+        )
+    elif artifact_type == ExecutionArtifactType.IPYNB and completion_details.ipynb is not None:
         file_obj = completion_details.ipynb
-    elif artifact_type == ExecutionArtifactType.HTML_REPORT:
-        file_obj = completion_details.html_report
     elif artifact_type == ExecutionArtifactType.OUTPUT and completion_details.output is not None:
         file_obj = completion_details.output
     elif artifact_type == ExecutionArtifactType.EXCEPTION and completion_details.exception is not None:
@@ -40,4 +80,43 @@ async def get_execution_artifact(execution_id: Union[str, NotebookExecution], de
     
     return await deps.file_obj_client.get_content(file_object=file_obj)
 
-    
\ No newline at end of file
+    
+
+async def _prepend(first_chunk: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        # e.g. azure's chunk iterator is not an async generator
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+async def _read_ahead(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        return iter_chunks(b"")
+    return _prepend(first_chunk, chunks)
+
+async def get_execution_artifact_stream(execution: NotebookExecution, deps: DependencyBag, artifact_type: ExecutionArtifactType) -> AsyncIterator[bytes]:
+    """Stream of the artifact's utf-8 encoded content. Missing artifacts
+    raise when this is awaited, before any chunk is read.
+    """
+    _assert_status(execution=execution, expected_status=[NotebookExecutionStatus.COMPLETED])
+    file_obj = _get_artifact_file_object(execution=execution, artifact_type=artifact_type)
+    if file_obj is None:
+        raise NotebookExecutionArtifactNotFound(artifact_name=artifact_type)
+    try:
+        chunks = await deps.file_obj_client.get_content_stream(file_object=file_obj)
+        # clients may open the file when the stream is first read, so a
+        # file removed meanwhile raises here and not once a response
+        # with the stream has started
+        return await _read_ahead(chunks)
+    except FileObjectNotFound:
+        if artifact_type not in (ExecutionArtifactType.HTML, ExecutionArtifactType.HTML_REPORT):
+            raise
+    # html artifacts may be rendered on first read
+    content = await get_execution_artifact(execution_id=execution, deps=deps, artifact_type=artifact_type)
+    return iter_chunks(content.encode("utf-8"))
@@ -0,0 +1,132 @@
+import asyncio
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from jupyrest.client import JupyrestClient
+from jupyrest.default_impl.artifact_renderer import DefaultNotebookArtifactRenderer
+from jupyrest.default_impl.notebook_converter import DefaultNotebookConverter
+from jupyrest.error import FileObjectNotFound
+from jupyrest.http.asgi import create_asgi_app
+from jupyrest.infra.in_memory.builder import InMemoryApplicationBuilder
+from jupyrest.infra.in_memory.file_object_client import InMemoryFileObjectClient
+from jupyrest.infra.local.builder import LocalApplicationBuilder
+from tests.start_http import Incident, serve_app
+
+notebooks_dir = Path(__file__).parent / "notebooks"
+
+
+class _CountingConverter(DefaultNotebookConverter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.html_renders = 0
+
+    async def convert_notebook_to_html_async(self, notebook, report_mode: bool) -> str:
+        self.html_renders += 1
+        # keeps the render in flight while other reads arrive
+        await asyncio.sleep(0.1)
+        return await super().convert_notebook_to_html_async(notebook, report_mode)
+
+
+def _new_renderer(lazy: bool):
+    converter = _CountingConverter()
+    client = InMemoryFileObjectClient()
+    renderer = DefaultNotebookArtifactRenderer(
+        notebook_converter=converter, file_obj_client=client, lazy=lazy
+    )
+    artifacts = {
+        name: client.new_file_object(f"notebook_executions/1/{name}")
+        for name in ("ipynb", "html", "html_report")
+    }
+    return renderer, converter, client, artifacts
+
+
+def _new_notebook():
+    return nbformat.v4.new_notebook(cells=[nbformat.v4.new_markdown_cell("# Title")])
+
+
+@pytest.mark.anyio
+async def test_eager_rendering():
+    renderer, converter, client, artifacts = _new_renderer(lazy=False)
+    await renderer.write_artifacts(notebook=_new_notebook(), **artifacts)
+    assert converter.html_renders == 2
+    for file_object in artifacts.values():
+        assert len(await client.get_content(file_object)) > 0
+
+
+@pytest.mark.anyio
+async def test_lazy_rendering():
+    renderer, converter, client, artifacts = _new_renderer(lazy=True)
+    await renderer.write_artifacts(notebook=_new_notebook(), **artifacts)
+    assert converter.html_renders == 0
+    with pytest.raises(FileObjectNotFound):
+        await client.get_content(artifacts["html"])
+    html = await renderer.read_html(
+        ipynb=artifacts["ipynb"], html=artifacts["html"], report_mode=False
+    )
+    assert "Title" in html
+    # stored on the first read
+    assert await client.get_content(artifacts["html"]) == html
+    assert await renderer.read_html(
+        ipynb=artifacts["ipynb"], html=artifacts["html"], report_mode=False
+    ) == html
+    assert converter.html_renders == 1
+
+
+@pytest.mark.anyio
+async def test_lazy_rendering_without_ipynb():
+    renderer, converter, client, artifacts = _new_renderer(lazy=True)
+    await renderer.write_artifacts(
+        notebook=_new_notebook(), ipynb=None, html=artifacts["html"], html_report=None
+    )
+    assert converter.html_renders == 1
+    assert len(await client.get_content(artifacts["html"])) > 0
+
+
+@pytest.mark.anyio
+async def test_concurrent_reads_share_a_render():
+    renderer, converter, client, artifacts = _new_renderer(lazy=True)
+    await renderer.write_artifacts(notebook=_new_notebook(), **artifacts)
+    reads = await asyncio.gather(
+        *[
+            renderer.read_html(ipynb=artifacts["ipynb"], html=artifacts["html"], report_mode=False)
+            for _ in range(5)
+        ]
+    )
+    assert len(set(reads)) == 1
+    assert converter.html_renders == 1
+    assert renderer._renders == {}
+
+
+def test_builders_forward_options(tmp_path):
+    builders = [
+        InMemoryApplicationBuilder(
+            notebooks_dir=notebooks_dir, models={"incident": Incident}, lazy_html_rendering=True
+        ),
+        LocalApplicationBuilder(
+            notebooks_dir=notebooks_dir,
+            artifacts_dir=tmp_path,
+            models={"incident": Incident},
+            lazy_html_rendering=True,
+        ),
+    ]
+    for builder in builders:
+        assert builder.notebook_artifact_renderer.lazy
+
+
+@pytest.mark.anyio
+async def test_html_rendered_on_first_read():
+    builder = InMemoryApplicationBuilder(
+        notebooks_dir=notebooks_dir, models={"incident": Incident}, lazy_html_rendering=True
+    )
+    async with serve_app(create_asgi_app(deps=builder.build())) as endpoint:
+        client = JupyrestClient(endpoint)
+        result = await client.execute_notebook_until_complete("delay", {"delay_seconds": 0})
+        assert result.execution_completion_status == "SUCCEEDED"
+        html_path = builder.notebook_execution_file_namer.get_html_name(
+            execution=await builder.notebook_execution_repository.get(result.execution_id)
+        )
+        assert html_path not in builder.file_obj_client._files
+        html = await client.get_execution_html(result.execution_id)
+        assert builder.file_obj_client._files[html_path] == html
@@ -0,0 +1,67 @@
+"""
+Parse throughput of stored execution records: NotebookExecution.parse_raw
+(what execution repositories do on get), NamedModel.parse_obj dispatching
+on the namespace key, and a record whose namespace is not registered.
+
+Run with: python tests/benchmarks/bench_named_model.py
+"""
+import json
+import timeit
+from datetime import datetime
+
+from jupyrest.file_object import FileObject
+from jupyrest.model import NamedModel
+from jupyrest.notebook_execution.entity import (
+    NotebookExecution,
+    NotebookExecutionCompletionDetails,
+    NotebookExecutionCompletionStatus,
+    NotebookExecutionStatus,
+)
+
+NUMBER = 20000
+
+
+def make_execution() -> NotebookExecution:
+    def file_object(name: str) -> FileObject:
+        return FileObject(path=f"notebook_executions/1234/{name}", scheme="memory")
+
+    return NotebookExecution(
+        execution_id="1234",
+        notebook_id="model_io",
+        parameters={"incidents": [{"id": i, "title": f"incident {i}"} for i in range(3)]},
+        status=NotebookExecutionStatus.COMPLETED,
+        accepted_time=datetime(2023, 1, 1),
+        start_time=datetime(2023, 1, 1, 0, 0, 1),
+        completion_details=NotebookExecutionCompletionDetails(
+            completion_status=NotebookExecutionCompletionStatus.SUCCEEDED,
+            end_time=datetime(2023, 1, 1, 0, 0, 2),
+            ipynb=file_object("ipynb"),
+            html_report=file_object("html_report"),
+            html=file_object("html"),
+            exception=None,
+            output=file_object("output"),
+        ),
+    )
+
+
+def main():
+    execution = make_execution()
+    raw = execution.json()
+    data = json.loads(raw)
+    unknown = dict(data, __ns__="unregistered")
+    assert NotebookExecution.parse_raw(raw) == execution
+    assert NamedModel.parse_obj(data) == execution
+    cases = {
+        "NotebookExecution.parse_raw": lambda: NotebookExecution.parse_raw(raw),
+        "NamedModel.parse_obj": lambda: NamedModel.parse_obj(data),
+        "NotebookExecution.parse_obj, unknown namespace": (
+            lambda: NotebookExecution.parse_obj(unknown)
+        ),
+    }
+    for name, case in cases.items():
+        seconds = timeit.timeit(case, number=NUMBER)
+        print(f"{name}: {NUMBER / seconds:,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
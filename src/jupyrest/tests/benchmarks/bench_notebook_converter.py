@@ -0,0 +1,52 @@
+"""
+Per-render cost of HTML conversion with a new HTMLExporter for every
+render (the previous behavior) and with DefaultNotebookConverter's
+reused exporters.
+
+Run with: python tests/benchmarks/bench_notebook_converter.py
+"""
+import timeit
+from pathlib import Path
+
+import nbformat
+from nbconvert import HTMLExporter
+
+from jupyrest.default_impl.notebook_converter import DefaultNotebookConverter
+
+NOTEBOOK_PATH = Path(__file__).parent.parent / "notebooks" / "model_io.ipynb"
+NUMBER = 20
+
+
+def render_with_new_exporter(notebook, report_mode: bool) -> str:
+    exporter = HTMLExporter()
+    if report_mode:
+        exporter = HTMLExporter(exclude_output_prompt=True, exclude_input=True)
+    (body, _) = exporter.from_notebook_node(notebook)
+    return body
+
+
+def main():
+    notebook = nbformat.read(NOTEBOOK_PATH, as_version=4)
+    converter = DefaultNotebookConverter()
+    for report_mode in (False, True):
+        # warm up both paths so module imports are not measured
+        assert render_with_new_exporter(notebook, report_mode) == (
+            converter.convert_notebook_to_html(notebook, report_mode)
+        )
+        before = timeit.timeit(
+            lambda: render_with_new_exporter(notebook, report_mode), number=NUMBER
+        )
+        after = timeit.timeit(
+            lambda: converter.convert_notebook_to_html(notebook, report_mode),
+            number=NUMBER,
+        )
+        print(
+            f"report_mode={report_mode}: "
+            f"new exporter {before / NUMBER * 1000:.1f} ms/render, "
+            f"reused exporter {after / NUMBER * 1000:.1f} ms/render "
+            f"({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Per-execution cost of parameterizing a large notebook with papermill
+(load the file, then papermill's parameterize_notebook, the previous
+behavior) and with DefaultNotebookParameterizier, which starts from
+the notebook config's cached template.
+
+Run with: python tests/benchmarks/bench_parameterizer.py
+"""
+import asyncio
+import tempfile
+import timeit
+from copy import deepcopy
+from pathlib import Path
+
+import nbformat
+from papermill.iorw import load_notebook_node
+from papermill.parameterize import parameterize_notebook
+
+from jupyrest.default_impl.notebook_repository import DefaultNotebookRepository
+from jupyrest.default_impl.parameterizer import DefaultNotebookParameterizier
+from jupyrest.nbschema import NotebookSchemaProcessor
+
+NUMBER = 20
+PARAMETERS = {"foo": "foo string", "bar": 500}
+
+
+def make_large_notebook(cell_count: int, output_size: int):
+    cells = [nbformat.v4.new_code_cell(source="foo = 'foo'\nbar = 0")]
+    cells[0].metadata["tags"] = ["parameters"]
+    for i in range(cell_count):
+        cells.append(nbformat.v4.new_markdown_cell(source=f"## Section {i}\n" + "text " * 50))
+        cell = nbformat.v4.new_code_cell(source=f"print(foo, bar, {i})")
+        cell.outputs = [
+            nbformat.v4.new_output("stream", name="stdout", text="x" * output_size)
+        ]
+        cells.append(cell)
+    return nbformat.v4.new_notebook(
+        cells=cells,
+        metadata={
+            "kernelspec": {"name": "python3", "display_name": "Python 3", "language": "python"},
+            "language_info": {"name": "python"},
+        },
+    )
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as notebooks_dir:
+        notebooks_dir = Path(notebooks_dir)
+        for cell_count, output_size in ((50, 100), (500, 1000), (2000, 5000)):
+            notebook_path = notebooks_dir / f"large_{cell_count}.ipynb"
+            nbformat.write(make_large_notebook(cell_count, output_size), str(notebook_path))
+            (notebooks_dir / f"large_{cell_count}.config.json").write_text("{}")
+        nbschema = NotebookSchemaProcessor(models={})
+        repository = DefaultNotebookRepository(notebooks_dir=notebooks_dir, nbschema=nbschema)
+        parameterizer = DefaultNotebookParameterizier(nbschema=nbschema, kernelspec_language="python")
+        # tests/parameterizer_test.py checks that both produce the same notebook
+        notebook_ids = sorted([notebook_id async for notebook_id in repository.iter_notebook_ids()])
+        for notebook_id in notebook_ids:
+            notebook_config = await repository.get(notebook_id)
+
+            def with_papermill():
+                notebook = load_notebook_node(notebook_config.notebook_path)
+                return parameterize_notebook(nb=notebook, parameters=deepcopy(PARAMETERS))
+
+            def with_template():
+                return parameterizer.parameterize_notebook(
+                    notebook_config=notebook_config, parameters=PARAMETERS
+                )
+
+            before = timeit.timeit(with_papermill, number=NUMBER)
+            after = timeit.timeit(with_template, number=NUMBER)
+            print(
+                f"{notebook_id}: papermill {before / NUMBER * 1000:.2f} ms, "
+                f"template {after / NUMBER * 1000:.2f} ms ({before / after:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from jupyrest.default_impl.builder import DefaultApplicationBuilder
+from jupyrest.infra.in_memory.execution_repository import InMemoryNotebookExecutionRepository
+from jupyrest.infra.in_memory.file_object_client import InMemoryFileObjectClient
+from jupyrest.notebook_execution.commands import accept
+from tests.start_http import Incident
+
+notebooks_dir = Path(__file__).parent / "notebooks"
+parameters = {"delay_seconds": 1}
+
+
+def _new_deps(**kwargs):
+    return DefaultApplicationBuilder(
+        notebooks_dir=notebooks_dir,
+        notebook_execution_repository=InMemoryNotebookExecutionRepository(),
+        file_object_client=InMemoryFileObjectClient(),
+        models={"incident": Incident},
+        **kwargs,
+    ).build()
+
+
+@pytest.mark.anyio
+async def test_follower_of_saved_leader():
+    deps = _new_deps()
+    leader = await accept(notebook_id="coalesce", parameters=parameters, deps=deps)
+    follower = await accept(notebook_id="coalesce", parameters=parameters, deps=deps)
+    assert leader.leader_execution_id is None
+    assert follower.leader_execution_id == leader.execution_id
+    assert deps.notebook_execution_scheduler.get_stats().queued == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_accepts():
+    deps = _new_deps()
+    repository = deps.notebook_execution_repository
+    save = repository.save
+
+    async def slow_save(execution):
+        await asyncio.sleep(0.05)
+        await save(execution=execution)
+
+    repository.save = slow_save
+    executions = await asyncio.gather(
+        *[accept(notebook_id="coalesce", parameters=parameters, deps=deps) for _ in range(10)]
+    )
+    leaders = [e for e in executions if e.leader_execution_id is None]
+    assert len(leaders) == 1
+    for execution in executions:
+        assert await repository.get(execution.execution_id) == execution
+        if execution.leader_execution_id is not None:
+            assert execution.leader_execution_id == leaders[0].execution_id
+    assert deps.notebook_execution_scheduler.get_stats().queued == 1
+
+
+@pytest.mark.anyio
+async def test_followers_take_over_when_the_leader_save_fails():
+    deps = _new_deps()
+    repository = deps.notebook_execution_repository
+    save = repository.save
+    saves = 0
+
+    async def slow_save(execution):
+        nonlocal saves
+        saves += 1
+        await asyncio.sleep(0.05)
+        if saves == 1:
+            raise RuntimeError("save failed")
+        await save(execution=execution)
+
+    repository.save = slow_save
+    results = await asyncio.gather(
+        *[accept(notebook_id="coalesce", parameters=parameters, deps=deps) for _ in range(3)],
+        return_exceptions=True,
+    )
+    assert isinstance(results[0], RuntimeError)
+    leaders = [e for e in results[1:] if e.leader_execution_id is None]
+    assert len(leaders) == 1
+    assert deps.notebook_execution_scheduler.get_stats().queued == 1
+
+
+@pytest.mark.anyio
+async def test_failed_save_releases_the_key():
+    deps = _new_deps()
+    repository = deps.notebook_execution_repository
+    save = repository.save
+
+    async def failing_save(execution):
+        raise RuntimeError("save failed")
+
+    repository.save = failing_save
+    with pytest.raises(RuntimeError):
+        await accept(notebook_id="coalesce", parameters=parameters, deps=deps)
+    repository.save = save
+    execution = await accept(notebook_id="coalesce", parameters=parameters, deps=deps)
+    assert execution.leader_execution_id is None
+    assert deps.notebook_execution_scheduler.get_stats().queued == 1
@@ -0,0 +1,115 @@
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from jupyrest.error import NotebookExecutionNotFound
+from jupyrest.infra.in_memory.builder import InMemoryApplicationBuilder
+from jupyrest.infra.in_memory.execution_repository import (
+    InMemoryNotebookExecutionRepository,
+    SnapshotNotebookExecutionRepository,
+)
+from tests.start_http import Incident
+from jupyrest.notebook_execution.entity import NotebookExecution, NotebookExecutionStatus
+
+
+def _make_execution(
+    execution_id: str, status: NotebookExecutionStatus, leader_execution_id=None
+) -> NotebookExecution:
+    return NotebookExecution(
+        execution_id=execution_id,
+        notebook_id="delay",
+        parameters={"delay_seconds": 1},
+        status=status,
+        accepted_time=datetime.utcnow(),
+        start_time=None,
+        leader_execution_id=leader_execution_id,
+    )
+
+
+@pytest.mark.anyio
+async def test_snapshot_repository_evicts_finished_executions():
+    repository = SnapshotNotebookExecutionRepository(max_entries=2)
+    running = _make_execution("running", NotebookExecutionStatus.EXECUTING)
+    await repository.create(running)
+    # changes after save do not reach the stored snapshot
+    running.status = NotebookExecutionStatus.ACCEPTED
+    assert (await repository.get("running")).status == NotebookExecutionStatus.EXECUTING
+    for execution_id in ("done1", "done2"):
+        await repository.create(_make_execution(execution_id, NotebookExecutionStatus.COMPLETED))
+    with pytest.raises(NotebookExecutionNotFound):
+        await repository.get("done1")
+    assert (await repository.get("done2")).execution_id == "done2"
+    stats = repository.get_stats()
+    assert (stats.entries, stats.hits, stats.misses, stats.evictions) == (2, 2, 1, 1)
+
+
+@pytest.mark.anyio
+async def test_snapshot_repository_evicts_followers_with_their_leader():
+    repository = SnapshotNotebookExecutionRepository(max_entries=4)
+    await repository.create(_make_execution("leader", NotebookExecutionStatus.EXECUTING))
+    await repository.create(
+        _make_execution("follower", NotebookExecutionStatus.ACCEPTED, leader_execution_id="leader")
+    )
+    await repository.create(_make_execution("running", NotebookExecutionStatus.EXECUTING))
+    await repository.create(_make_execution("done1", NotebookExecutionStatus.COMPLETED))
+    # followers of running leaders are not evicted
+    assert (await repository.get("follower")).status == NotebookExecutionStatus.ACCEPTED
+    await repository.save(_make_execution("leader", NotebookExecutionStatus.COMPLETED))
+    await repository.get("follower")
+    await repository.get("done1")
+    # the leader is used least recently and takes its follower with it
+    await repository.create(_make_execution("done2", NotebookExecutionStatus.COMPLETED))
+    for execution_id in ("leader", "follower"):
+        with pytest.raises(NotebookExecutionNotFound):
+            await repository.get(execution_id)
+    stats = repository.get_stats()
+    assert (stats.entries, stats.evictions) == (3, 2)
+    assert repository._followers == {}
+
+
+@pytest.mark.anyio
+async def test_snapshot_repository_expires_followers_with_their_leader():
+    repository = SnapshotNotebookExecutionRepository(ttl_seconds=0.1)
+    await repository.create(_make_execution("leader", NotebookExecutionStatus.EXECUTING))
+    await repository.create(
+        _make_execution("follower", NotebookExecutionStatus.ACCEPTED, leader_execution_id="leader")
+    )
+    await repository.save(_make_execution("leader", NotebookExecutionStatus.COMPLETED))
+    assert (await repository.get("follower")).status == NotebookExecutionStatus.ACCEPTED
+    time.sleep(0.2)
+    with pytest.raises(NotebookExecutionNotFound):
+        await repository.get("follower")
+    assert repository.get_stats().entries == 0
+
+
+def test_in_memory_builder_repository():
+    notebooks_dir = Path(__file__).parent / "notebooks"
+    builder = InMemoryApplicationBuilder(notebooks_dir=notebooks_dir, models={"incident": Incident})
+    assert type(builder.notebook_execution_repository) is InMemoryNotebookExecutionRepository
+    for kwargs in ({"snapshot_executions": True}, {"max_executions": 10}, {"execution_ttl_seconds": 60}):
+        builder = InMemoryApplicationBuilder(
+            notebooks_dir=notebooks_dir, models={"incident": Incident}, **kwargs
+        )
+        assert isinstance(builder.notebook_execution_repository, SnapshotNotebookExecutionRepository)
+
+
+@pytest.mark.anyio
+async def test_snapshot_repository_counts_bytes():
+    execution = _make_execution("done", NotebookExecutionStatus.COMPLETED)
+    repository = SnapshotNotebookExecutionRepository()
+    await repository.create(execution)
+    # sizes are not computed without a bound
+    assert repository.get_stats().bytes == 0
+    size = len(execution.json().encode())
+    repository = SnapshotNotebookExecutionRepository(max_bytes=size)
+    await repository.create(execution)
+    assert repository.get_stats().bytes == size
+    await repository.create(_make_execution("running", NotebookExecutionStatus.EXECUTING))
+    stats = repository.get_stats()
+    assert (stats.entries, stats.evictions) == (1, 1)
+    # over budget with only unfinished executions
+    await repository.create(_make_execution("running2", NotebookExecutionStatus.EXECUTING))
+    assert repository.get_stats().entries == 2
+    assert repository._finished == set()
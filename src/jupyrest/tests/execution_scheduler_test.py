@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+from jupyrest.default_impl.builder import DefaultApplicationBuilder
+from jupyrest.default_impl.execution_scheduler import DefaultNotebookExecutionScheduler
+from jupyrest.error import ExecutionQueueFull
+from jupyrest.http.asgi import create_asgi_app
+from jupyrest.infra.in_memory.execution_repository import InMemoryNotebookExecutionRepository
+from jupyrest.infra.in_memory.file_object_client import InMemoryFileObjectClient
+from jupyrest.notebook_config import NotebookConfig
+from jupyrest.notebook_execution.commands import accept
+from jupyrest.notebook_execution.entity import NotebookExecution, NotebookExecutionStatus
+from tests.start_http import Incident, serve_app
+
+notebooks_dir = Path(__file__).parent / "notebooks"
+
+
+def _new_execution(execution_id: str, notebook_id: str = "nb", priority=None) -> NotebookExecution:
+    return NotebookExecution(
+        execution_id=execution_id,
+        notebook_id=notebook_id,
+        parameters={},
+        status=NotebookExecutionStatus.ACCEPTED,
+        accepted_time=datetime.utcnow(),
+        start_time=None,
+        priority=priority,
+    )
+
+
+def _new_builder(**kwargs) -> DefaultApplicationBuilder:
+    return DefaultApplicationBuilder(
+        notebooks_dir=notebooks_dir,
+        notebook_execution_repository=InMemoryNotebookExecutionRepository(),
+        file_object_client=InMemoryFileObjectClient(),
+        models={"incident": Incident},
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("weight", [0, -1])
+def test_weights_must_be_positive(weight):
+    with pytest.raises(ValueError):
+        DefaultNotebookExecutionScheduler(priority_weights={"high": 2, "low": weight})
+
+
+def test_withdraw_frees_the_reservation():
+    scheduler = DefaultNotebookExecutionScheduler(max_concurrency=1, max_queue_size=0)
+    scheduler.admit(_new_execution("1"))
+    with pytest.raises(ExecutionQueueFull):
+        scheduler.admit(_new_execution("2"))
+    scheduler.withdraw("1")
+    scheduler.admit(_new_execution("2"))
+    assert scheduler.get_stats().queued == 1
+
+
+@pytest.mark.anyio
+async def test_queue_size_without_concurrency_bound():
+    scheduler = DefaultNotebookExecutionScheduler(max_queue_size=1)
+    first = _new_execution("1")
+    scheduler.admit(first)
+    with pytest.raises(ExecutionQueueFull):
+        scheduler.admit(_new_execution("2"))
+    async with scheduler.slot(first, NotebookConfig(id="nb", notebook_path="nb.ipynb")):
+        scheduler.admit(_new_execution("2"))
+        assert scheduler.get_stats().running == 1
+
+
+@pytest.mark.anyio
+async def test_accept_withdraws_when_save_fails():
+    deps = _new_builder(max_concurrent_executions=1, max_queued_executions=0).build()
+
+    async def failing_save(execution):
+        raise RuntimeError("save failed")
+
+    deps.notebook_execution_repository.save = failing_save
+    with pytest.raises(RuntimeError):
+        await accept(notebook_id="delay", parameters={"delay_seconds": 0}, deps=deps)
+    assert deps.notebook_execution_scheduler.get_stats().queued == 0
+
+
+@pytest.mark.anyio
+async def test_queue_full_returns_429():
+    deps = _new_builder(max_concurrent_executions=1, max_queued_executions=0).build()
+    async with serve_app(create_asgi_app(deps=deps)) as endpoint:
+        async with aiohttp.ClientSession(endpoint) as session:
+            response = await session.post(
+                "/api/notebooks/delay/execute", json={"parameters": {"delay_seconds": 2}}
+            )
+            assert response.status == 202
+            response = await session.post(
+                "/api/notebooks/delay/execute", json={"parameters": {"delay_seconds": 1}}
+            )
+            assert response.status == 429
+            assert int(response.headers["Retry-After"]) >= 1
+            assert (await response.json())["data"]["queue_depth"] >= 0
+
+
+@pytest.mark.anyio
+async def test_lanes_share_slots_by_weight():
+    scheduler = DefaultNotebookExecutionScheduler(
+        max_concurrency=1, priority_weights={"high": 3, "low": 1}
+    )
+    notebook_config = NotebookConfig(id="nb", notebook_path="nb.ipynb")
+    order = []
+
+    async def run(execution: NotebookExecution):
+        async with scheduler.slot(execution, notebook_config):
+            order.append(execution.priority)
+
+    blocker = scheduler.slot(_new_execution("blocker", priority="low"), notebook_config)
+    await blocker.__aenter__()
+    tasks = [
+        asyncio.create_task(run(_new_execution(f"{priority}{i}", priority=priority)))
+        for i in range(6)
+        for priority in ("high", "low")
+    ]
+    await asyncio.sleep(0.1)
+    assert order == []
+    await blocker.__aexit__(None, None, None)
+    await asyncio.gather(*tasks)
+    # a lane gets slots in proportion to its weight, without starving the other
+    assert order == ["high"] * 4 + ["low"] + ["high"] * 2 + ["low"] * 5
+
+
+@pytest.mark.anyio
+async def test_notebook_quota():
+    scheduler = DefaultNotebookExecutionScheduler(max_concurrency_per_notebook=2)
+    quota_one = NotebookConfig(id="a", notebook_path="a.ipynb", max_concurrency=1)
+    unbounded = NotebookConfig(id="b", notebook_path="b.ipynb")
+    assert scheduler._get_notebook_quota(unbounded) == 2
+    async with scheduler.slot(_new_execution("a1", notebook_id="a"), quota_one):
+        second = scheduler.slot(_new_execution("a2", notebook_id="a"), quota_one)
+        waiting = asyncio.create_task(second.__aenter__())
+        async with scheduler.slot(_new_execution("b1", notebook_id="b"), unbounded):
+            await asyncio.sleep(0.1)
+            assert not waiting.done()
+            assert scheduler.get_stats().running == 2
+    await asyncio.wait_for(waiting, timeout=1)
+    assert scheduler.get_stats().running == 1
+    await second.__aexit__(None, None, None)
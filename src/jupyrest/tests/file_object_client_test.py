@@ -0,0 +1,201 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from jupyrest.default_impl.builder import DefaultApplicationBuilder
+
+from jupyrest.error import FileObjectNotFound
+from jupyrest.file_object import DEFAULT_CHUNK_SIZE, iter_chunks
+from jupyrest.http.asgi import create_asgi_app
+from jupyrest.infra.in_memory.builder import InMemoryApplicationBuilder
+from jupyrest.infra.in_memory.execution_repository import InMemoryNotebookExecutionRepository
+from jupyrest.infra.in_memory.tiered_file_object_client import TieredInMemoryFileObjectClient
+from jupyrest.infra.local.file_object_client import LocalFileObjectClient
+from jupyrest.notebook_execution.entity import (
+    ExecutionArtifactType,
+    NotebookExecution,
+    NotebookExecutionCompletionDetails,
+    NotebookExecutionCompletionStatus,
+    NotebookExecutionStatus,
+)
+from jupyrest.notebook_execution.queries import get_execution_artifact_stream
+from tests.start_http import Incident, serve_app
+
+
+@pytest.mark.anyio
+async def test_tiered_client_spills_to_disk(tmp_path):
+    client = TieredInMemoryFileObjectClient(spill_dir=tmp_path, max_memory_bytes=250)
+    file_objects = [client.new_file_object(f"notebook_executions/{i}/html") for i in range(10)]
+    for i, file_object in enumerate(file_objects):
+        await client.set_content(file_object, "é" * 50 + str(i))
+    assert client.memory_bytes <= 250
+    assert len(os.listdir(tmp_path)) == 8
+    for i, file_object in enumerate(file_objects):
+        assert await client.get_content(file_object) == "é" * 50 + str(i)
+    await client.set_content(file_objects[0], "")
+    assert await client.get_content(file_objects[0]) == ""
+    assert len(os.listdir(tmp_path)) == 7
+
+
+@pytest.mark.anyio
+async def test_tiered_client_retention(tmp_path):
+    client = TieredInMemoryFileObjectClient(spill_dir=tmp_path, retention_seconds=0)
+    file_object = client.new_file_object("notebook_executions/1/html")
+    await client.set_content(file_object, "content")
+    with pytest.raises(FileObjectNotFound):
+        await client.get_content(file_object)
+
+
+@pytest.mark.anyio
+async def test_local_client(tmp_path):
+    client = LocalFileObjectClient(root_dir=tmp_path)
+    file_object = client.new_file_object("notebook_executions/1/html")
+    with pytest.raises(FileObjectNotFound):
+        await client.get_content(file_object)
+    await client.set_content(file_object, "é content")
+    assert await client.get_content(file_object) == "é content"
+    local_path = client.get_local_path(file_object)
+    assert local_path is not None
+    assert os.path.relpath(local_path, tmp_path).count(os.sep) == 2
+    with open(local_path, encoding="utf-8") as f:
+        assert f.read() == "é content"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("client_type", ["tiered", "local"])
+async def test_content_stream(tmp_path, client_type):
+    if client_type == "tiered":
+        client = TieredInMemoryFileObjectClient(spill_dir=tmp_path, max_memory_bytes=0)
+    else:
+        client = LocalFileObjectClient(root_dir=tmp_path)
+    file_object = client.new_file_object("notebook_executions/1/ipynb")
+    assert not await client.exists(file_object)
+    with pytest.raises(FileObjectNotFound):
+        await client.get_content_stream(file_object)
+    content = "é" * 1000
+    await client.set_content_stream(file_object, iter_chunks(content.encode("utf-8"), 7))
+    assert await client.exists(file_object)
+    assert await client.get_content(file_object) == content
+    chunks = [chunk async for chunk in await client.get_content_stream(file_object, chunk_size=100)]
+    assert len(chunks) == 20
+    assert b"".join(chunks).decode("utf-8") == content
+
+
+def _count_open_files(directory) -> int:
+    """File descriptors and mappings this process holds on files in `directory`."""
+    fds = [os.path.realpath(f"/proc/self/fd/{fd}") for fd in os.listdir("/proc/self/fd")]
+    with open("/proc/self/maps") as f:
+        maps = f.readlines()
+    directory = str(directory)
+    return sum(fd.startswith(directory) for fd in fds) + sum(directory in line for line in maps)
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+@pytest.mark.parametrize("client_type", ["tiered", "local"])
+async def test_unread_content_stream_holds_no_file(tmp_path, client_type):
+    if client_type == "tiered":
+        client = TieredInMemoryFileObjectClient(spill_dir=tmp_path, max_memory_bytes=0)
+    else:
+        client = LocalFileObjectClient(root_dir=tmp_path)
+    file_object = client.new_file_object("notebook_executions/1/ipynb")
+    await client.set_content(file_object, "content" * 100)
+    # e.g. a client that disconnects before the first chunk is sent
+    stream = await client.get_content_stream(file_object, chunk_size=10)
+    assert _count_open_files(tmp_path) == 0
+    await stream.aclose()
+    stream = await client.get_content_stream(file_object, chunk_size=10)
+    assert await stream.__anext__() == b"contentcon"
+    assert _count_open_files(tmp_path) > 0
+    await stream.aclose()
+    assert _count_open_files(tmp_path) == 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("client_type", ["tiered", "local"])
+async def test_content_stream_reads_the_file_when_iterated(tmp_path, client_type):
+    if client_type == "tiered":
+        client = TieredInMemoryFileObjectClient(spill_dir=tmp_path, max_memory_bytes=0)
+    else:
+        client = LocalFileObjectClient(root_dir=tmp_path)
+    file_object = client.new_file_object("notebook_executions/1/output")
+    await client.set_content(file_object, "old")
+    stream = await client.get_content_stream(file_object)
+    await client.set_content(file_object, "new")
+    assert [chunk async for chunk in stream] == [b"new"]
+    deps = DefaultApplicationBuilder(
+        notebooks_dir=Path(__file__).parent / "notebooks",
+        notebook_execution_repository=InMemoryNotebookExecutionRepository(),
+        file_object_client=client,
+        models={"incident": Incident},
+    ).build()
+    execution = NotebookExecution(
+        execution_id="1",
+        notebook_id="delay",
+        parameters={},
+        status=NotebookExecutionStatus.COMPLETED,
+        accepted_time=datetime.utcnow(),
+        start_time=datetime.utcnow(),
+        completion_details=NotebookExecutionCompletionDetails(
+            completion_status=NotebookExecutionCompletionStatus.SUCCEEDED,
+            end_time=datetime.utcnow(),
+            ipynb=None,
+            html=None,
+            exception=None,
+            output=file_object,
+        ),
+    )
+    stream = await get_execution_artifact_stream(execution, deps, ExecutionArtifactType.OUTPUT)
+    assert [chunk async for chunk in stream] == [b"new"]
+    get_content_stream = client.get_content_stream
+
+    async def remove_after_get_content_stream(file_object, chunk_size=DEFAULT_CHUNK_SIZE):
+        stream = await get_content_stream(file_object, chunk_size)
+        if client_type == "tiered":
+            client._remove(file_object.path)
+        else:
+            os.remove(client._get_path(file_object))
+        return stream
+
+    client.get_content_stream = remove_after_get_content_stream
+    # the file is removed after the stream was created but before it was read.
+    # The error is raised before the stream is returned, so it is sent as a 404
+    with pytest.raises(FileObjectNotFound):
+        await get_execution_artifact_stream(execution, deps, ExecutionArtifactType.OUTPUT)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("remove_spill_dir", [True, False])
+async def test_tiered_client_close(tmp_path, remove_spill_dir):
+    spill_dir = tmp_path / "spill"
+    client = TieredInMemoryFileObjectClient(
+        spill_dir=spill_dir, max_memory_bytes=10, remove_spill_dir=remove_spill_dir
+    )
+    file_objects = [client.new_file_object(f"notebook_executions/{i}/html") for i in range(3)]
+    for file_object in file_objects:
+        await client.set_content(file_object, "content")
+    assert len(os.listdir(spill_dir)) == 2
+    await client.close()
+    if remove_spill_dir:
+        assert not spill_dir.exists()
+    else:
+        assert os.listdir(spill_dir) == []
+    # files that were in memory are kept
+    assert await client.get_content(file_objects[2]) == "content"
+    with pytest.raises(FileObjectNotFound):
+        await client.get_content(file_objects[0])
+
+
+@pytest.mark.anyio
+async def test_temporary_spill_dir_removed_on_shutdown():
+    builder = InMemoryApplicationBuilder(
+        notebooks_dir=Path(__file__).parent / "notebooks",
+        models={"incident": Incident},
+        max_file_memory_bytes=0,
+    )
+    spill_dir = builder.file_obj_client.spill_dir
+    async with serve_app(create_asgi_app(deps=builder.build())):
+        assert spill_dir.is_dir()
+    assert not spill_dir.exists()
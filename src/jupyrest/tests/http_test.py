@@ -1,6 +1,12 @@
+import asyncio
+import json
+from pathlib import Path
 import aiohttp
 import pytest
 from jupyrest.client import JupyrestClient
+from jupyrest.http.asgi import create_asgi_app
+from jupyrest.infra.local.builder import LocalApplicationBuilder
+from tests.start_http import Incident, serve_app
 
 @pytest.mark.anyio
 async def test_execute_delay_notebook(jupyrest_client: JupyrestClient):
@@ -28,6 +34,23 @@ async def test_execute_delay_notebook(jupyrest_client: JupyrestClient):
     assert result.artifacts["ipynb"] == f"/api/notebook_executions/{result.execution_id}/artifacts/ipynb"
     assert result.artifacts["html_report"] == f"/api/notebook_executions/{result.execution_id}/artifacts/html_report"
 
+@pytest.mark.anyio
+async def test_coalesce_identical_executions(jupyrest_client: JupyrestClient):
+    notebook_id = "coalesce"
+    parameters = {
+        "delay_seconds": 2
+    }
+    results = await asyncio.gather(
+        *[jupyrest_client.execute_notebook_until_complete(notebook_id, parameters) for _ in range(3)]
+    )
+    assert len(set(result.execution_id for result in results)) == 3
+    assert len(set(result.execution_start_ts for result in results)) == 1
+    assert len(set(result.execution_end_ts for result in results)) == 1
+    for result in results:
+        assert result.execution_completion_status == "SUCCEEDED"
+        html = await jupyrest_client.get_execution_html(result.execution_id)
+        assert html is not None
+
 @pytest.mark.anyio
 async def test_error_notebook(jupyrest_client: JupyrestClient):
     notebook_id = "error"
@@ -51,6 +74,19 @@ async def test_error_notebook(jupyrest_client: JupyrestClient):
     assert result.artifacts["ipynb"] == f"/api/notebook_executions/{result.execution_id}/artifacts/ipynb"
     assert result.artifacts["html_report"] == f"/api/notebook_executions/{result.execution_id}/artifacts/html_report"
     assert result.artifacts["exception"] == f"/api/notebook_executions/{result.execution_id}/artifacts/exception"
+    async with jupyrest_client.session() as session:
+        for artifact, content_type in (
+            ("exception", "text/plain; charset=utf-8"),
+            ("ipynb", "application/json"),
+            ("html", "text/html; charset=utf-8"),
+        ):
+            response = await session.get(result.artifacts[artifact])
+            assert response.headers["Content-Type"] == content_type
+            assert len(await response.read()) > 0
+        response = await session.get(result.artifacts["ipynb"])
+        # the stored notebook is passed through, not re-serialized
+        assert (await response.text()).startswith('{\n "cells": [')
+        assert "jupyrest" not in json.loads(await response.text())["metadata"]
 
 @pytest.mark.anyio
 async def test_valid_input(jupyrest_client: JupyrestClient):
@@ -85,6 +121,27 @@ async def test_valid_input(jupyrest_client: JupyrestClient):
         "blue": parameters["foo"]
     }
 
+@pytest.mark.anyio
+async def test_select_artifacts(jupyrest_client: JupyrestClient):
+    notebook_id = "io_contract_example"
+    parameters = {
+        "foo": "foo string",
+        "bar": 500
+    }
+    execution = await jupyrest_client.execute_notebook(notebook_id, parameters, artifacts=["output", "html_report"])
+    result = await jupyrest_client.poll(execution.execution_id)
+    assert result.execution_completion_status == "SUCCEEDED"
+    assert result.artifacts is not None
+    assert result.artifacts.keys() == set(["output", "html_report"])
+    output = await jupyrest_client.get_execution_output(result.execution_id)
+    assert len(output) == 2
+    html_report = await jupyrest_client.get_execution_html(result.execution_id, report_mode=True)
+    assert "baz" in html_report
+    with pytest.raises(aiohttp.ClientResponseError) as exc_info:
+        async with jupyrest_client.session() as session:
+            await session.get(f"/api/notebook_executions/{result.execution_id}/artifacts/ipynb")
+    assert exc_info.value.status == 404
+
 @pytest.mark.anyio
 async def test_invalid_input(jupyrest_client: JupyrestClient):
     notebook_id = "io_contract_example"
@@ -142,6 +199,37 @@ async def test_model_input_output(jupyrest_client: JupyrestClient):
     }
     assert output["bar"] == "FOO"
 
+@pytest.mark.anyio
+async def test_cached_result(jupyrest_client: JupyrestClient):
+    notebook_id = "model_io"
+    parameters = {
+        "incidents": [
+            {
+                "title": "Incident 1",
+                "start_time": "2021-01-01T00:00:00",
+                "end_time": "2021-02-01T01:00:00",
+            },
+            {
+                "title": "Incident 2",
+                "start_time": "2022-01-01T00:00:00",
+                "end_time": "2022-02-01T01:00:00",
+            }
+        ],
+        "foo": "cached"
+    }
+    first = await jupyrest_client.execute_notebook_until_complete(notebook_id, parameters)
+    assert first.execution_completion_status == "SUCCEEDED"
+    execution = await jupyrest_client.execute_notebook(notebook_id, parameters)
+    assert execution.status == "COMPLETED"
+    second = await jupyrest_client.poll(execution.execution_id)
+    assert second.execution_id != first.execution_id
+    assert second.execution_completion_status == "SUCCEEDED"
+    assert second.artifacts is not None and first.artifacts is not None
+    assert second.artifacts.keys() == first.artifacts.keys()
+    assert await jupyrest_client.get_execution_output(second.execution_id) == (
+        await jupyrest_client.get_execution_output(first.execution_id)
+    )
+
 @pytest.mark.anyio
 async def test_get_execution_html(jupyrest_client: JupyrestClient):
     notebook_id = "io_contract_example"
@@ -203,4 +291,49 @@ async def test_get_notebook(jupyrest_client: JupyrestClient):
                 "blue"
             ]
         }
-    }
\ No newline at end of file
+    }
+
+
+@pytest.mark.anyio
+async def test_get_scheduler(jupyrest_client: JupyrestClient):
+    result = await jupyrest_client.get_scheduler()
+    assert result.running >= 0
+    assert result.queued >= 0
+    assert result.max_concurrency is None
+    assert result.max_queue_size is None
+
+
+@pytest.mark.anyio
+async def test_unknown_priority(jupyrest_client: JupyrestClient):
+    with pytest.raises(aiohttp.ClientResponseError) as e:
+        await jupyrest_client.execute_notebook("delay", {"delay_seconds": 0}, priority="unknown")
+    assert e.value.status == 400
+
+
+@pytest.mark.anyio
+async def test_local_artifacts_served_as_files(tmp_path):
+    builder = LocalApplicationBuilder(
+        notebooks_dir=Path(__file__).parent / "notebooks",
+        artifacts_dir=tmp_path,
+        models={"incident": Incident},
+        lazy_html_rendering=True,
+    )
+    async with serve_app(create_asgi_app(deps=builder.build())) as endpoint:
+        client = JupyrestClient(endpoint)
+        result = await client.execute_notebook_until_complete("delay", {"delay_seconds": 0})
+        assert result.artifacts is not None
+        execution = await builder.notebook_execution_repository.get(result.execution_id)
+        assert execution.completion_details is not None
+        ipynb_path = Path(builder.file_obj_client.get_local_path(execution.completion_details.ipynb))
+        async with client.session() as session:
+            async with session.get(result.artifacts["ipynb"]) as response:
+                # files are sent with their length, streams are chunked
+                assert response.headers["Content-Length"] == str(ipynb_path.stat().st_size)
+                assert await response.read() == ipynb_path.read_bytes()
+            # the html is rendered and streamed on the first read, then stored
+            async with session.get(result.artifacts["html"]) as response:
+                assert "Content-Length" not in response.headers
+                html = await response.text()
+            async with session.get(result.artifacts["html"]) as response:
+                assert "Content-Length" in response.headers
+                assert await response.text() == html
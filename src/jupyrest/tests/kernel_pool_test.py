@@ -0,0 +1,83 @@
+import nbformat
+import pytest
+
+from jupyrest.default_impl.kernel_pool import KernelPool
+from jupyrest.default_impl.pooled_executor import PooledIPythonNotebookExecutor
+
+
+@pytest.mark.anyio
+async def test_kernel_checkout_and_return():
+    pool = KernelPool(min_size=1, max_size=2, health_check_interval_seconds=None)
+    await pool.start()
+    try:
+        assert (pool.size, pool.idle_count) == (1, 1)
+        km = await pool.acquire()
+        assert await km.is_alive()
+        await pool.release(km, reuse=True)
+        assert await pool.acquire() is km
+        await pool.release(km, reuse=False)
+        replacement = await pool.acquire()
+        assert replacement is not km
+        assert pool.size <= pool.max_size
+        await pool.release(replacement, reuse=True)
+    finally:
+        await pool.shutdown()
+    assert pool.size == 0
+
+
+@pytest.mark.anyio
+async def test_kernel_replaced_after_max_uses():
+    pool = KernelPool(min_size=1, max_size=1, health_check_interval_seconds=None, max_uses=2)
+    await pool.start()
+    try:
+        km = await pool.acquire()
+        await pool.release(km, reuse=True)
+        assert await pool.acquire() is km
+        await pool.release(km, reuse=True)
+        replacement = await pool.acquire()
+        assert replacement is not km
+        assert not await km.is_alive()
+        await pool.release(replacement, reuse=True)
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.anyio
+async def test_dead_kernel_is_replaced():
+    pool = KernelPool(min_size=1, max_size=1, health_check_interval_seconds=None)
+    await pool.start()
+    try:
+        km = await pool.acquire()
+        await pool.release(km, reuse=True)
+        # the idle kernel dies while it is in the pool
+        await km.shutdown_kernel(now=True)
+        replacement = await pool.acquire()
+        assert replacement is not km
+        assert await replacement.is_alive()
+        # a kernel that dies while it is in use is not reused
+        await replacement.shutdown_kernel(now=True)
+        await pool.release(replacement, reuse=True)
+        assert pool.idle_count == 0
+        last = await pool.acquire()
+        assert await last.is_alive()
+        await pool.release(last, reuse=True)
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.anyio
+async def test_pooled_executor_resets_reused_kernels():
+    executor = PooledIPythonNotebookExecutor(
+        min_pool_size=1, max_pool_size=1, reuse_kernels=True, health_check_interval_seconds=None
+    )
+    await executor.start()
+    try:
+        first = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("x = 1")])
+        assert await executor.execute_notebook_async(first) is None
+        second = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("x")])
+        exception = await executor.execute_notebook_async(second)
+        assert exception is not None and "NameError" in exception
+        assert executor.pool.size == 1
+    finally:
+        await executor.shutdown()
+    assert executor.pool.size == 0
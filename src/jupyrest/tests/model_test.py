@@ -0,0 +1,98 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+import pytest
+
+from jupyrest.model import NamedModel, NamedModelConflict
+from jupyrest.nbschema import NbSchemaBase, NbSchemaEncoder
+
+
+class Severity(Enum):
+    low = 1
+    high = 2
+
+
+class Tag(NamedModel, NbSchemaBase):
+    name: str
+    created: datetime
+
+    class Config:
+        __ns__ = "tests/Tag"
+
+
+class Ticket(NamedModel, NbSchemaBase):
+    title: str
+    severity: Severity
+    opened: date
+    ticket_id: UUID
+    score: float
+    tags: List[Tag]
+    owner: Optional[str] = None
+
+    class Config:
+        __ns__ = "tests/Ticket"
+
+
+def _make_ticket(i: int) -> Ticket:
+    return Ticket(
+        title=f"ticket é {i}",
+        severity=Severity.high,
+        opened=date(2023, 1, 1),
+        ticket_id=UUID(int=i),
+        score=i / 3,
+        tags=[Tag(name="a", created=datetime(2023, 1, 2, 3, 4, 5, 6))],
+    )
+
+
+def _reference_json(model: NamedModel, **kwargs) -> str:
+    # dumps -> loads -> dumps, as NamedModel.json used to serialize
+    d = json.loads(super(NamedModel, model).json(**kwargs))
+    d[model._get_ns_key()] = model.get_class_namespace()
+    return json.dumps(d)
+
+
+def test_named_model_json_single_pass():
+    ticket = _make_ticket(1)
+    assert ticket.json() == _reference_json(ticket)
+    assert ticket.json(exclude_none=True) == _reference_json(ticket, exclude_none=True)
+    assert NamedModel.parse_obj(json.loads(ticket.json())) == ticket
+
+
+def test_encoder_matches_model_json():
+    tickets = [_make_ticket(i) for i in range(10)]
+    data = {"tickets": tickets, "at": datetime(2023, 5, 6, 7, 8, 9)}
+    reference = json.dumps(
+        {"tickets": [json.loads(t.json()) for t in tickets], "at": data["at"].isoformat()}
+    )
+    assert json.dumps(data, cls=NbSchemaEncoder) == reference
+
+
+def test_named_model_registry():
+    assert NamedModel.parse_obj(json.loads(_make_ticket(1).tags[0].json())) == Tag(
+        name="a", created=datetime(2023, 1, 2, 3, 4, 5, 6)
+    )
+    with pytest.raises(NamedModelConflict):
+
+        class OtherTag(NamedModel):
+            class Config:
+                __ns__ = "tests/Tag"
+
+
+def test_named_model_json_ignores_dumps_kwargs():
+    ticket = _make_ticket(1)
+    assert ticket.json(indent=2) == ticket.json()
+    assert "\n" not in ticket.json(indent=2)
+
+
+def test_encoder_only_encodes_other_values_inside_models():
+    ticket = _make_ticket(1)
+    assert json.loads(json.dumps({"ticket": ticket}, cls=NbSchemaEncoder)) == {
+        "ticket": json.loads(ticket.json())
+    }
+    # values outside of models are encoded as json.JSONEncoder does
+    for value in (UUID(int=1), Severity.high, {1, 2}):
+        with pytest.raises(TypeError):
+            json.dumps({"value": value}, cls=NbSchemaEncoder)
@@ -0,0 +1,217 @@
+import json
+from copy import deepcopy
+from typing import List
+from unittest.mock import patch
+
+import nbformat
+import pytest
+from jsonschema import Draft7Validator
+from pydantic import BaseModel
+from pydantic.schema import schema as pydantic_schema
+
+import jupyrest.nbschema
+
+from jupyrest.default_impl.notebook_repository import DefaultNotebookRepository
+from jupyrest.error import InvalidNotebookConfig
+from jupyrest.nbschema import NbSchemaBase, NotebookSchemaProcessor
+
+schema = {
+    "type": "object",
+    "properties": {"count": {"type": "integer", "minimum": 0}},
+    "required": ["count"],
+}
+
+
+def _write_notebook(notebooks_dir, config):
+    nbformat.write(nbformat.v4.new_notebook(), str(notebooks_dir / "nb.ipynb"))
+    (notebooks_dir / "nb.config.json").write_text(json.dumps(config))
+
+
+def test_invalid_schema_fails_at_load(tmp_path):
+    _write_notebook(tmp_path, {"input": {"type": "object", "properties": {"count": {"type": "number", "minimum": "zero"}}}})
+    with pytest.raises(InvalidNotebookConfig) as e:
+        DefaultNotebookRepository(notebooks_dir=tmp_path, nbschema=NotebookSchemaProcessor(models={}))
+    assert e.value.notebook_id == "nb"
+
+
+@pytest.mark.anyio
+async def test_repository_compiles_schemas(tmp_path):
+    _write_notebook(tmp_path, {"input": schema})
+    nbschema = NotebookSchemaProcessor(models={})
+    repository = DefaultNotebookRepository(notebooks_dir=tmp_path, nbschema=nbschema)
+    notebook_config = await repository.get("nb")
+    assert nbschema._get_compiled_schema(notebook_config.resolved_input_schema) is not None
+    repository.refresh()
+    # the old config's schemas are no longer compiled
+    assert nbschema._get_compiled_schema(notebook_config.resolved_input_schema) is None
+    notebook_config = await repository.get("nb")
+    assert nbschema._get_compiled_schema(notebook_config.resolved_input_schema) is not None
+
+
+@pytest.mark.parametrize("validation_backend", NotebookSchemaProcessor.VALIDATION_BACKENDS)
+def test_clear_compiled_schemas(validation_backend):
+    nbschema = NotebookSchemaProcessor(models={}, validation_backend=validation_backend)
+    compiled_schema = deepcopy(schema)
+    nbschema.compile_schema(compiled_schema)
+    nbschema.compile_injection_plan(compiled_schema)
+    assert nbschema._get_compiled_schema(compiled_schema) is not None
+    # equal schemas that are other objects are not served from the cache
+    assert nbschema._get_compiled_schema(deepcopy(schema)) is None
+    nbschema.clear_compiled_schemas()
+    assert nbschema._get_compiled_schema(compiled_schema) is None
+    assert nbschema._injection_plans == {}
+    # uncompiled schemas are still validated
+    assert nbschema.validate_instance({"count": 1}, compiled_schema).is_valid
+    response = nbschema.validate_instance({"count": -1}, compiled_schema)
+    assert not response.is_valid and response.error is not None
+
+
+@pytest.mark.parametrize(
+    "schema, instances, fast",
+    [
+        (schema, [{"count": 1}, {"count": -1}, {"count": 1.5}, {}, {"count": True}], True),
+        ({"type": "array", "items": {"type": "string"}, "uniqueItems": True}, [["a"], ["a", "a"], [1]], True),
+        ({"multipleOf": 0.1}, [0.3, 0.7, 0.25], False),
+        ({"type": "string", "pattern": "^a$"}, ["a", "a\n", "b"], False),
+        ({"patternProperties": {"^a": {"type": "integer"}}}, [{"ab": 1}, {"ab": "x"}], False),
+        ({"const": 1}, [1, True, 1.0, 2], False),
+        ({"type": "object", "properties": {"x": {"enum": [1, "a"]}}}, [{"x": 1}, {"x": True}, {"x": "b"}], True),
+    ],
+)
+def test_validation_backends_agree(schema, instances, fast):
+    nbschema = NotebookSchemaProcessor(models={})
+    fast_nbschema = NotebookSchemaProcessor(models={}, validation_backend="fastjsonschema")
+    fast_nbschema.compile_schema(schema)
+    assert (fast_nbschema._get_compiled_schema(schema).fast_validator is not None) == fast
+    for instance in instances:
+        expected = nbschema.validate_instance(instance, schema)
+        assert fast_nbschema.validate_instance(instance, schema) == expected
+
+
+class Point(NbSchemaBase):
+    x: int
+    y: int
+
+
+class Label(NbSchemaBase):
+    text: str
+
+    @classmethod
+    def parse_obj(cls, obj):
+        return super().parse_obj({"text": obj["text"].upper()})
+
+
+def _new_nbschema():
+    return NotebookSchemaProcessor(models={"point": Point, "label": Label})
+
+
+@pytest.mark.parametrize("keyword", ["anyOf", "oneOf"])
+def test_inject_into_branches(keyword):
+    nbschema = _new_nbschema()
+    schema = {
+        "definitions": {"name": {"type": "string"}},
+        "type": "object",
+        "properties": {
+            "value": {keyword: [{"$ref": "#/definitions/name"}, {"$ref": "nbschema://point"}]},
+        },
+    }
+    nbschema.compile_injection_plan(schema)
+    assert nbschema.inject_model_refs(schema, {"value": "a"}) == {"value": "a"}
+    payload = {"value": {"x": 1, "y": 2}}
+    injected = nbschema.inject_model_refs(schema, payload)
+    assert injected["value"] == Point(x=1, y=2)
+    assert payload == {"value": {"x": 1, "y": 2}}
+
+
+def test_inject_into_arrays():
+    nbschema = _new_nbschema()
+    schema = {
+        "type": "object",
+        "properties": {
+            "points": {"type": "array", "items": {"$ref": "nbschema://point"}},
+            "labels": {"type": "array", "items": {"$ref": "nbschema://label"}},
+        },
+    }
+    nbschema.compile_injection_plan(schema)
+    injected = nbschema.inject_model_refs(
+        schema, {"points": [{"x": i, "y": i} for i in range(3)], "labels": [{"text": "a"}, None]}
+    )
+    assert injected["points"] == [Point(x=i, y=i) for i in range(3)]
+    # parse_obj overrides are honored
+    assert injected["labels"] == [Label(text="A"), None]
+    plans = nbschema._injection_plans[id(schema)][1].properties
+    assert plans["points"]._bulk_parse and not plans["labels"]._bulk_parse
+
+
+class Segment(NbSchemaBase):
+    start: Point
+    end: Point
+
+
+class Vertex(BaseModel):
+    x: int
+
+
+class Polygon(NbSchemaBase):
+    vertices: List[Vertex]
+
+
+def _old_definitions(nbschema, aliases):
+    """Definitions as they were generated by patching pydantic's model names."""
+    model_types = [nbschema._models.get_model(alias) for alias in aliases]
+    model_name_map = {model_type: alias for alias, model_type in zip(aliases, model_types)}
+    with patch("pydantic.schema.get_model_name_map", new=lambda *args, **kwargs: model_name_map):
+        return pydantic_schema(model_types)
+
+
+def test_nested_collection_models():
+    nbschema = NotebookSchemaProcessor(models={"point": Point, "segment": Segment})
+    schema = {
+        "type": "object",
+        "properties": {"segment": {"$ref": "nbschema://segment"}, "point": {"$ref": "nbschema://point"}},
+    }
+    resolved = nbschema.fix_schemas(schema, add_model_definitions=True)
+    expected = deepcopy(schema)
+    expected.update(_old_definitions(nbschema, ["segment", "point"]))
+    expected["properties"] = {"segment": {"$ref": "#/definitions/segment"}, "point": {"$ref": "#/definitions/point"}}
+    assert json.dumps(resolved) == json.dumps(expected)
+    # the nested model resolves when only the outer model is referenced
+    schema = {"$ref": "nbschema://segment"}
+    resolved = nbschema.fix_schemas(schema, add_model_definitions=True)
+    assert resolved["definitions"].keys() == {"segment", "point"}
+    assert resolved["definitions"]["segment"]["properties"]["start"] == {"$ref": "#/definitions/point"}
+    validator = Draft7Validator(resolved)
+    assert validator.is_valid({"start": {"x": 0, "y": 0}, "end": {"x": 1, "y": 1}})
+    assert not validator.is_valid({"start": {"x": 0}, "end": {"x": 1, "y": 1}})
+
+
+def test_referenced_model_outside_the_collection():
+    nbschema = NotebookSchemaProcessor(models={"polygon": Polygon})
+    resolved = nbschema.fix_schemas({"$ref": "nbschema://polygon"}, add_model_definitions=True)
+    # models that are not in the collection keep pydantic's name
+    assert resolved["definitions"].keys() == {"polygon", "Vertex"}
+    assert resolved["definitions"]["polygon"]["properties"]["vertices"]["items"] == {
+        "$ref": "#/definitions/Vertex"
+    }
+    validator = Draft7Validator(resolved)
+    assert validator.is_valid({"vertices": [{"x": 1}]})
+    assert not validator.is_valid({"vertices": [{"x": "a"}]})
+
+
+def test_definitions_are_cached():
+    nbschema = NotebookSchemaProcessor(models={"point": Point, "segment": Segment})
+    schema = {"$ref": "nbschema://segment"}
+    with patch.object(
+        jupyrest.nbschema, "model_process_schema", wraps=jupyrest.nbschema.model_process_schema
+    ) as model_process_schema:
+        first = nbschema.fix_schemas(schema, add_model_definitions=True)
+        # callers get copies of the cached definitions
+        first["definitions"]["segment"]["title"] = "changed"
+        second = nbschema.fix_schemas(schema, add_model_definitions=True)
+        assert model_process_schema.call_count == 1
+        assert second["definitions"]["segment"]["title"] == "Segment"
+        assert nbschema._models.get_definitions("segment") is nbschema._models.get_definitions("segment")
+        # adding a model generates the definitions again
+        nbschema._models.add_model("label", Label)
+        assert nbschema.fix_schemas(schema, add_model_definitions=True) == second
+        assert model_process_schema.call_count == 2
@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from jupyrest.default_impl import notebook_converter
+from jupyrest.default_impl.builder import DefaultApplicationBuilder
+from jupyrest.default_impl.notebook_converter import DefaultNotebookConverter
+from jupyrest.infra.in_memory.execution_repository import InMemoryNotebookExecutionRepository
+from jupyrest.infra.in_memory.file_object_client import InMemoryFileObjectClient
+from tests.start_http import Incident
+
+notebooks_dir = Path(__file__).parent / "notebooks"
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def _new_notebook():
+    return nbformat.v4.new_notebook(
+        cells=[nbformat.v4.new_markdown_cell("# Title"), nbformat.v4.new_code_cell("x = 1")]
+    )
+
+
+@pytest.mark.anyio
+async def test_async_conversion_runs_on_executor():
+    executor = _CountingExecutor()
+    converter = DefaultNotebookConverter(executor=executor)
+    notebook = _new_notebook()
+    try:
+        html = await converter.convert_notebook_to_html_async(notebook, report_mode=False)
+        report = await converter.convert_notebook_to_html_async(notebook, report_mode=True)
+        ipynb = await converter.convert_notebook_to_str_async(notebook)
+    finally:
+        executor.shutdown()
+    assert executor.submitted == 3
+    assert html == converter.convert_notebook_to_html(notebook, report_mode=False)
+    assert report == converter.convert_notebook_to_html(notebook, report_mode=True)
+    # report mode leaves out the code
+    assert len(report) < len(html)
+    assert nbformat.reads(ipynb, as_version=4) == notebook
+
+
+@pytest.mark.anyio
+async def test_async_conversion_in_process_pool():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        converter = DefaultNotebookConverter(executor=executor)
+        html = await converter.convert_notebook_to_html_async(_new_notebook(), report_mode=False)
+    assert "Title" in html
+
+
+def test_exporters_are_reused():
+    converter = DefaultNotebookConverter(template_name="classic")
+    converter.convert_notebook_to_html(_new_notebook(), report_mode=False)
+    converter.convert_notebook_to_html(_new_notebook(), report_mode=False)
+    assert len(notebook_converter._exporter_pool._idle[(False, "classic")]) == 1
+
+
+def test_builder_uses_artifact_render_pool():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        builder = DefaultApplicationBuilder(
+            notebooks_dir=notebooks_dir,
+            notebook_execution_repository=InMemoryNotebookExecutionRepository(),
+            file_object_client=InMemoryFileObjectClient(),
+            models={"incident": Incident},
+            artifact_render_pool=executor,
+        )
+    assert builder.notebook_converter.executor is executor
+    assert builder.notebook_artifact_renderer.notebook_converter is builder.notebook_converter
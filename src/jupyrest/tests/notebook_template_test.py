@@ -0,0 +1,75 @@
+import json
+import os
+from copy import deepcopy
+
+import nbformat
+import pytest
+
+from jupyrest.default_impl.notebook_repository import DefaultNotebookRepository
+from jupyrest.default_impl.parameterizer import DefaultNotebookParameterizier
+from jupyrest.nbschema import NotebookSchemaProcessor
+
+
+def _write_notebook(path, cells):
+    notebook = nbformat.v4.new_notebook(
+        metadata={"kernelspec": {"name": "python3", "display_name": "Python 3"}}, cells=cells
+    )
+    nbformat.write(notebook, str(path))
+
+
+def _new_cells():
+    parameters = nbformat.v4.new_code_cell("x = 0")
+    parameters.metadata["tags"] = ["parameters"]
+    return [nbformat.v4.new_markdown_cell("# Title"), parameters, nbformat.v4.new_code_cell("x")]
+
+
+@pytest.fixture
+def notebooks_dir(tmp_path):
+    _write_notebook(tmp_path / "nb.ipynb", _new_cells())
+    (tmp_path / "nb.config.json").write_text(
+        json.dumps({"input": {"type": "object", "properties": {"x": {"type": "integer"}}}})
+    )
+    return tmp_path
+
+
+@pytest.mark.anyio
+async def test_modified_notebook_is_reloaded(notebooks_dir):
+    nbschema = NotebookSchemaProcessor(models={})
+    repository = DefaultNotebookRepository(notebooks_dir=notebooks_dir, nbschema=nbschema)
+    notebook_config = await repository.get("nb")
+    template = notebook_config.get_template()
+    assert notebook_config.get_template() is template
+    _write_notebook(notebooks_dir / "nb.ipynb", _new_cells() + [nbformat.v4.new_code_cell("y = 1")])
+    stat = os.stat(notebooks_dir / "nb.ipynb")
+    # a new mtime even on filesystems with a coarse timestamp resolution
+    os.utime(notebooks_dir / "nb.ipynb", ns=(stat.st_atime_ns, template.mtime_ns + 10**9))
+    reloaded = notebook_config.get_template()
+    assert reloaded is not template
+    assert reloaded.content_hash != template.content_hash
+    assert len(reloaded.notebook.cells) == 4
+
+
+@pytest.mark.anyio
+async def test_executions_do_not_modify_the_template(notebooks_dir):
+    nbschema = NotebookSchemaProcessor(models={})
+    repository = DefaultNotebookRepository(notebooks_dir=notebooks_dir, nbschema=nbschema)
+    parameterizer = DefaultNotebookParameterizier(nbschema=nbschema, kernelspec_language="python")
+    notebook_config = await repository.get("nb")
+    template_notebook = notebook_config.get_template().notebook
+    expected = deepcopy(template_notebook)
+    notebook = parameterizer.parameterize_notebook(notebook_config=notebook_config, parameters={"x": 1})
+    assert notebook.cells[2].source == "# Parameters\nx = 1\n"
+    # what executors and renderers do to a notebook
+    notebook.metadata["executed"] = True
+    for cell in notebook.cells:
+        cell.metadata["executed"] = True
+        cell.source += "\n"
+        if cell.cell_type == "code":
+            cell.outputs.append(nbformat.v4.new_output("stream", text="out"))
+            cell.execution_count = 1
+        else:
+            cell["attachments"] = {}
+    assert template_notebook == expected
+    assert parameterizer.parameterize_notebook(
+        notebook_config=notebook_config, parameters={"x": 2}
+    ).cells[2].source == "# Parameters\nx = 2\n"
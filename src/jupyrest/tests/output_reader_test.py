@@ -0,0 +1,141 @@
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from jupyrest.default_impl.pooled_executor import PooledIPythonNotebookExecutor
+from jupyrest.default_impl.scrap_output_reader import ScrapNotebookOutputReader
+from jupyrest.default_impl.spool_output_reader import SpoolNotebookOutputReader
+from jupyrest.default_impl.sticky_executor import StickyKernelNotebookExecutor
+from jupyrest.nbschema import NotebookSchemaProcessor, OutputResult
+from jupyrest.notebook_config import JUPYREST_METADATA_KEY
+
+OUTPUTS_KEY = NotebookSchemaProcessor.OUTPUTS_KEY
+
+
+def _scrap_output(name: str, data, encoder: str = "text"):
+    mimetype = f"application/scrapbook.scrap.{encoder}+json"
+    return nbformat.v4.new_output(
+        "display_data",
+        data={mimetype: {"name": name, "data": data, "encoder": encoder, "version": 1}},
+        metadata={"scrapbook": {"name": name, "data": True, "display": False}},
+    )
+
+
+def _new_notebook(*outputs_per_cell):
+    cells = []
+    for outputs in outputs_per_cell:
+        cell = nbformat.v4.new_code_cell("save_output(...)")
+        cell.outputs = list(outputs)
+        cells.append(cell)
+    cells.append(nbformat.v4.new_markdown_cell("no outputs"))
+    return nbformat.v4.new_notebook(cells=cells)
+
+
+@pytest.fixture
+def nbschema():
+    return NotebookSchemaProcessor(models={})
+
+
+def _assert_output(nbschema, notebook, expected: OutputResult):
+    assert ScrapNotebookOutputReader(nbschema=nbschema).get_output(notebook) == expected
+    # same result as reading the notebook with scrapbook
+    assert nbschema.get_notebook_output(notebook) == expected
+
+
+def test_missing_output(nbschema):
+    notebook = _new_notebook(
+        [nbformat.v4.new_output("stream", name="stdout", text="text")],
+        [_scrap_output("other", '{"a": 1}')],
+    )
+    _assert_output(nbschema, notebook, OutputResult(present=False, json_str=""))
+
+
+def test_last_scrap_wins(nbschema):
+    notebook = _new_notebook(
+        [_scrap_output(OUTPUTS_KEY, '{"a": 1}')],
+        [_scrap_output(OUTPUTS_KEY, '{"a": 2}'), _scrap_output(OUTPUTS_KEY, '{"a": 3}')],
+        [_scrap_output("other", '{"a": 4}')],
+    )
+    _assert_output(nbschema, notebook, OutputResult(present=True, json_str='{"a": 3}'))
+
+
+def test_json_encoded_scrap(nbschema):
+    notebook = _new_notebook([_scrap_output(OUTPUTS_KEY, {"a": [1, 2]}, encoder="json")])
+    output = ScrapNotebookOutputReader(nbschema=nbschema).get_output(notebook)
+    assert output == OutputResult(present=True, json_str='{"a": [1, 2]}')
+
+
+def test_other_mimetypes_are_ignored(nbschema):
+    payload = {"name": OUTPUTS_KEY, "data": '{"a": 1}', "encoder": "text", "version": 1}
+    notebook = _new_notebook(
+        [_scrap_output(OUTPUTS_KEY, '{"a": 1}')],
+        [
+            nbformat.v4.new_output("display_data", data={"application/json": payload}),
+            nbformat.v4.new_output("execute_result", data={"text/plain": str(payload)}, execution_count=1),
+        ],
+    )
+    output = ScrapNotebookOutputReader(nbschema=nbschema).get_output(notebook)
+    assert output == OutputResult(present=True, json_str='{"a": 1}')
+
+
+def test_spool_dir_is_absolute(nbschema, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reader = SpoolNotebookOutputReader(
+        spool_dir=Path("spool"), notebook_output_reader=ScrapNotebookOutputReader(nbschema=nbschema)
+    )
+    assert reader.spool_dir == tmp_path / "spool"
+    notebook = _new_notebook([_scrap_output(OUTPUTS_KEY, '{"a": 1}')])
+    reader.prepare_notebook(notebook)
+    output_path = Path(notebook.metadata[JUPYREST_METADATA_KEY]["output_path"])
+    assert output_path.is_absolute()
+    # outputs saved into the notebook are read when the file is missing
+    assert reader.get_output(notebook) == OutputResult(present=True, json_str='{"a": 1}')
+    output_path.write_text('{"a": 2}')
+    assert reader.get_output(notebook) == OutputResult(present=True, json_str='{"a": 2}')
+    reader.release_notebook(notebook)
+    assert not output_path.exists()
+    assert "output_path" not in notebook.metadata[JUPYREST_METADATA_KEY]
+
+
+def _new_executed_notebook(code: str):
+    prelude = nbformat.v4.new_code_cell("import os")
+    prelude.metadata["tags"] = [StickyKernelNotebookExecutor.PRELUDE_TAG]
+    return nbformat.v4.new_notebook(
+        metadata={JUPYREST_METADATA_KEY: {"notebook_id": "nb", "notebook_hash": ""}},
+        cells=[prelude, nbformat.v4.new_code_cell(code)],
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("executor_type", ["pooled", "sticky"])
+async def test_reused_kernels_forget_the_output_path(nbschema, tmp_path, executor_type):
+    if executor_type == "pooled":
+        executor = PooledIPythonNotebookExecutor(
+            min_pool_size=1, max_pool_size=1, reuse_kernels=True, health_check_interval_seconds=None
+        )
+    else:
+        executor = StickyKernelNotebookExecutor()
+    reader = SpoolNotebookOutputReader(
+        spool_dir=tmp_path, notebook_output_reader=ScrapNotebookOutputReader(nbschema=nbschema)
+    )
+    await executor.start()
+    try:
+        first = _new_executed_notebook(
+            "from jupyrest.nbschema import NotebookSchemaProcessor\n"
+            "NotebookSchemaProcessor.save_output('{\"a\": 1}')\n"
+            "print(os.getpid())"
+        )
+        reader.prepare_notebook(first)
+        assert await executor.execute_notebook_async(first) is None
+        assert reader.get_output(first) == OutputResult(present=True, json_str='{"a": 1}')
+        reader.release_notebook(first)
+        second = _new_executed_notebook(
+            f"assert {NotebookSchemaProcessor.OUTPUT_PATH_ENV_VAR!r} not in os.environ\n"
+            "print(os.getpid())"
+        )
+        assert await executor.execute_notebook_async(second) is None
+        # both ran on the same kernel
+        assert second.cells[1].outputs[0].text == first.cells[1].outputs[0].text
+    finally:
+        await executor.shutdown()
@@ -0,0 +1,47 @@
+import json
+from copy import deepcopy
+
+import nbformat
+import pytest
+from papermill.iorw import load_notebook_node
+from papermill.parameterize import parameterize_notebook
+
+from jupyrest.default_impl.notebook_repository import DefaultNotebookRepository
+from jupyrest.default_impl.parameterizer import DefaultNotebookParameterizier
+from jupyrest.nbschema import NotebookSchemaProcessor
+from jupyrest.notebook_config import JUPYREST_METADATA_KEY
+from tests.benchmarks.bench_parameterizer import PARAMETERS, make_large_notebook
+
+
+def _normalize(notebook) -> str:
+    notebook = deepcopy(notebook)
+    notebook.metadata.pop(JUPYREST_METADATA_KEY, None)
+    for cell in notebook.cells:
+        # random ids of the injected cells
+        if "injected-parameters" in cell.metadata.get("tags", []):
+            del cell["id"]
+    return json.dumps(notebook, sort_keys=True)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("injected", [False, True])
+async def test_same_notebook_as_papermill(tmp_path, injected):
+    notebook_path = str(tmp_path / "large.ipynb")
+    nbformat.write(make_large_notebook(cell_count=5, output_size=10), notebook_path)
+    if injected:
+        # parameterizing the output of papermill again replaces the injected cell
+        notebook = parameterize_notebook(nb=load_notebook_node(notebook_path), parameters={"foo": "old"})
+        nbformat.write(notebook, notebook_path)
+    (tmp_path / "large.config.json").write_text("{}")
+    nbschema = NotebookSchemaProcessor(models={})
+    repository = DefaultNotebookRepository(notebooks_dir=tmp_path, nbschema=nbschema)
+    parameterizer = DefaultNotebookParameterizier(nbschema=nbschema, kernelspec_language="python")
+    notebook_config = await repository.get("large")
+    expected = parameterize_notebook(
+        nb=load_notebook_node(notebook_config.notebook_path), parameters=deepcopy(PARAMETERS)
+    )
+    actual = parameterizer.parameterize_notebook(
+        notebook_config=notebook_config, parameters=PARAMETERS
+    )
+    assert actual.metadata[JUPYREST_METADATA_KEY]["notebook_id"] == "large"
+    assert _normalize(actual) == _normalize(expected)
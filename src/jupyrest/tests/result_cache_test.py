@@ -0,0 +1,123 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from jupyrest.default_impl.builder import DefaultApplicationBuilder
+from jupyrest.default_impl.file_object_result_cache import FileObjectNotebookResultCache
+from jupyrest.default_impl.result_cache import LRUNotebookResultCache
+from jupyrest.infra.in_memory.execution_repository import InMemoryNotebookExecutionRepository
+from jupyrest.infra.in_memory.file_object_client import InMemoryFileObjectClient
+from jupyrest.notebook_execution.commands import _get_execution_key, accept
+from jupyrest.notebook_execution.entity import (
+    NotebookExecutionCompletionDetails,
+    NotebookExecutionCompletionStatus,
+    NotebookExecutionStatus,
+)
+from tests.start_http import Incident
+
+notebooks_dir = Path(__file__).parent / "notebooks"
+parameters = {
+    "incidents": [
+        {"title": "1", "start_time": "2021-01-01T00:00:00", "end_time": "2021-01-02T00:00:00"},
+        {"title": "2", "start_time": "2022-01-01T00:00:00", "end_time": "2022-01-02T00:00:00"},
+    ],
+    "foo": "foo",
+}
+
+
+def _new_completion_details(client: InMemoryFileObjectClient) -> NotebookExecutionCompletionDetails:
+    return NotebookExecutionCompletionDetails(
+        completion_status=NotebookExecutionCompletionStatus.SUCCEEDED,
+        end_time=datetime.utcnow(),
+        ipynb=client.new_file_object("notebook_executions/1/ipynb"),
+        html=client.new_file_object("notebook_executions/1/html"),
+        exception=None,
+        output=client.new_file_object("notebook_executions/1/output"),
+    )
+
+
+@pytest.mark.anyio
+async def test_file_object_result_cache():
+    client = InMemoryFileObjectClient()
+    cache = FileObjectNotebookResultCache(file_obj_client=client)
+    completion_details = _new_completion_details(client)
+    assert await cache.get("key") is None
+    await cache.set("key", completion_details, ttl_seconds=None)
+    assert await cache.get("key") == completion_details
+    # entries are shared through the file object client
+    other = FileObjectNotebookResultCache(file_obj_client=client)
+    assert await other.get("key") == completion_details
+    assert await FileObjectNotebookResultCache(file_obj_client=client, prefix="other").get("key") is None
+    await other.delete("key")
+    assert await cache.get("key") is None
+    await cache.set("key", completion_details, ttl_seconds=0)
+    assert await cache.get("key") is None
+
+
+@pytest.mark.anyio
+async def test_lru_result_cache():
+    cache = LRUNotebookResultCache(max_entries=1)
+    completion_details = _new_completion_details(InMemoryFileObjectClient())
+    await cache.set("a", completion_details, ttl_seconds=None)
+    await cache.set("b", completion_details, ttl_seconds=None)
+    assert await cache.get("a") is None
+    assert await cache.get("b") == completion_details
+    await cache.delete("b")
+    assert await cache.get("b") is None
+
+
+async def _new_cached_execution(cache_type, **kwargs):
+    client = InMemoryFileObjectClient()
+    result_cache = (
+        LRUNotebookResultCache()
+        if cache_type == "lru"
+        else FileObjectNotebookResultCache(file_obj_client=client)
+    )
+    deps = DefaultApplicationBuilder(
+        notebooks_dir=notebooks_dir,
+        notebook_execution_repository=InMemoryNotebookExecutionRepository(),
+        file_object_client=client,
+        models={"incident": Incident},
+        result_cache=result_cache,
+        **kwargs,
+    ).build()
+    notebook_config = await deps.notebook_repository.get("model_io")
+    key = _get_execution_key(
+        notebook_config=notebook_config, parameters=parameters, artifacts=notebook_config.artifacts
+    )
+    completion_details = _new_completion_details(client)
+    await result_cache.set(key, completion_details, ttl_seconds=None)
+    return deps, result_cache, key, completion_details
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("cache_type", ["lru", "file_object"])
+async def test_cache_hit_requires_artifacts(cache_type):
+    deps, result_cache, key, completion_details = await _new_cached_execution(cache_type)
+    client = deps.file_obj_client
+    for file_object in (completion_details.ipynb, completion_details.output, completion_details.html):
+        await client.set_content(file_object, "{}")
+    execution = await accept(notebook_id="model_io", parameters=parameters, deps=deps)
+    assert execution.status == NotebookExecutionStatus.COMPLETED
+    del client._files[completion_details.output.path]
+    execution = await accept(notebook_id="model_io", parameters=parameters, deps=deps)
+    assert execution.status == NotebookExecutionStatus.ACCEPTED
+    assert await result_cache.get(key) is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("lazy_html_rendering", [True, False])
+async def test_cache_hit_requires_html(lazy_html_rendering):
+    deps, result_cache, key, completion_details = await _new_cached_execution(
+        "lru", lazy_html_rendering=lazy_html_rendering
+    )
+    await deps.file_obj_client.set_content(completion_details.ipynb, "{}")
+    await deps.file_obj_client.set_content(completion_details.output, "{}")
+    execution = await accept(notebook_id="model_io", parameters=parameters, deps=deps)
+    if lazy_html_rendering:
+        # the html is rendered from the ipynb when it is read
+        assert execution.status == NotebookExecutionStatus.COMPLETED
+    else:
+        assert execution.status == NotebookExecutionStatus.ACCEPTED
+        assert await result_cache.get(key) is None
@@ -1,4 +1,8 @@
 from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import asyncio
+import socket
 import uvicorn
 from jupyrest.default_impl.executor import IPythonNotebookExecutor
 from jupyrest.nbschema import NotebookSchemaProcessor, ModelCollection, NbSchemaBase
@@ -15,13 +19,32 @@ class Incident(NbSchemaBase):
     title: str
 
 
+@asynccontextmanager
+async def serve_app(asgi_app) -> AsyncIterator[str]:
+    """Serve `asgi_app` in this event loop and yield its url, for tests
+    that need an application built differently from the one below."""
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app=asgi_app, port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            if task.done():
+                task.result()
+            await asyncio.sleep(0.05)
+        yield f"http://localhost:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
 def start_http_server():
     notebooks_dir = Path(__file__).parent / "notebooks"
     builder = InMemoryApplicationBuilder(notebooks_dir=notebooks_dir, models={"incident": Incident})
 
     asgi_app = create_asgi_app(deps=builder.build())
     import sys
-    import asyncio
 
     if sys.platform == "win32":
         loop = asyncio.ProactorEventLoop()
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from jupyrest.default_impl.builder import DefaultApplicationBuilder
+from jupyrest.default_impl.sticky_executor import StickyKernelNotebookExecutor
+from jupyrest.infra.in_memory.execution_repository import InMemoryNotebookExecutionRepository
+from jupyrest.infra.in_memory.file_object_client import InMemoryFileObjectClient
+from jupyrest.notebook_config import JUPYREST_METADATA_KEY
+from tests.start_http import Incident
+
+notebooks_dir = Path(__file__).parent / "notebooks"
+
+
+def _new_notebook(notebook_hash: str):
+    prelude = nbformat.v4.new_code_cell("import os\nprelude_pid = os.getpid()")
+    prelude.metadata["tags"] = [StickyKernelNotebookExecutor.PRELUDE_TAG]
+    return nbformat.v4.new_notebook(
+        metadata={JUPYREST_METADATA_KEY: {"notebook_id": "sticky", "notebook_hash": notebook_hash}},
+        cells=[
+            prelude,
+            nbformat.v4.new_code_cell("assert 'x' not in globals()\nx = 1\nprint(prelude_pid)"),
+        ],
+    )
+
+
+async def _execute(executor: StickyKernelNotebookExecutor, notebook_hash: str) -> str:
+    notebook = _new_notebook(notebook_hash)
+    assert await executor.execute_notebook_async(notebook) is None
+    # the prelude cell gets the outputs of the priming execution
+    assert notebook.cells[0].execution_count is not None
+    return notebook.cells[1].outputs[0].text
+
+
+@pytest.mark.anyio
+async def test_prelude_kernel_is_reused_and_reset():
+    executor = StickyKernelNotebookExecutor()
+    try:
+        pid = await _execute(executor, "a")
+        assert await _execute(executor, "a") == pid
+        km = executor._kernels["sticky"].km
+        # a changed notebook file primes a new kernel
+        assert await _execute(executor, "b") != pid
+        assert not await km.is_alive()
+        km = executor._kernels["sticky"].km
+    finally:
+        await executor.shutdown()
+    assert len(executor._kernels) == 0
+    assert not await km.is_alive()
+
+
+@pytest.mark.anyio
+async def test_invalidate():
+    executor = StickyKernelNotebookExecutor()
+    try:
+        pid = await _execute(executor, "a")
+        await executor.invalidate("sticky")
+        assert "sticky" not in executor._kernels
+        assert await _execute(executor, "a") != pid
+    finally:
+        await executor.shutdown()
+
+
+@pytest.mark.anyio
+async def test_builder_selects_sticky_executor():
+    builder = DefaultApplicationBuilder(
+        notebooks_dir=notebooks_dir,
+        notebook_execution_repository=InMemoryNotebookExecutionRepository(),
+        file_object_client=InMemoryFileObjectClient(),
+        models={"incident": Incident},
+        sticky_prelude_kernels=True,
+    )
+    assert isinstance(builder.notebook_executor, StickyKernelNotebookExecutor)
+    notebook_config = await builder.notebook_repository.get("delay")
+    notebook = builder.notebook_parameterizier.parameterize_notebook(
+        notebook_config=notebook_config, parameters={"delay_seconds": 0}
+    )
+    assert notebook.metadata[JUPYREST_METADATA_KEY] == {
+        "notebook_id": "delay",
+        "notebook_hash": notebook_config.get_template().content_hash,
+    }
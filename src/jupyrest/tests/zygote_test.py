@@ -0,0 +1,56 @@
+import asyncio
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from jupyrest.default_impl.notebook_repository import DefaultNotebookRepository
+from jupyrest.default_impl.zygote import KernelZygote, ZygoteKernelManager
+from jupyrest.default_impl.zygote_executor import ZygoteNotebookExecutor
+from jupyrest.nbschema import NotebookSchemaProcessor
+from tests.start_http import Incident
+
+notebooks_dir = Path(__file__).parent / "notebooks"
+
+
+@pytest.mark.anyio
+async def test_zygote_executor_preloads_modules():
+    repository = DefaultNotebookRepository(
+        notebooks_dir=notebooks_dir, nbschema=NotebookSchemaProcessor(models={"incident": Incident})
+    )
+    executor = ZygoteNotebookExecutor(preload_modules=["colorsys"], notebook_repository=repository)
+    await executor.start()
+    try:
+        zygote = await executor.get_zygote()
+        assert "colorsys" in zygote.preload_modules
+        notebook = nbformat.v4.new_notebook(
+            cells=[nbformat.v4.new_code_cell("import sys\nassert 'colorsys' in sys.modules")]
+        )
+        assert await executor.execute_notebook_async(notebook) is None
+    finally:
+        await executor.shutdown()
+    assert zygote._process is None
+
+
+@pytest.mark.anyio
+async def test_forked_kernel_exit_code():
+    zygote = KernelZygote(preload_modules=[])
+    km = ZygoteKernelManager(zygote=zygote, kernel_name="python3")
+    try:
+        await km.start_kernel()
+        kc = km.client()
+        kc.start_channels()
+        try:
+            await kc.wait_for_ready(timeout=60)
+            kc.execute("import os; os._exit(3)")
+        finally:
+            kc.stop_channels()
+        process = km.provisioner.process
+        for _ in range(100):
+            if process.poll() is not None:
+                break
+            await asyncio.sleep(0.1)
+        assert process.poll() == 3
+    finally:
+        await km.cleanup_resources()
+        await zygote.shutdown()